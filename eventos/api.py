@@ -0,0 +1,93 @@
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from .paginacao import MAX_PK, paginar_keyset
+
+# campo da API -> campo do modelo, ou expressão calculada no próprio SELECT
+CAMPOS = {
+    'id': 'id',
+    'titulo': 'titulo',
+    'descricao': 'descricao',
+    'data': 'data',
+    'local': 'local',
+    'capacidade': F('capacidade_maxima'),
+    'inscritos': 'inscritos',
+    # inscritos é o contador mantido a cada inscrição: as vagas saem da própria linha
+    'vagas': Greatest(F('capacidade_maxima') - F('inscritos'), Value(0)),
+    'atualizado_em': 'atualizado_em',
+}
+CAMPOS_PADRAO = ('id', 'titulo', 'data', 'local', 'vagas')
+TAMANHO_PAGINA = 50
+MAX_TAMANHO_PAGINA = 200
+MAX_LOTE = 100
+
+
+class ParametroInvalido(Exception):
+    pass
+
+
+def campos_pedidos(texto):
+    if not texto:
+        return list(CAMPOS_PADRAO)
+    campos = list(dict.fromkeys(campo.strip() for campo in texto.split(',') if campo.strip()))
+    desconhecidos = [campo for campo in campos if campo not in CAMPOS]
+    if desconhecidos or not campos:
+        raise ParametroInvalido(
+            f"Campos desconhecidos: {', '.join(desconhecidos) or texto}. Disponíveis: {', '.join(CAMPOS)}."
+        )
+    return campos
+
+
+def _inteiro(texto, minimo, maximo):
+    # isdigit() aceitaria "²"; e um id acima de 64 bits estouraria na consulta
+    try:
+        numero = int(texto)
+    except ValueError:
+        return None
+    return numero if minimo <= numero <= maximo else None
+
+
+def tamanho_pedido(texto):
+    if not texto:
+        return TAMANHO_PAGINA
+    tamanho = _inteiro(texto, 1, MAX_TAMANHO_PAGINA)
+    if tamanho is None:
+        raise ParametroInvalido(f"tamanho deve ser um número de 1 a {MAX_TAMANHO_PAGINA}.")
+    return tamanho
+
+
+def ids_pedidos(texto):
+    partes = [parte.strip() for parte in (texto or '').split(',') if parte.strip()]
+    ids = [_inteiro(parte, 0, MAX_PK) for parte in partes]
+    if not ids or None in ids:
+        raise ParametroInvalido("ids deve ser uma lista de ids de eventos separados por vírgula.")
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > MAX_LOTE:
+        raise ParametroInvalido(f"No máximo {MAX_LOTE} ids por requisição.")
+    return ids
+
+
+def _valores(eventos, campos, obrigatorios):
+    # values() devolve dicionários direto do cursor, sem instanciar Evento
+    simples = [CAMPOS[campo] for campo in campos if isinstance(CAMPOS[campo], str)]
+    calculados = {campo: CAMPOS[campo] for campo in campos if not isinstance(CAMPOS[campo], str)}
+    return eventos.values(*dict.fromkeys([*obrigatorios, *simples]), **calculados)
+
+
+def _recortar(linhas, campos):
+    return [{campo: linha[campo] for campo in campos} for linha in linhas]
+
+
+def pagina_de_eventos(eventos, campos, cursor, tamanho, descendente=False):
+    # data e id entram mesmo quando não pedidos: o cursor da próxima página sai deles
+    pagina = paginar_keyset(_valores(eventos, campos, ('data', 'id')), 'data', cursor, tamanho, descendente)
+    return {'eventos': _recortar(pagina.itens, campos), 'proximo_cursor': pagina.proximo_cursor}
+
+
+def lote_de_eventos(eventos, ids, campos):
+    linhas = {linha['id']: linha for linha in _valores(eventos.filter(pk__in=ids), campos, ('id',))}
+    # na ordem pedida; excluídos e inexistentes voltam à parte
+    return {
+        'eventos': _recortar([linhas[evento_id] for evento_id in ids if evento_id in linhas], campos),
+        'nao_encontrados': [evento_id for evento_id in ids if evento_id not in linhas],
+    }
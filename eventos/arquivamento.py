@@ -0,0 +1,102 @@
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Evento, EventoArquivado, Inscricao, InscricaoArquivada, ListaEspera
+from .signals import em_massa
+
+TAMANHO_LOTE = 100
+TAMANHO_LOTE_INSCRICOES = 1000
+
+CAMPOS_EVENTO = (
+    'id', 'titulo', 'descricao', 'data', 'local', 'capacidade_maxima', 'banner', 'criado_por_id', 'criado_em',
+    'inscritos',
+)
+
+
+def data_de_corte(dias=None):
+    dias = settings.ARQUIVAR_EVENTOS_APOS_DIAS if dias is None else dias
+    return timezone.localdate() - datetime.timedelta(days=dias)
+
+
+def _copiar_inscricoes(eventos_ids):
+    linhas = Inscricao.objects.filter(evento_id__in=eventos_ids).order_by().values(
+        'id', 'evento_id', 'data_inscricao', 'feedback',
+        nome=F('participante__nome'),
+        email=F('participante__email'),
+        telefone=F('participante__telefone'),
+        genero=F('participante__genero'),
+    )
+    copiadas = 0
+    lote = []
+    for linha in linhas.iterator(chunk_size=TAMANHO_LOTE_INSCRICOES):
+        lote.append(InscricaoArquivada(**linha))
+        if len(lote) >= TAMANHO_LOTE_INSCRICOES:
+            copiadas += len(InscricaoArquivada.objects.bulk_create(lote, ignore_conflicts=True))
+            lote = []
+    if lote:
+        copiadas += len(InscricaoArquivada.objects.bulk_create(lote, ignore_conflicts=True))
+    return copiadas
+
+
+def _apagar_em_lotes(modelo, eventos_ids):
+    # em lotes por pk, como a purga dos excluídos: a cascata a partir do evento
+    # carregaria todas as inscrições na memória de uma vez
+    while True:
+        pks = list(
+            modelo.objects.filter(evento_id__in=eventos_ids).order_by('pk')
+            .values_list('pk', flat=True)[:TAMANHO_LOTE_INSCRICOES]
+        )
+        if not pks:
+            return
+        modelo.objects.filter(pk__in=pks).delete()
+
+
+def arquivar_lote(antes_de, tamanho=TAMANHO_LOTE):
+    """
+    Move até `tamanho` eventos anteriores a `antes_de`, com as inscrições, para
+    as tabelas de arquivo numa única transação. Devolve (eventos, inscrições);
+    (0, 0) quando não há mais o que arquivar.
+    """
+    with transaction.atomic():
+        # os mais antigos primeiro, pelo índice (data, id); a trava impede que uma
+        # edição de feedback entre a cópia e a exclusão se perca
+        eventos_ids = list(
+            Evento.objects.ativos().filter(data__lt=antes_de).order_by('data', 'pk').select_for_update()
+            .values_list('pk', flat=True)[:tamanho]
+        )
+        if not eventos_ids:
+            return 0, 0
+        agora = timezone.now()
+        EventoArquivado.objects.bulk_create(
+            [
+                EventoArquivado(**dict(evento, banner=evento['banner'] or ''), arquivado_em=agora)
+                for evento in Evento.objects.filter(pk__in=eventos_ids).order_by().values(*CAMPOS_EVENTO)
+            ],
+            ignore_conflicts=True,
+        )
+        inscricoes = _copiar_inscricoes(eventos_ids)
+        with em_massa():
+            for modelo in (Inscricao, ListaEspera):
+                _apagar_em_lotes(modelo, eventos_ids)
+            Evento.objects.filter(pk__in=eventos_ids).delete()
+    return len(eventos_ids), inscricoes
+
+
+def arquivar_eventos(antes_de, tamanho=TAMANHO_LOTE, max_lotes=None):
+    """
+    Arquiva em lotes até acabar (ou até `max_lotes`). Cada lote é confirmado
+    sozinho: interrompido, o comando retoma de onde parou na próxima execução.
+    """
+    lotes = eventos = inscricoes = 0
+    while max_lotes is None or lotes < max_lotes:
+        arquivados, copiadas = arquivar_lote(antes_de, tamanho)
+        if not arquivados:
+            break
+        lotes += 1
+        eventos += arquivados
+        inscricoes += copiadas
+        yield lotes, eventos, inscricoes
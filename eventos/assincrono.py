@@ -0,0 +1,25 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+# pool limitado por worker: o que não tem versão assíncrona (templates, sessão,
+# transações, cache) roda aqui sem ocupar o laço de eventos nem criar threads sem fim
+_executor = ThreadPoolExecutor(max_workers=settings.ASYNC_THREADS, thread_name_prefix='eventos-sync')
+
+
+def _com_conexoes_renovadas(funcao):
+    def executar(*args, **kwargs):
+        # cada thread do pool tem suas próprias conexões; aplica CONN_MAX_AGE e
+        # CONN_HEALTH_CHECKS a elas como o Django faz entre requisições
+        close_old_connections()
+        try:
+            return funcao(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return executar
+
+
+def em_thread(funcao):
+    return sync_to_async(_com_conexoes_renovadas(funcao), thread_sensitive=False, executor=_executor)
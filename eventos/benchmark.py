@@ -0,0 +1,243 @@
+import datetime
+import itertools
+import random
+import statistics
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import busca
+from .arquivamento import arquivar_lote
+from .models import Evento, Inscricao, Participante
+
+SENHA = 'senha-benchmark'
+
+
+def caches_privados():
+    """
+    Troca todos os caches (inclusive o das métricas) por caches em memória novos,
+    só deste processo: o benchmark começa frio sem apagar o cache configurado,
+    que pode ser o Redis compartilhado com a aplicação.
+    """
+    return override_settings(CACHES={
+        alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'benchmark-{uuid.uuid4()}'}
+        for alias in settings.CACHES
+    })
+
+
+class Cenario:
+    def __init__(self, promotor, participante, administrador, evento_id, inscricao_id, arquivado_id):
+        self.promotor = promotor
+        self.participante = participante
+        self.administrador = administrador
+        self.evento_id = evento_id
+        self.inscricao_id = inscricao_id
+        self.arquivado_id = arquivado_id
+
+
+def popular(eventos=50, inscricoes=500, promotores=10, tamanho_lote=5000):
+    """Cria um conjunto sintético de dados com bulk_create e devolve o cenário usado nas rotas."""
+    hoje = timezone.localdate()
+    usuarios = User.objects.bulk_create([
+        User(username=f'promotor{indice}', email=f'promotor{indice}@exemplo.com') for indice in range(promotores)
+    ])
+    promotor = usuarios[0]
+    promotor.set_password(SENHA)
+    promotor.save(update_fields=['password'])
+
+    total_participantes = max(1, inscricoes // 2)
+    capacidade = -(-inscricoes // eventos) * 2 + 10
+    Evento.objects.bulk_create(
+        (
+            Evento(
+                titulo=f"Evento {indice}",
+                descricao="Descrição do evento sintético " * 10,
+                data=hoje + datetime.timedelta(days=indice % 545 - 180),
+                local=f"Local {indice % 37}",
+                capacidade_maxima=capacidade,
+                criado_por=usuarios[indice % promotores],
+            )
+            for indice in range(eventos)
+        ),
+        batch_size=tamanho_lote,
+    )
+    eventos_ids = list(Evento.objects.order_by('pk').values_list('pk', flat=True))
+
+    for inicio in range(0, total_participantes, tamanho_lote):
+        Participante.objects.bulk_create([
+            Participante(
+                nome=f"Participante {indice}",
+                email=f'participante{indice}@exemplo.com',
+                telefone=f'1199{indice:07d}',
+                genero='MFO'[indice % 3],
+            )
+            for indice in range(inicio, min(inicio + tamanho_lote, total_participantes))
+        ])
+    participantes_ids = list(Participante.objects.order_by('pk').values_list('pk', flat=True))
+
+    # o par (participante, evento) nunca se repete: o k-ésimo evento de cada
+    # participante é deslocado de k posições
+    for inicio in range(0, inscricoes, tamanho_lote):
+        Inscricao.objects.bulk_create([
+            Inscricao(
+                evento_id=eventos_ids[(indice % total_participantes + indice // total_participantes) % eventos],
+                participante_id=participantes_ids[indice % total_participantes],
+            )
+            for indice in range(inicio, min(inicio + tamanho_lote, inscricoes))
+        ])
+
+    # um evento antigo, já arquivado com as inscrições, para a página do arquivo
+    antigo = Evento.objects.create(
+        titulo="Evento arquivado", descricao="Descrição do evento sintético", data=hoje - datetime.timedelta(days=3650),
+        local="Local 0", capacidade_maxima=capacidade, criado_por=promotor,
+    )
+    Inscricao.objects.bulk_create(
+        [Inscricao(evento=antigo, participante_id=participante_id) for participante_id in participantes_ids[:20]]
+    )
+    arquivar_lote(antigo.data + datetime.timedelta(days=1))
+
+    # bulk_create não dispara os sinais que mantêm o índice de busca
+    busca.reconstruir()
+
+    participante = User.objects.create_user('participante0', 'participante0@exemplo.com', SENHA)
+    administrador = User.objects.create_superuser('admin-benchmark', 'admin@exemplo.com', SENHA)
+    evento_id = Evento.objects.filter(criado_por=promotor).order_by('pk').values_list('pk', flat=True).first()
+    inscricao_id = Inscricao.objects.filter(participante__email=participante.email).values_list('pk', flat=True).first()
+    return Cenario(promotor, participante, administrador, evento_id, inscricao_id, antigo.pk)
+
+
+VOCABULARIO = (
+    "música show festival teatro dança palestra workshop curso encontro feira exposição cinema "
+    "tecnologia python django dados nuvem segurança design marketing negócios empreendedorismo "
+    "saúde yoga corrida ciclismo futebol xadrez culinária vinho cerveja café gastronomia "
+    "literatura poesia fotografia pintura escultura arquitetura história filosofia ciência "
+    "astronomia robótica educação infantil família música-clássica jazz samba forró rock "
+    "eletrônica comunidade voluntariado sustentabilidade meio ambiente jardinagem bem-estar "
+    "carreira liderança inovação startups finanças investimentos idiomas inglês espanhol"
+).split()
+CIDADES = (
+    "São Paulo", "Rio de Janeiro", "Belo Horizonte", "Salvador", "Fortaleza", "Curitiba", "Recife",
+    "Porto Alegre", "Manaus", "Belém", "Goiânia", "Campinas", "Florianópolis", "Natal", "Vitória",
+)
+
+
+def popular_busca(eventos=1_000_000, tamanho_lote=10000, semente=42):
+    """Eventos com texto variado (frequência de palavras decrescente, como em texto real) para a busca."""
+    aleatorio = random.Random(semente)
+    silabas = ('ba', 'ce', 'di', 'fo', 'gu', 'la', 'me', 'ni', 'po', 'ra', 'se', 'ti', 'vo', 'xa', 'zu')
+    # cauda longa de palavras raras depois do vocabulário comum
+    vocabulario = list(VOCABULARIO) + [
+        ''.join(aleatorio.choices(silabas, k=aleatorio.randint(3, 5))) for _ in range(5000)
+    ]
+    pesos = [1 / (posicao + 10) for posicao in range(len(vocabulario))]
+    promotor = User.objects.create_user('promotor-busca', 'busca@exemplo.com', SENHA)
+    hoje = timezone.localdate()
+    for inicio in range(0, eventos, tamanho_lote):
+        Evento.objects.bulk_create([
+            Evento(
+                titulo=' '.join(aleatorio.choices(vocabulario, pesos, k=4)).capitalize(),
+                descricao=' '.join(aleatorio.choices(vocabulario, pesos, k=30)),
+                data=hoje + datetime.timedelta(days=indice % 730 - 365),
+                local=f"Centro de eventos {indice % 500}, {CIDADES[indice % len(CIDADES)]}",
+                capacidade_maxima=100,
+                criado_por=promotor,
+            )
+            for indice in range(inicio, min(inicio + tamanho_lote, eventos))
+        ])
+    return busca.reconstruir()
+
+
+def rotas(cenario):
+    """
+    Todas as rotas de sistema_eventos/urls.py, com o limite de consultas de cada uma.
+
+    Os limites valem para qualquer volume de dados: se uma view passar a consultar
+    por linha (N+1), o número de consultas cresce e o limite estoura.
+    """
+    contador = itertools.count()
+
+    def nova_inscricao():
+        indice = next(contador)
+        return {
+            'nome': f"Novo participante {indice}",
+            'email': f'novo{indice}@exemplo.com',
+            'telefone': '11900000000',
+            'genero': 'O',
+        }
+
+    return [
+        # (nome, método, url, dados, usuário, limite de consultas)
+        ('evento-list', 'get', reverse('evento-list'), None, None, 2),
+        ('evento-list-logado', 'get', reverse('evento-list'), None, cenario.promotor, 4),
+        ('evento-list-passados', 'get', reverse('evento-list') + '?passados=1', None, None, 2),
+        ('evento-busca', 'get', reverse('evento-busca') + '?q=evento', None, None, 1),
+        ('evento-arquivo', 'get', reverse('evento-arquivo'), None, None, 1),
+        ('evento-arquivado', 'get', reverse('evento-arquivado', args=[cenario.arquivado_id]), None,
+         cenario.promotor, 3),
+        ('api-eventos', 'get', reverse('api-eventos'), None, None, 2),
+        ('api-eventos-lote', 'get', f"{reverse('api-eventos-lote')}?ids={cenario.evento_id},0", None, None, 2),
+        ('login', 'get', reverse('login'), None, None, 0),
+        ('logout', 'post', reverse('logout'), {}, cenario.promotor, 4),
+        ('register', 'get', reverse('register'), None, None, 0),
+        ('evento-create', 'get', reverse('evento-create'), None, cenario.promotor, 2),
+        ('evento-update', 'get', reverse('evento-update', args=[cenario.evento_id]), None, cenario.promotor, 4),
+        ('evento-painel', 'get', reverse('evento-painel', args=[cenario.evento_id]), None, cenario.promotor, 4),
+        ('evento-delete', 'get', reverse('evento-delete', args=[cenario.evento_id]), None, cenario.promotor, 4),
+        ('evento-inscricao', 'get', reverse('evento-inscricao', args=[cenario.evento_id]), None, None, 1),
+        ('evento-inscricao-post', 'post', reverse('evento-inscricao', args=[cenario.evento_id]), nova_inscricao,
+         None, 16),
+        ('evento-importar', 'get', reverse('evento-importar', args=[cenario.evento_id]), None, cenario.promotor, 3),
+        ('participantes-list', 'get', reverse('participantes-list'), None, cenario.promotor, 4),
+        ('participantes-export', 'get', reverse('participantes-export'), None, cenario.promotor, 3),
+        ('user-edit', 'get', reverse('user-edit'), None, cenario.promotor, 2),
+        ('inscricao-feedback', 'get', reverse('inscricao-feedback', args=[cenario.inscricao_id]), None,
+         cenario.participante, 3),
+        ('password_change', 'get', reverse('password_change'), None, cenario.promotor, 2),
+        ('admin:index', 'get', reverse('admin:index'), None, cenario.administrador, 3),
+    ]
+
+
+def _requisitar(cliente, metodo, url, dados):
+    if callable(dados):
+        dados = dados()
+    resposta = getattr(cliente, metodo)(url, dados) if dados is not None else getattr(cliente, metodo)(url)
+    if getattr(resposta, 'streaming', False):
+        # consome o corpo para medir a exportação inteira
+        for _ in resposta.streaming_content:
+            pass
+    return resposta
+
+
+def medir(rota, repeticoes=20, cliente_kwargs=None):
+    nome, metodo, url, dados, usuario, limite = rota
+    cliente = Client(**(cliente_kwargs or {}))
+    tempos = []
+    consultas = 0
+    for indice in range(repeticoes + 1):
+        if usuario is not None and (indice == 0 or metodo == 'post'):
+            cliente.force_login(usuario)
+        with CaptureQueriesContext(connection) as capturadas:
+            inicio = time.perf_counter()
+            resposta = _requisitar(cliente, metodo, url, dados)
+            decorrido = (time.perf_counter() - inicio) * 1000
+        if resposta.status_code >= 400:
+            raise AssertionError(f"{nome} respondeu {resposta.status_code}")
+        if indice == 0:
+            # a primeira requisição aquece caches e conexões
+            continue
+        tempos.append(decorrido)
+        consultas = max(consultas, len(capturadas))
+    tempos.sort()
+    return {
+        'consultas': consultas,
+        'limite_consultas': limite,
+        'p50_ms': round(statistics.median(tempos), 3),
+        'p95_ms': round(tempos[max(0, int(len(tempos) * 0.95) - 1)], 3),
+    }
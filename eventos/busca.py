@@ -0,0 +1,137 @@
+import re
+
+from django.db import connections
+from django.db.models import Q
+
+from .models import Evento
+from .paginacao import PaginaKeyset, codificar_cursor, decodificar_cursor, paginar_keyset
+
+# tabela criada pela migração 0012: tsvector + GIN no PostgreSQL, FTS5 no SQLite
+TABELA = 'eventos_evento_busca'
+CAMPOS_INDEXADOS = ('titulo', 'descricao', 'local')
+CONFIG_POSTGRES = 'portuguese'
+# pesos do bm25 no SQLite, na ordem das colunas (titulo, descricao, local)
+PESOS_SQLITE = '10.0, 1.0, 4.0'
+MAX_TERMOS = 8
+
+
+def _documento_postgres(titulo, descricao, local):
+    # título pesa mais que o local, que pesa mais que a descrição
+    return (
+        f"setweight(to_tsvector('{CONFIG_POSTGRES}', coalesce({titulo}, '')), 'A') || "
+        f"setweight(to_tsvector('{CONFIG_POSTGRES}', coalesce({local}, '')), 'B') || "
+        f"setweight(to_tsvector('{CONFIG_POSTGRES}', coalesce({descricao}, '')), 'C')"
+    )
+
+
+def indexar(evento, using='default'):
+    conexao = connections[using]
+    valores = [evento.titulo, evento.descricao, evento.local]
+    with conexao.cursor() as cursor:
+        if conexao.vendor == 'postgresql':
+            cursor.execute(
+                f"INSERT INTO {TABELA} (evento_id, documento) VALUES (%s, {_documento_postgres('%s', '%s', '%s')}) "
+                f"ON CONFLICT (evento_id) DO UPDATE SET documento = EXCLUDED.documento",
+                [evento.pk, *valores],
+            )
+        elif conexao.vendor == 'sqlite':
+            cursor.execute(
+                f"INSERT OR REPLACE INTO {TABELA} (rowid, titulo, descricao, local) VALUES (%s, %s, %s, %s)",
+                [evento.pk, *valores],
+            )
+
+
+def remover(evento_id, using='default'):
+    conexao = connections[using]
+    with conexao.cursor() as cursor:
+        if conexao.vendor == 'postgresql':
+            cursor.execute(f"DELETE FROM {TABELA} WHERE evento_id = %s", [evento_id])
+        elif conexao.vendor == 'sqlite':
+            cursor.execute(f"DELETE FROM {TABELA} WHERE rowid = %s", [evento_id])
+
+
+def reconstruir(using='default'):
+    """Reindexa todos os eventos; necessário depois de bulk_create/update, que não disparam sinais."""
+    conexao = connections[using]
+    with conexao.cursor() as cursor:
+        if conexao.vendor == 'postgresql':
+            cursor.execute(f"TRUNCATE {TABELA}")
+            cursor.execute(
+                f"INSERT INTO {TABELA} (evento_id, documento) "
+                f"SELECT id, {_documento_postgres('titulo', 'descricao', 'local')} FROM eventos_evento "
+                f"WHERE NOT excluido"
+            )
+        elif conexao.vendor == 'sqlite':
+            cursor.execute(f"DELETE FROM {TABELA}")
+            cursor.execute(
+                f"INSERT INTO {TABELA} (rowid, titulo, descricao, local) "
+                f"SELECT id, titulo, descricao, local FROM eventos_evento WHERE NOT excluido"
+            )
+            cursor.execute(f"INSERT INTO {TABELA} ({TABELA}) VALUES ('optimize')")
+        else:
+            return 0
+        cursor.execute("SELECT COUNT(*) FROM eventos_evento WHERE NOT excluido")
+        return cursor.fetchone()[0]
+
+
+def termos_da_busca(texto):
+    # só palavras: aspas, operadores e parênteses do usuário não chegam à sintaxe do FTS
+    return re.findall(r'\w+', (texto or '').lower())[:MAX_TERMOS]
+
+
+def _candidatos_postgres(termos):
+    consulta = ' & '.join(termos[:-1] + [f'{termos[-1]}:*'])
+    # todos os eventos que casam, cada um com o ts_rank; o ORDER BY ... LIMIT de fora
+    # vira um top-N (heap de tamanho + 1 linhas), sem ordenar os candidatos inteiros
+    sql = (
+        f"SELECT evento_id AS id, -ts_rank(documento, q) AS relevancia "
+        f"FROM {TABELA}, to_tsquery('{CONFIG_POSTGRES}', %s) q WHERE documento @@ q"
+    )
+    return sql, [consulta]
+
+
+def _candidatos_sqlite(termos):
+    consulta = ' '.join([f'"{termo}"' for termo in termos[:-1]] + [f'"{termos[-1]}"*'])
+    sql = (
+        f"SELECT rowid AS id, bm25({TABELA}, {PESOS_SQLITE}) AS relevancia FROM {TABELA} "
+        f"WHERE {TABELA} MATCH %s"
+    )
+    return sql, [consulta]
+
+
+def buscar(texto, cursor=None, tamanho=20, using='default'):
+    """
+    Eventos que contêm todos os termos (o último também por prefixo), do mais
+    relevante para o menos relevante entre todos os que casam. A paginação é
+    por cursor (relevância, id), como em paginacao.
+    """
+    termos = termos_da_busca(texto)
+    if not termos:
+        return PaginaKeyset([])
+
+    vendor = connections[using].vendor
+    if vendor not in ('postgresql', 'sqlite'):
+        # outros bancos: sem índice, filtra por trecho e ordena por data
+        filtro = Q()
+        for termo in termos:
+            filtro &= Q(titulo__icontains=termo) | Q(descricao__icontains=termo) | Q(local__icontains=termo)
+        return paginar_keyset(Evento.objects.using(using).ativos().filter(filtro), 'data', cursor, tamanho)
+
+    montar = _candidatos_postgres if vendor == 'postgresql' else _candidatos_sqlite
+    candidatos, params = montar(termos)
+    # excluir_evento já tira o evento do índice; o filtro cobre a janela até o commit
+    sql = f"SELECT e.*, c.relevancia FROM ({candidatos}) c JOIN eventos_evento e ON e.id = c.id WHERE NOT e.excluido"
+    posicao = decodificar_cursor(cursor)
+    if posicao is not None and isinstance(posicao[0], (int, float)):
+        # relevância menor = mais relevante; empates desempatados pelo id
+        sql += " AND (c.relevancia, c.id) > (%s, %s)"
+        params += list(posicao)
+    sql += " ORDER BY c.relevancia, c.id LIMIT %s"
+    params.append(tamanho + 1)
+
+    eventos = list(Evento.objects.using(using).raw(sql, params))
+    if len(eventos) <= tamanho:
+        return PaginaKeyset(eventos)
+    eventos = eventos[:tamanho]
+    ultimo = eventos[-1]
+    return PaginaKeyset(eventos, codificar_cursor(ultimo.relevancia, ultimo.pk))
@@ -0,0 +1,57 @@
+import time
+
+from django.core.cache import cache
+
+from . import metricas
+
+TEMPO_CARD = 60 * 60
+
+
+def _chave_versao(evento_id):
+    return f'eventos:versao:{evento_id}'
+
+
+def _nova_versao():
+    # baseada no relógio para não reaproveitar uma versão antiga se a chave for despejada
+    return time.time_ns()
+
+
+def versoes_eventos(eventos_ids):
+    chaves = {_chave_versao(evento_id): evento_id for evento_id in eventos_ids}
+    versoes = cache.get_many(chaves)
+    faltando = {chave: _nova_versao() for chave in chaves if chave not in versoes}
+    if faltando:
+        cache.set_many(faltando, None)
+        versoes.update(faltando)
+    return {chaves[chave]: versao for chave, versao in versoes.items()}
+
+
+def invalidar_evento(evento_id):
+    try:
+        cache.incr(_chave_versao(evento_id))
+    except ValueError:
+        cache.set(_chave_versao(evento_id), _nova_versao(), None)
+
+
+class CardsEmCache:
+    # versões e fragmentos de uma página inteira buscados em duas idas ao cache
+    def __init__(self, eventos):
+        self.versoes = versoes_eventos([evento.pk for evento in eventos])
+        chaves = [self.chave(evento) for evento in eventos]
+        self.fragmentos = cache.get_many(chaves) if chaves else {}
+
+    def chave(self, evento):
+        # atualizado_em na chave: um card lido de uma réplica atrasada, depois da
+        # invalidação, fica guardado sob os dados antigos e não sob a versão nova
+        return f'eventos:card:{evento.pk}:{self.versoes[evento.pk]}:{evento.atualizado_em.timestamp()}'
+
+    def obter(self, evento, renderizar):
+        chave = self.chave(evento)
+        html = self.fragmentos.get(chave)
+        if html is not None:
+            metricas.incrementar('cards_acertos')
+            return html
+        metricas.incrementar('cards_falhas')
+        html = renderizar()
+        cache.set(chave, html, TEMPO_CARD)
+        return html
@@ -0,0 +1,87 @@
+import hashlib
+from datetime import datetime, time
+
+from django.contrib.messages import get_messages
+from django.db.models import Count, Max, Q, Sum
+from django.middleware.csrf import get_token
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .models import Evento
+
+
+class Validadores:
+    """ETag e Last-Modified de uma página, calculados só com consultas agregadas."""
+
+    def __init__(self, partes, ultima_alteracao):
+        resumo = hashlib.md5(repr(partes).encode(), usedforsecurity=False).hexdigest()
+        self.etag = quote_etag(resumo)
+        self.ultima_alteracao = int(ultima_alteracao.timestamp())
+
+    def nao_modificado(self, request):
+        # 304 (ou 412) quando os validadores do cliente ainda valem; None caso contrário
+        return get_conditional_response(request, etag=self.etag, last_modified=self.ultima_alteracao)
+
+    def aplicar(self, resposta, max_age=None):
+        resposta['ETag'] = self.etag
+        resposta['Last-Modified'] = http_date(self.ultima_alteracao)
+        if max_age is None:
+            # o navegador guarda a página, mas sempre revalida antes de reaproveitar
+            patch_cache_control(resposta, private=True, no_cache=True)
+        else:
+            # resposta igual para todos: proxies e CDNs podem servi-la por max_age segundos
+            patch_cache_control(resposta, public=True, max_age=max_age)
+        return resposta
+
+
+def _partes_do_usuario(request):
+    if not request.user.is_authenticated:
+        return None, None
+    # logado, a página muda com o usuário e embute o token CSRF do formulário de
+    # logout; get_token cria o segredo já na primeira visita, como o template faria
+    get_token(request)
+    return request.user.pk, request.META['CSRF_COOKIE']
+
+
+def _tem_mensagens(request):
+    # len() não marca as mensagens como lidas; se houver alguma, a página é renderizada
+    return len(get_messages(request)) > 0
+
+
+def validadores_da_listagem(request):
+    if _tem_mensagens(request):
+        return None
+    # a contagem é dos ativos, mas o máximo inclui os excluídos: a exclusão também
+    # avança o Last-Modified de quem só manda If-Modified-Since
+    return _validadores_de_eventos(Evento.objects.all(), _partes_do_usuario(request))
+
+
+def _validadores_de_eventos(eventos, partes):
+    agregado = eventos.aggregate(
+        total=Count('id', filter=Q(excluido=False)), atualizado=Max('atualizado_em'),
+    )
+    hoje = timezone.localdate()
+    # à meia-noite eventos passam de "próximos" para "passados" sem nenhuma alteração
+    inicio_do_dia = timezone.make_aware(datetime.combine(hoje, time.min))
+    ultima_alteracao = max(filter(None, (agregado['atualizado'], inicio_do_dia)))
+    return Validadores((*partes, hoje, agregado['total'], agregado['atualizado']), ultima_alteracao)
+
+
+def validadores_da_api(eventos):
+    # sem partes do usuário nem mensagens: a API responde igual para todos
+    return _validadores_de_eventos(eventos, ('api',))
+
+
+def validadores_dos_participantes(request):
+    if _tem_mensagens(request):
+        return None
+    # inscrições, cancelamentos e feedbacks atualizam atualizado_em do evento
+    agregado = Evento.objects.filter(criado_por=request.user).aggregate(
+        eventos=Count('id', filter=Q(excluido=False)),
+        inscritos=Sum('inscritos', filter=Q(excluido=False)),
+        atualizado=Max('atualizado_em'),
+    )
+    ultima_alteracao = agregado['atualizado'] or request.user.date_joined
+    partes = (*_partes_do_usuario(request), agregado['eventos'], agregado['inscritos'], agregado['atualizado'])
+    return Validadores(partes, ultima_alteracao)
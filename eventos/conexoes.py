@@ -0,0 +1,35 @@
+from django.core.signals import request_finished
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from . import metricas
+
+# estatísticas do psycopg_pool -> nome do contador
+ESTATISTICAS_POOL = {
+    'requests_num': 'db_pool_checkouts',
+    'requests_queued': 'db_pool_esperas',
+    'requests_wait_ms': 'db_pool_espera_ms',
+    'requests_errors': 'db_pool_erros',
+    'connections_num': 'db_pool_conexoes',
+    'connections_lost': 'db_pool_conexoes_perdidas',
+}
+
+CONTADORES = ('db_requisicoes', 'db_conexoes_abertas', *ESTATISTICAS_POOL.values())
+
+
+@receiver(connection_created)
+def contar_conexao(sender, connection, **kwargs):
+    metricas.incrementar('db_conexoes_abertas')
+
+
+@receiver(request_finished)
+def contar_requisicao(sender, **kwargs):
+    metricas.incrementar('db_requisicoes')
+    pool = getattr(connections['default'], 'pool', None)
+    if pool is None:
+        return
+    # pop_stats devolve só o que mudou desde a última chamada
+    for chave, valor in pool.pop_stats().items():
+        if chave in ESTATISTICAS_POOL and valor:
+            metricas.incrementar(ESTATISTICAS_POOL[chave], valor)
@@ -0,0 +1,117 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EmailPendente
+
+logger = logging.getLogger(__name__)
+
+# tempo que um lote fica reservado para um worker antes de voltar para a fila
+RESERVA = timedelta(minutes=10)
+ESPERA_MAXIMA = timedelta(hours=1)
+
+
+def enfileirar_email(destinatario, assunto, corpo):
+    # grava na mesma transação de quem chama: se a inscrição for desfeita,
+    # o e-mail também é
+    return EmailPendente.objects.create(destinatario=destinatario, assunto=assunto, corpo=corpo)
+
+
+def enfileirar_confirmacao(inscricao):
+    evento = inscricao.evento
+    participante = inscricao.participante
+    return enfileirar_email(
+        participante.email,
+        f"Inscrição confirmada: {evento.titulo}",
+        f"Olá, {participante.nome}!\n\n"
+        f"Sua inscrição no evento \"{evento.titulo}\" foi confirmada.\n"
+        f"Data: {evento.data:%d/%m/%Y}\n"
+        f"Local: {evento.local}\n",
+    )
+
+
+def enfileirar_promocao(inscricao):
+    evento = inscricao.evento
+    participante = inscricao.participante
+    return enfileirar_email(
+        participante.email,
+        f"Vaga liberada: {evento.titulo}",
+        f"Olá, {participante.nome}!\n\n"
+        f"Abriu uma vaga no evento \"{evento.titulo}\" e você, que estava na lista de espera, "
+        f"agora está inscrito.\n"
+        f"Data: {evento.data:%d/%m/%Y}\n"
+        f"Local: {evento.local}\n",
+    )
+
+
+def reservar_lote(tamanho, max_tentativas):
+    agora = timezone.now()
+    with transaction.atomic():
+        fila = EmailPendente.objects.filter(
+            enviado_em__isnull=True, proxima_tentativa__lte=agora, tentativas__lt=max_tentativas
+        ).order_by('proxima_tentativa')
+        # skip_locked deixa workers paralelos pegarem lotes diferentes no PostgreSQL
+        ids = list(fila.select_for_update(skip_locked=True).values_list('pk', flat=True)[:tamanho])
+        EmailPendente.objects.filter(pk__in=ids).update(proxima_tentativa=agora + RESERVA)
+    return list(EmailPendente.objects.filter(pk__in=ids).order_by('pk'))
+
+
+def espera_apos(tentativas):
+    return min(timedelta(seconds=30 * 2 ** tentativas), ESPERA_MAXIMA)
+
+
+def _registrar_falha(pendente, erro):
+    tentativas = pendente.tentativas + 1
+    logger.warning("Falha ao enviar e-mail %s (tentativa %s): %s", pendente.pk, tentativas, erro)
+    EmailPendente.objects.filter(pk=pendente.pk).update(
+        tentativas=tentativas,
+        proxima_tentativa=timezone.now() + espera_apos(tentativas),
+        erro=str(erro),
+    )
+
+
+def enviar_lote(tamanho=50, max_tentativas=5, conexao=None):
+    pendentes = reservar_lote(tamanho, max_tentativas)
+    if not pendentes:
+        return 0, 0
+
+    enviados = falhas = 0
+    conexao = conexao or get_connection()
+    aberta = False
+    # uma única conexão SMTP para o lote inteiro, reaberta só depois de uma falha
+    try:
+        for indice, pendente in enumerate(pendentes):
+            if not aberta:
+                try:
+                    conexao.open()
+                except Exception as erro:
+                    # servidor fora do ar: o resto do lote volta para a fila com espera,
+                    # em vez de ficar reservado sem contar a tentativa
+                    for restante in pendentes[indice:]:
+                        _registrar_falha(restante, erro)
+                    return enviados, falhas + len(pendentes) - indice
+                aberta = True
+            mensagem = EmailMessage(
+                pendente.assunto, pendente.corpo, settings.DEFAULT_FROM_EMAIL, [pendente.destinatario],
+                connection=conexao,
+            )
+            try:
+                mensagem.send()
+            except Exception as erro:
+                falhas += 1
+                _registrar_falha(pendente, erro)
+                # a conexão pode ter ficado inutilizável; a próxima mensagem reabre
+                conexao.close()
+                aberta = False
+            else:
+                enviados += 1
+                EmailPendente.objects.filter(pk=pendente.pk).update(
+                    tentativas=pendente.tentativas + 1, enviado_em=timezone.now(), erro=''
+                )
+    finally:
+        conexao.close()
+    return enviados, falhas
@@ -0,0 +1,59 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .emails import enfileirar_promocao
+from .models import Evento, EventoLotado, Inscricao, ListaEspera
+
+
+def entrar_na_lista_de_espera(evento, participante, using=None):
+    """
+    Põe o participante no fim da fila do evento e devolve a entrada, ou None
+    se ele já estava inscrito ou na fila.
+    """
+    if Inscricao.objects.using(using).filter(evento=evento, participante=participante).exists():
+        return None
+    try:
+        with transaction.atomic(using=using):
+            Evento.objects.using(using).filter(pk=evento.pk).update(
+                ultima_posicao_espera=F('ultima_posicao_espera') + 1
+            )
+            posicao = Evento.objects.using(using).filter(pk=evento.pk).values_list(
+                'ultima_posicao_espera', flat=True
+            ).get()
+            return ListaEspera.objects.using(using).create(evento=evento, participante=participante, posicao=posicao)
+    except IntegrityError:
+        # a restrição (evento, participante) barra quem entra duas vezes
+        return None
+
+
+def posicao_na_fila(entrada, using=None):
+    return ListaEspera.objects.using(using).filter(evento_id=entrada.evento_id, posicao__lte=entrada.posicao).count()
+
+
+def promover_da_lista_de_espera(evento_id, using=None):
+    """
+    Inscreve os primeiros da fila enquanto houver vaga e enfileira o aviso por
+    e-mail de cada um, tudo na transação de quem chamou.
+    """
+    promovidas = []
+    with transaction.atomic(using=using):
+        while True:
+            primeiro = ListaEspera.objects.using(using).filter(evento_id=evento_id).select_related(
+                'evento', 'participante'
+            ).order_by('posicao').first()
+            if primeiro is None:
+                break
+            inscricao = Inscricao(evento=primeiro.evento, participante=primeiro.participante)
+            try:
+                # a mesma reserva condicional de uma inscrição comum, no savepoint de Inscricao.save
+                inscricao.save(using=using)
+            except EventoLotado:
+                break
+            except IntegrityError:
+                # inscrito por outro caminho (importação, admin) enquanto esperava
+                primeiro.delete(using=using)
+                continue
+            primeiro.delete(using=using)
+            enfileirar_promocao(inscricao)
+            promovidas.append(inscricao)
+    return promovidas
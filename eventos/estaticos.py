@@ -0,0 +1,14 @@
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+class ArquivosEstaticos(CompressedManifestStaticFilesStorage):
+    """
+    No collectstatic, grava os arquivos com hash no nome e cópias .gz e .br ao
+    lado; o WhiteNoise serve essas versões com cache de longo prazo. Antes do
+    collectstatic (desenvolvimento, testes) não há manifesto e o nome original é usado.
+    """
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
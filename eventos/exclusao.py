@@ -0,0 +1,70 @@
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from . import busca
+from .cache import invalidar_evento
+from .models import Evento, Inscricao, ListaEspera, Participante
+from .signals import em_massa
+
+TAMANHO_LOTE = 500
+
+
+def excluir_evento(evento):
+    """
+    Exclusão lógica: um UPDATE numa linha, sem tocar nas inscrições. O evento
+    some das listagens e da busca na hora; o resto sai com purgar_lote.
+    """
+    with transaction.atomic():
+        Evento.objects.filter(pk=evento.pk).update(excluido=True, atualizado_em=timezone.now())
+        busca.remover(evento.pk)
+        transaction.on_commit(lambda: invalidar_evento(evento.pk))
+
+
+def apagar_participantes_orfaos(participantes_ids):
+    """Apaga, entre os participantes indicados, os que não têm mais inscrição nem lugar em fila."""
+    # a inscrição e a importação travam o participante (select_for_update) antes de
+    # inserir; travando primeiro, a conferência abaixo já vê qualquer inscrição
+    # confirmada antes dela, e quem chegar depois espera ou o recria
+    travados = list(Participante.objects.filter(pk__in=participantes_ids).select_for_update().values_list(
+        'pk', flat=True
+    ))
+    orfaos = Participante.objects.filter(pk__in=travados).exclude(
+        Exists(Inscricao.objects.filter(participante=OuterRef('pk')))
+    ).exclude(
+        Exists(ListaEspera.objects.filter(participante=OuterRef('pk')))
+    )
+    return orfaos.delete()[1].get(Participante._meta.label, 0)
+
+
+def _apagar_lote(modelo, evento_id, tamanho):
+    with transaction.atomic():
+        linhas = list(
+            modelo.objects.filter(evento_id=evento_id).order_by('pk').values_list('pk', 'participante_id')[:tamanho]
+        )
+        if not linhas:
+            return 0, 0
+        # o evento inteiro vai embora: contadores, totais diários e fila dele não precisam de ajuste
+        with em_massa():
+            modelo.objects.filter(pk__in=[pk for pk, _ in linhas]).delete()
+        return len(linhas), apagar_participantes_orfaos({participante_id for _, participante_id in linhas})
+
+
+def purgar_lote(tamanho=TAMANHO_LOTE):
+    """
+    Um passo da purga, numa transação curta: apaga até `tamanho` inscrições (ou
+    entradas da fila) de um evento excluído com os participantes que ficaram
+    órfãos, ou, quando ele já está vazio, o próprio evento. Devolve
+    (evento_id, linhas, participantes, evento_apagado); None quando não há o que purgar.
+    """
+    # pelo índice parcial dos excluídos; interrompida, a purga recomeça deste mesmo evento
+    evento_id = Evento.objects.filter(excluido=True).order_by('pk').values_list('pk', flat=True).first()
+    if evento_id is None:
+        return None
+    for modelo in (Inscricao, ListaEspera):
+        apagadas, orfaos = _apagar_lote(modelo, evento_id, tamanho)
+        if apagadas:
+            return evento_id, apagadas, orfaos, False
+    # sem inscrições nem fila, a cascata só leva os totais diários
+    Evento.objects.filter(pk=evento_id, excluido=True).delete()
+    return evento_id, 0, 0, True
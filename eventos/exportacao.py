@@ -0,0 +1,146 @@
+import csv
+import re
+import zipfile
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from django.utils import timezone
+
+# coluna exportada -> (cabeçalho, caminho no ORM)
+COLUNAS = {
+    'evento': ("Evento", 'evento__titulo'),
+    'data_evento': ("Data do evento", 'evento__data'),
+    'nome': ("Nome", 'participante__nome'),
+    'email': ("Email", 'participante__email'),
+    'telefone': ("Telefone", 'participante__telefone'),
+    'genero': ("Gênero", 'participante__genero'),
+    'data_inscricao': ("Data Inscrição", 'data_inscricao'),
+    'feedback': ("Feedback", 'feedback'),
+}
+
+TAMANHO_LOTE = 2000
+
+_CARACTERES_INVALIDOS_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+# o Excel e o LibreOffice interpretam como fórmula a célula que começa assim
+_INICIO_DE_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+
+def linhas_exportacao(inscricoes, colunas):
+    caminhos = [COLUNAS[coluna][1] for coluna in colunas]
+    # values_list evita instanciar modelos; iterator usa cursor do lado do servidor
+    # no PostgreSQL e busca em lotes, então a memória não depende do total de linhas
+    linhas = inscricoes.order_by('pk').values_list(*caminhos).iterator(chunk_size=TAMANHO_LOTE)
+    for linha in linhas:
+        yield [_formatar(valor) for valor in linha]
+
+
+def _formatar(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, datetime):
+        return timezone.localtime(valor).strftime('%d/%m/%Y %H:%M')
+    if hasattr(valor, 'strftime'):
+        return valor.strftime('%d/%m/%Y')
+    valor = str(valor)
+    # nome e feedback vêm do público: "=HYPERLINK(...)" precisa sair como texto
+    if valor.startswith(_INICIO_DE_FORMULA):
+        return "'" + valor
+    return valor
+
+
+class _Eco:
+    def write(self, valor):
+        return valor
+
+
+def gerar_csv(inscricoes, colunas):
+    escritor = csv.writer(_Eco())
+    yield '\ufeff' + escritor.writerow([COLUNAS[coluna][0] for coluna in colunas])
+    for linha in linhas_exportacao(inscricoes, colunas):
+        yield escritor.writerow(linha)
+
+
+class _Saida:
+    # arquivo só de escrita e sem seek: o zipfile passa a gravar descritores
+    # de dados após cada membro e o conteúdo pode ser repassado aos poucos
+    def __init__(self):
+        self.partes = []
+
+    def write(self, dados):
+        self.partes.append(bytes(dados))
+        return len(dados)
+
+    def flush(self):
+        pass
+
+    def esvaziar(self):
+        dados = b''.join(self.partes)
+        self.partes.clear()
+        return dados
+
+
+_XLSX_ESTRUTURA = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Participantes" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _linha_xlsx(valores):
+    celulas = ''.join(
+        f'<c t="inlineStr"><is><t xml:space="preserve">{escape(_CARACTERES_INVALIDOS_XML.sub("", valor))}</t></is></c>'
+        for valor in valores
+    )
+    return f'<row>{celulas}</row>'.encode()
+
+
+def gerar_xlsx(inscricoes, colunas):
+    saida = _Saida()
+    with zipfile.ZipFile(saida, 'w', compression=zipfile.ZIP_DEFLATED) as pacote:
+        for nome, conteudo in _XLSX_ESTRUTURA.items():
+            pacote.writestr(nome, conteudo)
+        yield saida.esvaziar()
+
+        with pacote.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as planilha:
+            planilha.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            planilha.write(_linha_xlsx([COLUNAS[coluna][0] for coluna in colunas]))
+            for indice, linha in enumerate(linhas_exportacao(inscricoes, colunas), start=1):
+                planilha.write(_linha_xlsx(linha))
+                if indice % TAMANHO_LOTE == 0:
+                    yield saida.esvaziar()
+            planilha.write(b'</sheetData></worksheet>')
+    yield saida.esvaziar()
@@ -1,4 +1,9 @@
+from datetime import datetime, time, timedelta
+
 from django import forms
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
 from .models import Evento, Participante, Inscricao
 from django.contrib.auth.forms import UserCreationForm, PasswordChangeForm
 from django.contrib.auth.models import User
@@ -11,11 +16,136 @@ class EventoForm(forms.ModelForm):
             'data': forms.DateInput(attrs={'type': 'date'}),
         }
 
+    def save(self, commit=True):
+        if 'banner' in self.changed_data:
+            # as versões reduzidas são geradas fora da requisição (gerar_banners)
+            self.instance.banner_pendente = True
+        if not commit or self.instance._state.adding:
+            return super().save(commit)
+        # na edição só as colunas do formulário são gravadas: inscritos, a fila de espera
+        # e os derivados do banner mudam por UPDATEs próprios enquanto o formulário está
+        # aberto, e um save completo voltaria os valores lidos antes (e venderia vagas)
+        campos = [*self._meta.fields, 'atualizado_em']
+        if 'banner' in self.changed_data:
+            campos.append('banner_pendente')
+        self.instance.save(update_fields=campos)
+        self._save_m2m()
+        return self.instance
+
 class ParticipanteForm(forms.ModelForm):
     class Meta:
         model = Participante
         fields = ['nome', 'email', 'telefone', 'genero']
 
+    def clean_email(self):
+        return Participante.normalizar_email(self.cleaned_data.get('email'))
+
+    def validate_unique(self):
+        # e-mail já cadastrado não é erro: a inscrição reaproveita o participante
+        pass
+
+    def save(self, commit=True):
+        # quem já existe é reaproveitado sem alteração: uma inscrição anônima não pode
+        # reescrever nome, telefone e gênero que outros eventos (e os agregados) usam
+        dados = {campo: self.cleaned_data.get(campo) for campo in ('nome', 'telefone', 'genero')}
+        if not commit:
+            # nada é gravado: o participante já cadastrado ou um novo, ainda sem pk
+            self.instance = Participante.objects.filter(email=self.cleaned_data['email']).first() or Participante(
+                email=self.cleaned_data['email'], **dados
+            )
+            self.save_m2m = self._save_m2m
+            return self.instance
+        with transaction.atomic():
+            # trava o participante até o fim da transação de quem chamou: a purga de órfãos
+            # (apagar_participantes_orfaos) espera a inscrição entrar em vez de apagá-lo antes
+            self.instance, _ = Participante.objects.select_for_update().get_or_create(
+                email=self.cleaned_data['email'], defaults=dados
+            )
+        return self.instance
+
+def inicio_do_dia(dia):
+    return timezone.make_aware(datetime.combine(dia, time.min))
+
+class FiltroParticipantesForm(forms.Form):
+    # ordem -> campo da paginação por cursor; "-" na frente inverte
+    ORDENACOES = {
+        'data': 'data_inscricao',
+        'nome': 'participante__nome',
+        'email': 'participante__email',
+        'evento': 'evento__titulo',
+    }
+    ORDEM_PADRAO = '-data'
+
+    evento = forms.ChoiceField(
+        required=False, widget=forms.Select(attrs={'class': 'form-select form-select-sm'}),
+    )
+    de = forms.DateField(
+        label="Inscritos de", required=False,
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control form-control-sm'}),
+    )
+    ate = forms.DateField(
+        label="até", required=False,
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control form-control-sm'}),
+    )
+    feedback = forms.ChoiceField(
+        choices=[('', "Com ou sem feedback"), ('com', "Com feedback"), ('sem', "Sem feedback")], required=False,
+        widget=forms.Select(attrs={'class': 'form-select form-select-sm'}),
+    )
+    q = forms.CharField(
+        label="Nome ou e-mail começa com", required=False, max_length=100,
+        widget=forms.TextInput(attrs={'class': 'form-control form-control-sm'}),
+    )
+    ordem = forms.ChoiceField(
+        choices=[(f'{sinal}{campo}', f'{sinal}{campo}') for campo in ORDENACOES for sinal in ('', '-')],
+        required=False,
+    )
+
+    def __init__(self, usuario, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # uma consulta só, guardada no queryset, serve à validação e ao <select>
+        eventos = Evento.objects.ativos().filter(criado_por=usuario).order_by('-data', '-pk').values_list('pk', 'titulo')
+        self.fields['evento'].choices = lambda: [('', "Todos os eventos"), *((str(pk), titulo) for pk, titulo in eventos)]
+
+    def get(self, campo):
+        # filtro inválido é ignorado: a página continua abrindo com os demais
+        if not self.is_bound or not self.is_valid() and campo in self.errors:
+            return None
+        return self.cleaned_data.get(campo) or None
+
+    @property
+    def ordem_atual(self):
+        return self.get('ordem') or self.ORDEM_PADRAO
+
+    @property
+    def campo_ordem(self):
+        return self.ORDENACOES[self.ordem_atual.lstrip('-')]
+
+    @property
+    def descendente(self):
+        return self.ordem_atual.startswith('-')
+
+    def filtrar(self, inscricoes):
+        if self.get('evento'):
+            inscricoes = inscricoes.filter(evento_id=self.get('evento'))
+        # dias do fuso local convertidos em instantes: o índice de data_inscricao vale
+        if self.get('de'):
+            inscricoes = inscricoes.filter(data_inscricao__gte=inicio_do_dia(self.get('de')))
+        if self.get('ate'):
+            inscricoes = inscricoes.filter(data_inscricao__lt=inicio_do_dia(self.get('ate') + timedelta(days=1)))
+        if self.get('feedback') == 'com':
+            inscricoes = inscricoes.filter(feedback__gt='')
+        elif self.get('feedback') == 'sem':
+            inscricoes = inscricoes.filter(Q(feedback__isnull=True) | Q(feedback=''))
+        if self.get('q'):
+            inscricoes = inscricoes.com_prefixo(self.get('q'))
+        return inscricoes
+
+class ImportacaoInscricoesForm(forms.Form):
+    arquivo = forms.FileField(
+        label="Arquivo CSV",
+        help_text="Colunas: nome, email, telefone e, opcionalmente, genero (M, F ou O).",
+    )
+
 class RegistrationForm(UserCreationForm):
     email = forms.EmailField(required=True)
 
@@ -0,0 +1,87 @@
+import io
+import logging
+import posixpath
+
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .cache import invalidar_evento
+
+logger = logging.getLogger(__name__)
+
+# larguras usadas no srcset dos cards (1x e 2x de um card de ~400px)
+LARGURAS = (400, 800)
+FORMATOS = {
+    'jpeg': ('JPEG', 'jpg', {'quality': 80, 'optimize': True, 'progressive': True}),
+    'webp': ('WEBP', 'webp', {'quality': 75, 'method': 6}),
+}
+
+
+def _abrir(banner):
+    with banner.open('rb') as arquivo:
+        imagem = Image.open(arquivo)
+        imagem = ImageOps.exif_transpose(imagem)
+        imagem.load()
+    if imagem.mode != 'RGB':
+        imagem = imagem.convert('RGB')
+    return imagem
+
+
+def gerar_derivados(evento):
+    banner = evento.banner
+    storage = banner.storage
+    imagem = _abrir(banner)
+    nome_base = posixpath.splitext(posixpath.basename(banner.name))[0]
+
+    derivados = {}
+    for formato, (formato_pil, extensao, opcoes) in FORMATOS.items():
+        derivados[formato] = {}
+        for largura in LARGURAS:
+            # não amplia imagens pequenas: a menor largura já basta
+            if largura > imagem.width and largura != LARGURAS[0]:
+                continue
+            reduzida = imagem.copy()
+            reduzida.thumbnail((largura, imagem.height), Image.LANCZOS)
+            conteudo = io.BytesIO()
+            reduzida.save(conteudo, formato_pil, **opcoes)
+            nome = f"banners/derivados/{evento.pk}/{nome_base}-{largura}.{extensao}"
+            derivados[formato][str(largura)] = storage.save(nome, ContentFile(conteudo.getvalue()))
+    return derivados
+
+
+def remover_derivados(storage, derivados):
+    for nomes in derivados.values():
+        for nome in nomes.values():
+            storage.delete(nome)
+
+
+def processar_pendentes(lote=20):
+    from .models import Evento
+
+    pendentes = list(Evento.objects.filter(banner_pendente=True).order_by('pk')[:lote])
+    processados = falhas = 0
+    for evento in pendentes:
+        if evento.banner:
+            try:
+                derivados = gerar_derivados(evento)
+            except (OSError, ValueError, Image.DecompressionBombError) as erro:
+                # arquivo ilegível: usa o original e não tenta de novo
+                logger.warning("Não foi possível processar o banner do evento %s: %s", evento.pk, erro)
+                falhas += 1
+                derivados = {}
+        else:
+            derivados = {}
+        # só conclui se o banner não mudou de novo enquanto processávamos
+        atualizado = Evento.objects.filter(
+            pk=evento.pk, banner=evento.banner.name or '', banner_pendente=True
+        ).update(banner_derivados=derivados, banner_pendente=False, atualizado_em=timezone.now())
+        if atualizado:
+            # os antigos só saem depois que a linha aponta para os novos
+            remover_derivados(evento.banner.storage, evento.banner_derivados)
+            invalidar_evento(evento.pk)
+        else:
+            # o banner mudou: os recém-gerados não são de ninguém, a próxima rodada refaz
+            remover_derivados(evento.banner.storage, derivados)
+        processados += 1
+    return processados, falhas
@@ -0,0 +1,104 @@
+import csv
+
+from django.db import transaction
+
+from .forms import ParticipanteForm
+from .models import Evento, Inscricao, Participante
+
+COLUNAS_OBRIGATORIAS = ('nome', 'email', 'telefone')
+TAMANHO_LOTE = 1000
+
+
+class ImportacaoInvalida(Exception):
+    pass
+
+
+class ResultadoImportacao:
+    def __init__(self):
+        self.linhas = 0
+        self.importadas = 0
+        self.ja_inscritas = 0
+        self.erros = []
+
+    def registrar_erro(self, linha, mensagens):
+        self.erros.append((linha, mensagens))
+
+    @property
+    def validas(self):
+        return self.linhas - len(self.erros)
+
+
+def _ler_linhas(arquivo, resultado):
+    leitor = csv.DictReader(arquivo)
+    if leitor.fieldnames is None:
+        raise ImportacaoInvalida("O arquivo está vazio.")
+    leitor.fieldnames = [(coluna or '').strip().lower() for coluna in leitor.fieldnames]
+    faltando = [coluna for coluna in COLUNAS_OBRIGATORIAS if coluna not in leitor.fieldnames]
+    if faltando:
+        raise ImportacaoInvalida(f"Colunas obrigatórias ausentes: {', '.join(faltando)}.")
+
+    emails_vistos = set()
+    for linha in leitor:
+        resultado.linhas += 1
+        # validação linha a linha, sem acumular o arquivo em memória
+        form = ParticipanteForm(data={campo: (linha.get(campo) or '').strip() for campo in ParticipanteForm.Meta.fields})
+        if not form.is_valid():
+            mensagens = [f"{campo}: {erro}" for campo, erros in form.errors.items() for erro in erros]
+            resultado.registrar_erro(leitor.line_num, mensagens)
+            continue
+        email = form.cleaned_data['email']
+        if email in emails_vistos:
+            resultado.registrar_erro(leitor.line_num, [f"email: {email} repetido no arquivo."])
+            continue
+        emails_vistos.add(email)
+        yield form.cleaned_data
+
+
+def _gravar_lote(evento, lote):
+    # como no formulário de inscrição, quem já existe é reaproveitado sem alteração
+    Participante.objects.bulk_create(
+        [
+            Participante(nome=dados['nome'], email=dados['email'], telefone=dados['telefone'], genero=dados['genero'])
+            for dados in lote
+        ],
+        ignore_conflicts=True,
+    )
+    # travados como no formulário: a purga de órfãos não apaga quem está entrando agora
+    ids = dict(
+        Participante.objects.filter(email__in=[dados['email'] for dados in lote]).select_for_update().values_list(
+            'email', 'pk'
+        )
+    )
+    # quem já estava inscrito é ignorado pelo unique_together (evento, participante)
+    Inscricao.objects.bulk_create(
+        [Inscricao(evento=evento, participante_id=ids[dados['email']]) for dados in lote],
+        ignore_conflicts=True,
+    )
+
+
+def importar_inscricoes(evento, arquivo, tamanho_lote=TAMANHO_LOTE):
+    resultado = ResultadoImportacao()
+    with transaction.atomic():
+        # trava só a linha do evento enquanto o lote entra
+        evento = Evento.objects.select_for_update().get(pk=evento.pk)
+        inscritos_antes = evento.inscritos
+
+        lote = []
+        for dados in _ler_linhas(arquivo, resultado):
+            lote.append(dados)
+            if len(lote) >= tamanho_lote:
+                _gravar_lote(evento, lote)
+                lote = []
+        if lote:
+            _gravar_lote(evento, lote)
+
+        evento.refresh_from_db(fields=['inscritos'])
+        resultado.importadas = evento.inscritos - inscritos_antes
+        resultado.ja_inscritas = resultado.validas - resultado.importadas
+        # a capacidade é conferida uma vez para o arquivo inteiro; se estourar, nada entra
+        if evento.inscritos > evento.capacidade_maxima:
+            raise ImportacaoInvalida(
+                f"O arquivo traria {resultado.importadas} novas inscrições, mas restam "
+                f"{max(evento.capacidade_maxima - inscritos_antes, 0)} vagas."
+            )
+    return resultado
@@ -0,0 +1,84 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+
+from . import metricas
+
+PREFIXO = 'eventos:limite:'
+
+
+def consumir(balde, limite, janela, agora=None):
+    """
+    Gasta uma ficha do balde e devolve 0, ou, se ele já estiver vazio, quantos
+    segundos faltam para reabastecer. O balde é enchido de uma vez a cada janela:
+    um contador por janela no cache, com incremento atômico, sem ler e regravar.
+    """
+    agora = time.time() if agora is None else agora
+    numero = int(agora // janela)
+    chave = f'{PREFIXO}{balde}:{numero}'
+    try:
+        usados = cache.incr(chave)
+    except ValueError:
+        # primeira requisição da janela; se outro processo criou a chave antes, incrementa
+        usados = 1 if cache.add(chave, 1, janela + 1) else cache.incr(chave)
+    if usados <= limite:
+        return 0
+    return int((numero + 1) * janela - agora) + 1
+
+
+class LimiteDeTaxaMiddleware:
+    """
+    Aplica LIMITES_DE_TAXA por nome de rota antes da view, ou seja, antes de
+    qualquer consulta ao banco; quem estoura recebe 429 com Retry-After.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.regras = getattr(settings, 'LIMITES_DE_TAXA', None)
+        if not self.regras:
+            raise MiddlewareNotUsed
+        self.cabecalho_ip = getattr(settings, 'LIMITE_DE_TAXA_CABECALHO_IP', None)
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
+
+    def ip_do_cliente(self, request):
+        if self.cabecalho_ip and request.META.get(self.cabecalho_ip):
+            # o proxy acrescenta o endereço de quem o conectou no fim da lista;
+            # os anteriores vêm do cliente e podem ser forjados
+            return request.META[self.cabecalho_ip].rsplit(',', 1)[-1].strip()
+        return request.META.get('REMOTE_ADDR', '')
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        rota = request.resolver_match.url_name
+        regra = self.regras.get(rota)
+        if regra is None or request.method not in regra.get('metodos', ('POST',)):
+            return None
+        valores = dict(view_kwargs, ip=self.ip_do_cliente(request))
+        for partes, (limite, janela) in regra['baldes'].items():
+            balde = ':'.join(f'{parte}={valores[parte]}' for parte in partes.split('+'))
+            espera = consumir(f'{rota}:{balde}', limite, janela)
+            if espera:
+                metricas.incrementar(f'limite:{rota}:{partes}')
+                resposta = HttpResponse(
+                    "Muitas requisições. Tente novamente em instantes.", status=429,
+                    content_type='text/plain; charset=utf-8',
+                )
+                resposta['Retry-After'] = str(espera)
+                return resposta
+        return None
@@ -0,0 +1,37 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from eventos.arquivamento import TAMANHO_LOTE, arquivar_eventos, data_de_corte
+
+
+class Command(BaseCommand):
+    help = (
+        "Move eventos passados e as inscrições deles para as tabelas de arquivo, em lotes "
+        "confirmados um a um (pode ser interrompido e executado de novo)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dias', type=int, default=None,
+            help="Arquiva eventos que aconteceram há mais de N dias (padrão: ARQUIVAR_EVENTOS_APOS_DIAS).",
+        )
+        parser.add_argument('--antes-de', help="Data de corte (AAAA-MM-DD); tem precedência sobre --dias.")
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help="Eventos por transação.")
+        parser.add_argument('--max-lotes', type=int, default=None, help="Para depois de N lotes.")
+
+    def handle(self, *args, **options):
+        if options['antes_de']:
+            try:
+                antes_de = datetime.date.fromisoformat(options['antes_de'])
+            except ValueError:
+                raise CommandError("--antes-de deve estar no formato AAAA-MM-DD.")
+        else:
+            antes_de = data_de_corte(options['dias'])
+
+        eventos = inscricoes = 0
+        for lotes, eventos, inscricoes in arquivar_eventos(antes_de, options['lote'], options['max_lotes']):
+            self.stdout.write(f"Lote {lotes}: {eventos} evento(s), {inscricoes} inscrição(ões) até agora.")
+        self.stdout.write(self.style.SUCCESS(
+            f"{eventos} evento(s) anteriores a {antes_de:%d/%m/%Y} arquivado(s), com {inscricoes} inscrição(ões)."
+        ))
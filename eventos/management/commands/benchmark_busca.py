@@ -0,0 +1,69 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+
+from eventos import benchmark, busca
+
+CONSULTAS = (
+    'música',  # termo mais comum do vocabulário
+    'python',  # termo frequente
+    'espanhol',  # termo menos frequente
+    'festival teatro',  # dois termos
+    'tecno',  # prefixo
+    'curitiba',  # só no local
+    'xadrez robótica vinho',  # combinação rara
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Popula um banco de testes descartável com eventos sintéticos e mede a latência "
+        "(p50/p95) da primeira e da segunda página da busca textual."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--eventos', type=int, default=1_000_000)
+        parser.add_argument('--repeticoes', type=int, default=20)
+        parser.add_argument('--limite-ms', type=float, default=50.0, help="p95 máximo aceito por consulta.")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        nome_original = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        falhas = []
+        try:
+            self.stdout.write(f"Populando e indexando {options['eventos']} eventos ({connection.vendor})...")
+            inicio = time.perf_counter()
+            benchmark.popular_busca(options['eventos'])
+            self.stdout.write(f"Pronto em {time.perf_counter() - inicio:.1f} s.")
+            for termo in CONSULTAS:
+                primeira = busca.buscar(termo)
+                for nome, cursor in (('p1', None), ('p2', primeira.proximo_cursor)):
+                    if nome == 'p2' and cursor is None:
+                        continue
+                    p50, p95, consultas = self.medir(termo, cursor, options['repeticoes'])
+                    self.stdout.write(
+                        f"{termo + ' ' + nome:28} {consultas} consulta(s)  p50 {p50:7.2f} ms  p95 {p95:7.2f} ms"
+                    )
+                    if p95 > options['limite_ms']:
+                        falhas.append(f"{termo} ({nome}): p95 {p95:.1f} ms")
+        finally:
+            connection.creation.destroy_test_db(nome_original, verbosity=0)
+            teardown_test_environment()
+
+        if falhas:
+            raise CommandError(f"Acima de {options['limite_ms']:.0f} ms:\n" + "\n".join(falhas))
+        self.stdout.write(self.style.SUCCESS("Todas as buscas dentro do limite."))
+
+    def medir(self, termo, cursor, repeticoes):
+        tempos = []
+        for _ in range(repeticoes):
+            with CaptureQueriesContext(connection) as capturadas:
+                inicio = time.perf_counter()
+                busca.buscar(termo, cursor)
+                tempos.append((time.perf_counter() - inicio) * 1000)
+        tempos.sort()
+        return statistics.median(tempos), tempos[max(0, int(len(tempos) * 0.95) - 1)], len(capturadas)
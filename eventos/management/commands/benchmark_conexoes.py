@@ -0,0 +1,73 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara a latência por requisição abrindo uma conexão nova a cada "
+        "requisição (CONN_MAX_AGE=0), reaproveitando a conexão e, no PostgreSQL "
+        "com psycopg 3, usando o pool (DB_POOL)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requisicoes', type=int, default=200)
+        parser.add_argument('--url', default='/')
+
+    def configurar(self, conn_max_age, pool):
+        connection.close()
+        if getattr(connection, 'pool', None) is not None:
+            connection.close_pool()
+        opcoes = {chave: valor for chave, valor in connection.settings_dict['OPTIONS'].items() if chave != 'pool'}
+        if pool:
+            opcoes['pool'] = pool
+        connection.settings_dict['OPTIONS'] = opcoes
+        connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+
+    def medir(self, conn_max_age, pool, requisicoes, url):
+        self.configurar(conn_max_age, pool)
+        cliente = Client(SERVER_NAME='localhost')
+        cliente.get(url)
+        tempos = []
+        for _ in range(requisicoes):
+            inicio = time.perf_counter()
+            resposta = cliente.get(url)
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        if resposta.status_code != 200:
+            self.stderr.write(f"Aviso: {url} respondeu {resposta.status_code}.")
+        tempos.sort()
+        return statistics.mean(tempos), tempos[len(tempos) // 2], tempos[int(len(tempos) * 0.95) - 1]
+
+    def handle(self, *args, **options):
+        original = connection.settings_dict['CONN_MAX_AGE'], connection.settings_dict['OPTIONS']
+        # as opções do pool vêm de DB_POOL_*, se ligado; senão, os padrões do psycopg_pool
+        pool = original[1].get('pool') or True
+        modos = {
+            "Conexão nova por requisição": (0, None),
+            "Conexão persistente": (None, None),
+        }
+        if connection.vendor == 'postgresql' and connection.Database.__name__ == 'psycopg':
+            # o Django recusa pool com CONN_MAX_AGE diferente de 0
+            modos["Pool do psycopg"] = (0, pool)
+        else:
+            self.stderr.write("Pool não medido: requer PostgreSQL com psycopg 3.")
+        try:
+            resultados = {
+                modo: self.medir(conn_max_age, opcoes_pool, options['requisicoes'], options['url'])
+                for modo, (conn_max_age, opcoes_pool) in modos.items()
+            }
+        finally:
+            self.configurar(None, None)
+            connection.settings_dict['CONN_MAX_AGE'], connection.settings_dict['OPTIONS'] = original
+
+        self.stdout.write(f"{connection.vendor} - {options['requisicoes']} requisições a {options['url']}")
+        for modo, (media, p50, p95) in resultados.items():
+            self.stdout.write(f"{modo:30} média {media:7.2f} ms  p50 {p50:7.2f} ms  p95 {p95:7.2f} ms")
+        nova = resultados["Conexão nova por requisição"][0]
+        for modo in list(resultados)[1:]:
+            self.stdout.write(self.style.SUCCESS(
+                f"Ganho médio por requisição ({modo.lower()}): {nova - resultados[modo][0]:.2f} ms"
+            ))
@@ -0,0 +1,52 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from eventos.benchmark import caches_privados
+from eventos.limites import LimiteDeTaxaMiddleware
+
+
+class Command(BaseCommand):
+    help = "Mede, em microssegundos, quanto o limite de taxa acrescenta a cada requisição."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requisicoes', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        limitador = LimiteDeTaxaMiddleware(lambda request: HttpResponse())
+        fabrica = RequestFactory()
+        url_inscricao = reverse('evento-inscricao', args=[1])
+        total = options['requisicoes']
+
+        cenarios = (
+            ("rota sem limite (GET /)", lambda indice: fabrica.get('/')),
+            # um IP diferente por requisição: todo balde tem ficha
+            ("inscrição permitida", lambda indice: fabrica.post(
+                url_inscricao, REMOTE_ADDR=f'10.{indice >> 16 & 255}.{indice >> 8 & 255}.{indice & 255}'
+            )),
+            # sempre o mesmo IP: a partir da 6ª, 429
+            ("inscrição bloqueada (429)", lambda indice: fabrica.post(url_inscricao, REMOTE_ADDR='10.255.255.255')),
+        )
+        for nome, nova_requisicao in cenarios:
+            # cada cenário começa com os baldes vazios, num cache só deste processo
+            with caches_privados():
+                requisicoes = [nova_requisicao(indice) for indice in range(total)]
+                for requisicao in requisicoes:
+                    requisicao.resolver_match = resolve(requisicao.path_info)
+                tempos = []
+                for requisicao in requisicoes:
+                    correspondencia = requisicao.resolver_match
+                    inicio = time.perf_counter_ns()
+                    limitador.process_view(
+                        requisicao, correspondencia.func, correspondencia.args, correspondencia.kwargs
+                    )
+                    tempos.append((time.perf_counter_ns() - inicio) / 1000)
+            tempos.sort()
+            self.stdout.write(
+                f"{nome:28} média {statistics.fmean(tempos):6.1f} µs  p50 {tempos[len(tempos) // 2]:6.1f} µs  "
+                f"p99 {tempos[int(len(tempos) * 0.99)]:6.1f} µs"
+            )
@@ -0,0 +1,116 @@
+import itertools
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment,
+)
+from django.urls import reverse
+from django.utils import timezone
+
+from eventos import benchmark
+from eventos.models import Evento
+
+ARMAZENAMENTO_DE_MENSAGENS = {
+    # o padrão do Django: cookie, com a sessão como reserva
+    'banco': 'django.contrib.messages.storage.fallback.FallbackStorage',
+    'cache': 'django.contrib.messages.storage.cookie.CookieStorage',
+    'cookie': 'django.contrib.messages.storage.cookie.CookieStorage',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara os modos de sessão (SESSAO_MODO) em fluxos comuns: consultas por requisição, "
+        "quantas delas vão à tabela django_session e a latência."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticoes', type=int, default=50)
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        nome_original = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            # hash de senha rápido: a troca de senha mede a sessão, não o PBKDF2
+            with override_settings(
+                LIMITES_DE_TAXA={}, PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+            ), benchmark.caches_privados():
+                cenario = benchmark.popular(eventos=50, inscricoes=500)
+                self.stdout.write(f"{'modo':8} {'fluxo':26} {'consultas':>9} {'sessão':>7} {'p50 ms':>8}")
+                for modo, engine in settings.MODOS_DE_SESSAO.items():
+                    # cada modo começa com caches vazios, sem apagar o cache configurado
+                    with override_settings(
+                        SESSION_ENGINE=engine, MESSAGE_STORAGE=ARMAZENAMENTO_DE_MENSAGENS[modo],
+                    ), benchmark.caches_privados():
+                        for fluxo, resultado in self.medir_modo(cenario, options['repeticoes']):
+                            self.stdout.write(
+                                f"{modo:8} {fluxo:26} {resultado['consultas']:9.1f} {resultado['sessao']:7.1f} "
+                                f"{resultado['p50_ms']:8.2f}"
+                            )
+        finally:
+            connection.creation.destroy_test_db(nome_original, verbosity=0)
+            teardown_test_environment()
+
+    def medir_modo(self, cenario, repeticoes):
+        # cada modo começa da mesma senha, qualquer que seja a última troca do anterior
+        cenario.promotor.set_password(benchmark.SENHA)
+        cenario.promotor.save(update_fields=['password'])
+        # evento próprio e com folga: todas as inscrições do modo pegam vaga
+        evento = Evento.objects.create(
+            titulo="Evento das sessões", descricao="Benchmark", data=timezone.localdate(), local="Local",
+            capacidade_maxima=repeticoes + 1, criado_por=cenario.promotor,
+        )
+        contador = itertools.count()
+        senhas = itertools.cycle([benchmark.SENHA + '-nova', benchmark.SENHA])
+        senha_atual = [benchmark.SENHA]
+
+        def inscrever(cliente):
+            indice = next(contador)
+            cliente.post(reverse('evento-inscricao', args=[evento.pk]), {
+                'nome': f"Sessão {indice}", 'email': f'sessao{evento.pk}-{indice}@exemplo.com', 'telefone': '1', 'genero': 'O',
+            })
+            # a mensagem é lida e apagada na página seguinte
+            cliente.get(reverse('evento-list'))
+
+        def trocar_senha(cliente):
+            nova = next(senhas)
+            cliente.post(reverse('user-edit'), {
+                'email': cenario.promotor.email, 'old_password': senha_atual[0],
+                'new_password1': nova, 'new_password2': nova,
+            })
+            senha_atual[0] = nova
+            # update_session_auth_hash: continua logado depois da troca
+            resposta = cliente.get(reverse('user-edit'))
+            assert resposta.status_code == 200 and resposta.wsgi_request.user.is_authenticated
+
+        fluxos = [
+            ("listagem anônima", None, lambda cliente: cliente.get(reverse('evento-list'))),
+            ("listagem logada", cenario.promotor, lambda cliente: cliente.get(reverse('evento-list'))),
+            ("inscrição + redirect", None, inscrever),
+            ("participantes", cenario.promotor, lambda cliente: cliente.get(reverse('participantes-list'))),
+            ("troca de senha + redirect", cenario.promotor, trocar_senha),
+        ]
+        for nome, usuario, fluxo in fluxos:
+            cliente = Client()
+            if usuario is not None:
+                cliente.login(username=usuario.username, password=senha_atual[0])
+            fluxo(cliente)  # aquece caches e conexões
+            consultas, sessao, tempos = [], [], []
+            for _ in range(repeticoes):
+                with CaptureQueriesContext(connection) as capturadas:
+                    inicio = time.perf_counter()
+                    fluxo(cliente)
+                    tempos.append((time.perf_counter() - inicio) * 1000)
+                consultas.append(len(capturadas))
+                sessao.append(sum('django_session' in consulta['sql'] for consulta in capturadas))
+            yield nome, {
+                'consultas': statistics.fmean(consultas),
+                'sessao': statistics.fmean(sessao),
+                'p50_ms': statistics.median(tempos),
+            }
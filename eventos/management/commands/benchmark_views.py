@@ -0,0 +1,78 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from eventos import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Popula um banco de testes descartável com dados sintéticos, mede consultas e "
+        "latência (p50/p95) de todas as rotas e compara com a linha de base em JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--eventos', type=int, default=2000)
+        parser.add_argument('--inscricoes', type=int, default=200000)
+        parser.add_argument('--repeticoes', type=int, default=20)
+        parser.add_argument('--baseline', default=str(Path(settings.BASE_DIR) / 'benchmark_baseline.json'))
+        parser.add_argument('--salvar', action='store_true', help="Grava os resultados como nova linha de base.")
+        parser.add_argument(
+            '--tolerancia', type=float, default=1.5,
+            help="Falha se o p95 de uma rota passar de tolerância x p95 da linha de base.",
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        nome_original = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            # caches novos e só deste processo: o configurado (talvez compartilhado) fica intacto
+            with benchmark.caches_privados():
+                self.stdout.write(f"Populando {options['eventos']} eventos e {options['inscricoes']} inscrições...")
+                cenario = benchmark.popular(options['eventos'], options['inscricoes'])
+                resultados = {}
+                # as repetições vêm todas do mesmo IP; o limite de taxa tem benchmark próprio
+                with override_settings(LIMITES_DE_TAXA={}):
+                    for rota in benchmark.rotas(cenario):
+                        resultados[rota[0]] = benchmark.medir(rota, options['repeticoes'])
+                        self.stdout.write(f"{rota[0]:25} {self.formatar(resultados[rota[0]])}")
+        finally:
+            connection.creation.destroy_test_db(nome_original, verbosity=0)
+            teardown_test_environment()
+
+        falhas = [
+            f"{nome}: {resultado['consultas']} consultas (limite {resultado['limite_consultas']})"
+            for nome, resultado in resultados.items()
+            if resultado['consultas'] > resultado['limite_consultas']
+        ]
+
+        caminho = Path(options['baseline'])
+        if caminho.exists() and not options['salvar']:
+            linha_de_base = json.loads(caminho.read_text())['rotas']
+            for nome, resultado in resultados.items():
+                anterior = linha_de_base.get(nome)
+                if anterior and resultado['p95_ms'] > anterior['p95_ms'] * options['tolerancia']:
+                    falhas.append(f"{nome}: p95 {resultado['p95_ms']:.1f} ms (linha de base {anterior['p95_ms']:.1f} ms)")
+
+        if options['salvar']:
+            caminho.write_text(json.dumps({
+                'eventos': options['eventos'],
+                'inscricoes': options['inscricoes'],
+                'banco': connection.vendor,
+                'rotas': resultados,
+            }, indent=2, ensure_ascii=False) + '\n')
+            self.stdout.write(f"Linha de base gravada em {caminho}.")
+
+        if falhas:
+            raise CommandError("Regressões encontradas:\n" + "\n".join(falhas))
+        self.stdout.write(self.style.SUCCESS("Nenhuma regressão."))
+
+    def formatar(self, resultado):
+        return (
+            f"{resultado['consultas']:3} consultas  p50 {resultado['p50_ms']:8.2f} ms  p95 {resultado['p95_ms']:8.2f} ms"
+        )
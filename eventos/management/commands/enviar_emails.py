@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from eventos.emails import enviar_lote
+
+
+class Command(BaseCommand):
+    help = "Envia os e-mails pendentes da fila em lotes, reutilizando uma conexão SMTP por lote."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=50, help="Mensagens por lote.")
+        parser.add_argument('--max-tentativas', type=int, default=5, help="Tentativas antes de desistir.")
+        parser.add_argument('--continuo', action='store_true', help="Fica rodando e consultando a fila.")
+        parser.add_argument('--intervalo', type=float, default=5, help="Segundos entre consultas com a fila vazia.")
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                enviados, falhas = enviar_lote(options['lote'], options['max_tentativas'])
+            except Exception as erro:
+                if not options['continuo']:
+                    raise
+                # banco fora do ar, por exemplo: o worker espera e tenta de novo em vez de morrer
+                self.stderr.write(f"Erro ao processar a fila: {erro}")
+                close_old_connections()
+                time.sleep(options['intervalo'])
+                continue
+            if enviados or falhas:
+                self.stdout.write(f"{enviados} enviado(s), {falhas} falha(s).")
+                continue
+            if not options['continuo']:
+                break
+            time.sleep(options['intervalo'])
+        self.stdout.write(self.style.SUCCESS("Fila vazia."))
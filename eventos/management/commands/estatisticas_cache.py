@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from eventos import metricas
+
+
+class Command(BaseCommand):
+    help = "Mostra acertos e falhas do cache dos cards de eventos."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--zerar', action='store_true', help="Zera os contadores depois de mostrar.")
+
+    def handle(self, *args, **options):
+        metricas.descarregar()
+        valores = metricas.ler('cards_acertos', 'cards_falhas')
+        total = valores['cards_acertos'] + valores['cards_falhas']
+        taxa = valores['cards_acertos'] / total * 100 if total else 0
+        self.stdout.write(
+            f"Acertos: {valores['cards_acertos']}  Falhas: {valores['cards_falhas']}  Taxa de acerto: {taxa:.1f}%"
+        )
+        if options['zerar']:
+            metricas.zerar('cards_acertos', 'cards_falhas')
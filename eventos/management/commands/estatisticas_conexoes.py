@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from eventos import metricas
+from eventos.conexoes import CONTADORES
+
+
+class Command(BaseCommand):
+    help = "Mostra a configuração e os contadores de conexões com o banco."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--zerar', action='store_true', help="Zera os contadores depois de mostrar.")
+
+    def handle(self, *args, **options):
+        configuracao = connections['default'].settings_dict
+        pool = configuracao.get('OPTIONS', {}).get('pool')
+        self.stdout.write(f"CONN_MAX_AGE: {configuracao['CONN_MAX_AGE']}")
+        self.stdout.write(f"CONN_HEALTH_CHECKS: {configuracao['CONN_HEALTH_CHECKS']}")
+        self.stdout.write(f"Pool: {pool or 'desligado'}")
+
+        metricas.descarregar()
+        valores = metricas.ler(*CONTADORES)
+        requisicoes = valores['db_requisicoes']
+        abertas = valores['db_conexoes_abertas']
+        self.stdout.write(f"Requisições: {requisicoes}")
+        self.stdout.write(f"Conexões abertas (inclui reconexões): {abertas}")
+        if requisicoes:
+            reaproveitadas = max(requisicoes - abertas, 0) / requisicoes * 100
+            self.stdout.write(f"Requisições sem abrir conexão nova: {reaproveitadas:.1f}%")
+        if pool:
+            esperas = valores['db_pool_esperas']
+            espera_media = valores['db_pool_espera_ms'] / esperas if esperas else 0
+            self.stdout.write(f"Checkouts do pool: {valores['db_pool_checkouts']}")
+            self.stdout.write(f"Esperas por conexão: {esperas} (média {espera_media:.1f} ms)")
+            self.stdout.write(f"Erros ao obter conexão: {valores['db_pool_erros']}")
+            self.stdout.write(f"Conexões criadas pelo pool: {valores['db_pool_conexoes']}")
+            self.stdout.write(f"Conexões perdidas: {valores['db_pool_conexoes_perdidas']}")
+
+        if options['zerar']:
+            metricas.zerar(*CONTADORES)
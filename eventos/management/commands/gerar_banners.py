@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from eventos.imagens import processar_pendentes
+
+
+class Command(BaseCommand):
+    help = "Gera as versões reduzidas (JPEG e WebP) dos banners pendentes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=20, help="Eventos por lote.")
+        parser.add_argument('--continuo', action='store_true', help="Fica rodando e consultando os pendentes.")
+        parser.add_argument('--intervalo', type=float, default=5, help="Segundos entre consultas sem pendentes.")
+
+    def handle(self, *args, **options):
+        while True:
+            processados, falhas = processar_pendentes(options['lote'])
+            if processados:
+                self.stdout.write(f"{processados} banner(s) processado(s), {falhas} falha(s).")
+                continue
+            if not options['continuo']:
+                break
+            time.sleep(options['intervalo'])
+        self.stdout.write(self.style.SUCCESS("Nenhum banner pendente."))
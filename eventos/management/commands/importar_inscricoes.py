@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from eventos.importacao import TAMANHO_LOTE, ImportacaoInvalida, importar_inscricoes
+from eventos.models import Evento
+
+
+class Command(BaseCommand):
+    help = "Importa inscrições de um arquivo CSV (nome, email, telefone, genero) para um evento."
+
+    def add_arguments(self, parser):
+        parser.add_argument('evento', type=int, help="ID do evento.")
+        parser.add_argument('arquivo', help="Caminho do arquivo CSV em UTF-8.")
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help="Linhas gravadas por bulk_create.")
+
+    def handle(self, *args, **options):
+        try:
+            evento = Evento.objects.ativos().get(pk=options['evento'])
+        except Evento.DoesNotExist:
+            raise CommandError(f"Evento {options['evento']} não encontrado.")
+
+        try:
+            with open(options['arquivo'], encoding='utf-8-sig', newline='') as arquivo:
+                resultado = importar_inscricoes(evento, arquivo, tamanho_lote=options['lote'])
+        except (OSError, UnicodeDecodeError, ImportacaoInvalida) as erro:
+            raise CommandError(f"{erro} Nenhuma inscrição foi importada.")
+
+        for linha, mensagens in resultado.erros:
+            self.stderr.write(f"linha {linha}: {'; '.join(mensagens)}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultado.linhas} linha(s) lida(s): {resultado.importadas} importada(s), "
+            f"{resultado.ja_inscritas} já inscrita(s), {len(resultado.erros)} com erro."
+        ))
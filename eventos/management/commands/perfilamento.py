@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from eventos import metricas
+from eventos.perfilamento import FAIXAS, nome_da_faixa, nomes_de_rotas
+
+
+class Command(BaseCommand):
+    help = "Mostra os histogramas de tempo por rota coletados pelo PerfilamentoMiddleware."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--zerar', action='store_true', help="Zera os histogramas depois de mostrar.")
+
+    def handle(self, *args, **options):
+        metricas.descarregar()
+        faixas = [nome_da_faixa(limite) for limite in FAIXAS]
+        chaves = []
+        for view in sorted(set(nomes_de_rotas())):
+            nomes = [f'perf:{view}:{faixa}' for faixa in faixas]
+            nomes += [f'perf:{view}:total_us', f'perf:{view}:consultas', f'perf:{view}:duplicadas']
+            chaves.extend(nomes)
+            valores = metricas.ler(*nomes)
+            requisicoes = sum(valores[f'perf:{view}:{faixa}'] for faixa in faixas)
+            if not requisicoes:
+                continue
+            media = valores[f'perf:{view}:total_us'] / requisicoes / 1000
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{view}: {requisicoes} req, média {media:.1f} ms, "
+                f"{valores[f'perf:{view}:consultas'] / requisicoes:.1f} consultas/req, "
+                f"{valores[f'perf:{view}:duplicadas']} duplicadas"
+            ))
+            for faixa in faixas:
+                quantidade = valores[f'perf:{view}:{faixa}']
+                rotulo = f"<= {faixa} ms" if faixa != 'inf' else "> 2500 ms"
+                self.stdout.write(f"  {rotulo:>12} {quantidade:7} {'#' * round(40 * quantidade / requisicoes)}")
+        if options['zerar']:
+            metricas.zerar(*chaves)
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from eventos.exclusao import TAMANHO_LOTE, purgar_lote
+
+
+class Command(BaseCommand):
+    help = (
+        "Apaga, em lotes pequenos e transações curtas, as inscrições e depois as linhas dos eventos "
+        "excluídos, junto com os participantes que ficarem sem inscrição."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help="Linhas apagadas por transação.")
+        parser.add_argument('--pausa', type=float, default=0, help="Segundos de pausa entre lotes.")
+        parser.add_argument('--continuo', action='store_true', help="Fica rodando e aguardando novas exclusões.")
+        parser.add_argument('--intervalo', type=float, default=30, help="Segundos entre consultas sem exclusões.")
+
+    def handle(self, *args, **options):
+        eventos = linhas = participantes = 0
+        while True:
+            passo = purgar_lote(options['lote'])
+            if passo is not None:
+                evento_id, apagadas, orfaos, evento_apagado = passo
+                linhas += apagadas
+                participantes += orfaos
+                if evento_apagado:
+                    eventos += 1
+                    self.stdout.write(f"Evento {evento_id} purgado.")
+                if options['pausa']:
+                    # dá folga ao banco entre lotes
+                    time.sleep(options['pausa'])
+                continue
+            if not options['continuo']:
+                break
+            time.sleep(options['intervalo'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{eventos} evento(s) purgado(s): {linhas} inscrição(ões) e lugar(es) na fila e "
+            f"{participantes} participante(s) órfão(s) apagados."
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from eventos.models import Evento, InscricaoDiaria
+
+
+class Command(BaseCommand):
+    help = "Reconstrói os totais diários de inscrições (InscricaoDiaria) a partir da tabela de inscrições."
+
+    def add_arguments(self, parser):
+        parser.add_argument('eventos', nargs='*', type=int, help="IDs dos eventos (padrão: todos).")
+        parser.add_argument('--lote', type=int, default=500, help="Eventos recalculados por transação.")
+
+    def handle(self, *args, **options):
+        eventos_ids = options['eventos'] or list(Evento.objects.order_by('pk').values_list('pk', flat=True))
+        linhas = 0
+        for inicio in range(0, len(eventos_ids), options['lote']):
+            linhas += InscricaoDiaria.recalcular(eventos_ids[inicio:inicio + options['lote']])
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(eventos_ids)} evento(s) recalculado(s), {linhas} dia(s) com inscrições."
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from eventos.models import Evento
+
+
+class Command(BaseCommand):
+    help = "Recalcula o contador Evento.inscritos a partir da tabela de inscrições."
+
+    def add_arguments(self, parser):
+        parser.add_argument('eventos', nargs='*', type=int, help="IDs dos eventos (padrão: todos).")
+
+    def handle(self, *args, **options):
+        eventos_ids = options['eventos'] or None
+        total = Evento.recalcular_inscritos(eventos_ids)
+        self.stdout.write(self.style.SUCCESS(f"{total} evento(s) recalculado(s)."))
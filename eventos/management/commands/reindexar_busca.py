@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from eventos import busca
+
+
+class Command(BaseCommand):
+    help = "Reconstrói o índice de busca textual dos eventos (necessário após cargas com bulk_create)."
+
+    def handle(self, *args, **options):
+        total = busca.reconstruir()
+        self.stdout.write(self.style.SUCCESS(f"{total} evento(s) indexado(s)."))
@@ -0,0 +1,47 @@
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Dispara requisições concorrentes contra servidores já em execução e compara a vazão. "
+        "Ex.: suba SERVIDOR=wsgi PORT=8000 e SERVIDOR=asgi PORT=8001 com o mesmo WEB_CONCURRENCY e rode "
+        "`teste_carga http://127.0.0.1:8000/ http://127.0.0.1:8001/`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+')
+        parser.add_argument('--requisicoes', type=int, default=1000)
+        parser.add_argument('--concorrencia', type=int, default=50)
+        parser.add_argument('--timeout', type=float, default=30)
+
+    def requisitar(self, url, timeout):
+        inicio = time.perf_counter()
+        try:
+            with urllib.request.urlopen(url, timeout=timeout) as resposta:
+                resposta.read()
+                sucesso = resposta.status < 400
+        except (urllib.error.URLError, OSError):
+            sucesso = False
+        return sucesso, (time.perf_counter() - inicio) * 1000
+
+    def medir(self, url, requisicoes, concorrencia, timeout):
+        with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+            inicio = time.perf_counter()
+            resultados = list(executor.map(lambda _: self.requisitar(url, timeout), range(requisicoes)))
+            duracao = time.perf_counter() - inicio
+        tempos = sorted(tempo for _, tempo in resultados)
+        erros = sum(1 for sucesso, _ in resultados if not sucesso)
+        return requisicoes / duracao, statistics.median(tempos), tempos[int(len(tempos) * 0.95) - 1], erros
+
+    def handle(self, *args, **options):
+        for url in options['urls']:
+            vazao, p50, p95, erros = self.medir(url, options['requisicoes'], options['concorrencia'], options['timeout'])
+            self.stdout.write(
+                f"{url}: {vazao:8.1f} req/s  p50 {p50:8.1f} ms  p95 {p95:8.1f} ms  erros {erros}"
+            )
@@ -0,0 +1,74 @@
+import atexit
+import threading
+import time
+from collections import Counter
+
+from django.core.cache import caches
+
+# cache próprio (CACHES['metricas']), compartilhado pelos processos: os contadores
+# somados por cada worker são lidos pelos comandos de estatística em outro processo.
+# As somas são exatas só onde incr é atômico (Redis, Memcached); no FileBasedCache
+# padrão, descargas simultâneas de workers diferentes podem perder contagens
+ALIAS = 'metricas'
+PREFIXO = 'eventos:metrica:'
+# contadores ficam no processo e são somados no cache no máximo a cada INTERVALO
+# segundos, para não custar uma ida ao cache por incremento
+INTERVALO = 5
+
+_pendentes = Counter()
+_trava = threading.Lock()
+_ultimo_envio = time.monotonic()
+_agendado = None
+
+
+def incrementar(nome, quantidade=1):
+    global _agendado
+    with _trava:
+        _pendentes[nome] += quantidade
+        if time.monotonic() - _ultimo_envio < INTERVALO:
+            # sem novos incrementos, o que ficou pendente sai quando o intervalo passar
+            if _agendado is None:
+                _agendado = threading.Timer(INTERVALO, descarregar)
+                _agendado.daemon = True
+                _agendado.start()
+            return
+        pendentes = _retirar()
+    _somar_no_cache(pendentes)
+
+
+@atexit.register
+def descarregar():
+    global _agendado
+    with _trava:
+        _agendado = None
+        pendentes = _retirar()
+    _somar_no_cache(pendentes)
+
+
+def _retirar():
+    global _ultimo_envio
+    pendentes = dict(_pendentes)
+    _pendentes.clear()
+    _ultimo_envio = time.monotonic()
+    return pendentes
+
+
+def _somar_no_cache(pendentes):
+    cache = caches[ALIAS]
+    for nome, quantidade in pendentes.items():
+        chave = PREFIXO + nome
+        if cache.add(chave, quantidade, None):
+            continue
+        try:
+            cache.incr(chave, quantidade)
+        except ValueError:
+            cache.set(chave, quantidade, None)
+
+
+def ler(*nomes):
+    valores = caches[ALIAS].get_many([PREFIXO + nome for nome in nomes])
+    return {nome: valores.get(PREFIXO + nome, 0) for nome in nomes}
+
+
+def zerar(*nomes):
+    caches[ALIAS].delete_many([PREFIXO + nome for nome in nomes])
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:32
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def preencher_inscritos(apps, schema_editor):
+    Evento = apps.get_model('eventos', 'Evento')
+    Inscricao = apps.get_model('eventos', 'Inscricao')
+    contagem = Inscricao.objects.filter(evento=OuterRef('pk')).order_by().values('evento').annotate(
+        total=Count('pk')
+    ).values('total')
+    Evento.objects.using(schema_editor.connection.alias).update(inscritos=Coalesce(Subquery(contagem), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0005_alter_inscricao_feedback'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evento',
+            name='inscritos',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Inscritos'),
+        ),
+        migrations.RunPython(preencher_inscritos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0006_evento_inscritos'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['data', 'id'], name='evento_data_id_idx'),
+        ),
+    ]
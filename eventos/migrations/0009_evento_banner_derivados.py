@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def marcar_banners_existentes(apps, schema_editor):
+    Evento = apps.get_model('eventos', 'Evento')
+    Evento.objects.using(schema_editor.connection.alias).exclude(banner='').exclude(
+        banner__isnull=True
+    ).update(banner_pendente=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0008_emailpendente'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evento',
+            name='banner_derivados',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Derivados do banner'),
+        ),
+        migrations.AddField(
+            model_name='evento',
+            name='banner_pendente',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Banner aguardando processamento'),
+        ),
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(condition=models.Q(('banner_pendente', True)), fields=['id'], name='evento_banner_pendente_idx'),
+        ),
+        migrations.RunPython(marcar_banners_existentes, migrations.RunPython.noop),
+    ]
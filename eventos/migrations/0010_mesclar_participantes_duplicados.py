@@ -0,0 +1,92 @@
+from django.db import migrations, transaction
+from django.db.models import Count, Max, Min
+from django.db.models.functions import Lower, Trim
+
+TAMANHO_LOTE = 500
+
+
+def normalizar_emails(Participante, db):
+    ultimo = 0
+    while True:
+        ids = list(
+            Participante.objects.using(db).filter(pk__gt=ultimo).order_by('pk').values_list('pk', flat=True)[:TAMANHO_LOTE]
+        )
+        if not ids:
+            return
+        with transaction.atomic(using=db):
+            Participante.objects.using(db).filter(pk__in=ids).update(email=Lower(Trim('email')))
+        ultimo = ids[-1]
+
+
+def mesclar_participantes(apps, schema_editor):
+    Evento = apps.get_model('eventos', 'Evento')
+    Participante = apps.get_model('eventos', 'Participante')
+    Inscricao = apps.get_model('eventos', 'Inscricao')
+    db = schema_editor.connection.alias
+
+    normalizar_emails(Participante, db)
+
+    # cada lote roda na sua própria transação: se a migração for interrompida,
+    # basta rodá-la de novo para continuar de onde parou
+    while True:
+        duplicados = list(
+            Participante.objects.using(db).order_by().values('email').annotate(
+                total=Count('pk'), manter=Min('pk'), mais_recente=Max('pk')
+            ).filter(total__gt=1)[:TAMANHO_LOTE]
+        )
+        if not duplicados:
+            return
+        with transaction.atomic(using=db):
+            eventos_afetados = set()
+            for duplicado in duplicados:
+                manter = duplicado['manter']
+                outros = list(
+                    Participante.objects.using(db).filter(email=duplicado['email']).exclude(pk=manter)
+                    .order_by('pk').values_list('pk', flat=True)
+                )
+                eventos_do_mantido = set(
+                    Inscricao.objects.using(db).filter(participante_id=manter).values_list('evento_id', flat=True)
+                )
+                for outro in outros:
+                    # a mesma pessoa inscrita duas vezes no mesmo evento vira uma inscrição só,
+                    # sem perder o feedback da que sai
+                    repetidas = Inscricao.objects.using(db).filter(
+                        participante_id=outro, evento_id__in=eventos_do_mantido
+                    )
+                    for evento_id, feedback in repetidas.exclude(feedback__isnull=True).exclude(feedback='') \
+                            .values_list('evento_id', 'feedback'):
+                        mantida = Inscricao.objects.using(db).get(participante_id=manter, evento_id=evento_id)
+                        if not mantida.feedback:
+                            mantida.feedback = feedback
+                        elif feedback not in mantida.feedback:
+                            mantida.feedback = f"{mantida.feedback}\n\n{feedback}"
+                        mantida.save(update_fields=['feedback'])
+                    eventos_afetados.update(repetidas.values_list('evento_id', flat=True))
+                    repetidas.delete()
+                    movidas = Inscricao.objects.using(db).filter(participante_id=outro)
+                    eventos_do_mantido.update(movidas.values_list('evento_id', flat=True))
+                    movidas.update(participante_id=manter)
+
+                # os dados mais recentes (nome, telefone, gênero) prevalecem
+                recente = Participante.objects.using(db).get(pk=duplicado['mais_recente'])
+                Participante.objects.using(db).filter(pk=manter).update(
+                    nome=recente.nome, telefone=recente.telefone, genero=recente.genero
+                )
+                Participante.objects.using(db).filter(pk__in=outros).delete()
+
+            for evento_id in eventos_afetados:
+                Evento.objects.using(db).filter(pk=evento_id).update(
+                    inscritos=Inscricao.objects.using(db).filter(evento_id=evento_id).count()
+                )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('eventos', '0009_evento_banner_derivados'),
+    ]
+
+    operations = [
+        migrations.RunPython(mesclar_participantes, migrations.RunPython.noop),
+    ]
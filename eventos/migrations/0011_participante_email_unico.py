@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0010_mesclar_participantes_duplicados'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='participante',
+            name='email',
+            field=models.EmailField(max_length=254, unique=True, verbose_name='E-mail'),
+        ),
+    ]
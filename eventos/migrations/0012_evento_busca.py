@@ -0,0 +1,47 @@
+from django.db import migrations
+
+DOCUMENTO_POSTGRES = (
+    "setweight(to_tsvector('portuguese', coalesce(titulo, '')), 'A') || "
+    "setweight(to_tsvector('portuguese', coalesce(local, '')), 'B') || "
+    "setweight(to_tsvector('portuguese', coalesce(descricao, '')), 'C')"
+)
+
+
+def criar_indice_de_busca(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE TABLE eventos_evento_busca (evento_id bigint PRIMARY KEY, documento tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX eventos_evento_busca_gin ON eventos_evento_busca USING gin (documento)"
+        )
+        schema_editor.execute(
+            f"INSERT INTO eventos_evento_busca (evento_id, documento) SELECT id, {DOCUMENTO_POSTGRES} FROM eventos_evento"
+        )
+    elif vendor == 'sqlite':
+        # remove_diacritics: "musica" encontra "música"
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE eventos_evento_busca USING fts5("
+            "titulo, descricao, local, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            "INSERT INTO eventos_evento_busca (rowid, titulo, descricao, local) "
+            "SELECT id, titulo, descricao, local FROM eventos_evento"
+        )
+
+
+def remover_indice_de_busca(apps, schema_editor):
+    if schema_editor.connection.vendor in ('postgresql', 'sqlite'):
+        schema_editor.execute("DROP TABLE IF EXISTS eventos_evento_busca")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0011_participante_email_unico'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice_de_busca, remover_indice_de_busca),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+
+
+def preencher_inscricoes_diarias(apps, schema_editor):
+    Inscricao = apps.get_model('eventos', 'Inscricao')
+    InscricaoDiaria = apps.get_model('eventos', 'InscricaoDiaria')
+    alias = schema_editor.connection.alias
+    linhas = Inscricao.objects.using(alias).annotate(dia=TruncDate('data_inscricao')).order_by().values(
+        'evento_id', 'dia'
+    ).annotate(
+        total=Count('pk'),
+        masculino=Count('pk', filter=Q(participante__genero='M')),
+        feminino=Count('pk', filter=Q(participante__genero='F')),
+        outro=Count('pk', filter=Q(participante__genero='O')),
+        sem_genero=Count('pk', filter=~Q(participante__genero__in=['M', 'F', 'O'])),
+    )
+    InscricaoDiaria.objects.using(alias).bulk_create(
+        (InscricaoDiaria(**linha) for linha in linhas.iterator()), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0013_evento_atualizado_em'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InscricaoDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia', models.DateField(verbose_name='Dia')),
+                ('total', models.IntegerField(default=0, verbose_name='Inscrições')),
+                ('masculino', models.IntegerField(default=0, verbose_name='Masculino')),
+                ('feminino', models.IntegerField(default=0, verbose_name='Feminino')),
+                ('outro', models.IntegerField(default=0, verbose_name='Outro')),
+                ('sem_genero', models.IntegerField(default=0, verbose_name='Gênero não informado')),
+                ('evento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inscricoes_diarias', to='eventos.evento', verbose_name='Evento')),
+            ],
+            options={
+                'verbose_name': 'Inscrições do dia',
+                'verbose_name_plural': 'Inscrições por dia',
+                'ordering': ['dia'],
+                'constraints': [models.UniqueConstraint(fields=('evento', 'dia'), name='inscricao_diaria_evento_dia_uniq')],
+            },
+        ),
+        migrations.RunPython(preencher_inscricoes_diarias, migrations.RunPython.noop),
+    ]
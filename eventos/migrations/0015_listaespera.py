@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0014_inscricaodiaria'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evento',
+            name='ultima_posicao_espera',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Última posição da lista de espera'),
+        ),
+        migrations.CreateModel(
+            name='ListaEspera',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('posicao', models.PositiveIntegerField(verbose_name='Posição')),
+                ('entrou_em', models.DateTimeField(auto_now_add=True, verbose_name='Entrou em')),
+                ('evento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lista_espera', to='eventos.evento', verbose_name='Evento')),
+                ('participante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='listas_espera', to='eventos.participante', verbose_name='Participante')),
+            ],
+            options={
+                'verbose_name': 'Lista de espera',
+                'verbose_name_plural': 'Listas de espera',
+                'ordering': ['evento', 'posicao'],
+                'constraints': [models.UniqueConstraint(fields=('evento', 'posicao'), name='lista_espera_evento_posicao_uniq'), models.UniqueConstraint(fields=('evento', 'participante'), name='lista_espera_evento_participante_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0015_listaespera'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoArquivado',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('titulo', models.CharField(max_length=200, verbose_name='Título')),
+                ('descricao', models.TextField(verbose_name='Descrição')),
+                ('data', models.DateField(verbose_name='Data do evento')),
+                ('local', models.CharField(max_length=200, verbose_name='Local do evento')),
+                ('capacidade_maxima', models.PositiveIntegerField(verbose_name='Capacidade máxima de participantes')),
+                ('banner', models.CharField(blank=True, max_length=100, verbose_name='Banner do evento')),
+                ('criado_em', models.DateTimeField(verbose_name='Criado em')),
+                ('inscritos', models.PositiveIntegerField(default=0, verbose_name='Inscritos')),
+                ('arquivado_em', models.DateTimeField(verbose_name='Arquivado em')),
+                ('criado_por', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='eventos_arquivados', to=settings.AUTH_USER_MODEL, verbose_name='Criado por')),
+            ],
+            options={
+                'verbose_name': 'Evento arquivado',
+                'verbose_name_plural': 'Eventos arquivados',
+                'ordering': ['-data', '-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='InscricaoArquivada',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('nome', models.CharField(max_length=100, verbose_name='Nome')),
+                ('email', models.EmailField(max_length=254, verbose_name='E-mail')),
+                ('telefone', models.CharField(max_length=20, verbose_name='Telefone')),
+                ('genero', models.CharField(blank=True, choices=[('M', 'Masculino'), ('F', 'Feminino'), ('O', 'Outro')], max_length=1, null=True, verbose_name='Gênero')),
+                ('data_inscricao', models.DateTimeField(verbose_name='Data da inscrição')),
+                ('feedback', models.TextField(blank=True, null=True, verbose_name='Feedback')),
+                ('evento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inscricoes', to='eventos.eventoarquivado', verbose_name='Evento')),
+            ],
+            options={
+                'verbose_name': 'Inscrição arquivada',
+                'verbose_name_plural': 'Inscrições arquivadas',
+                'ordering': ['data_inscricao'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='eventoarquivado',
+            index=models.Index(fields=['data', 'id'], name='evento_arquivado_data_id_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0016_arquivo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evento',
+            name='excluido',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Excluído'),
+        ),
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(condition=models.Q(('excluido', False)), fields=['data', 'id'], name='evento_ativo_data_id_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='evento',
+            name='evento_data_id_idx',
+        ),
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(condition=models.Q(('excluido', True)), fields=['id'], name='evento_excluido_idx'),
+        ),
+    ]
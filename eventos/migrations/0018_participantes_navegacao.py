@@ -0,0 +1,50 @@
+import django.db.models.deletion
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+def copiar_promotor(apps, schema_editor):
+    Evento = apps.get_model('eventos', 'Evento')
+    Inscricao = apps.get_model('eventos', 'Inscricao')
+    Inscricao.objects.using(schema_editor.connection.alias).update(
+        promotor=models.Subquery(Evento.objects.filter(pk=models.OuterRef('evento_id')).values('criado_por')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0017_evento_excluido'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inscricao',
+            name='promotor',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='inscricoes_recebidas', to=settings.AUTH_USER_MODEL, verbose_name='Promotor'),
+        ),
+        migrations.RunPython(copiar_promotor, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='inscricao',
+            name='promotor',
+            field=models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='inscricoes_recebidas', to=settings.AUTH_USER_MODEL, verbose_name='Promotor'),
+        ),
+        migrations.AddIndex(
+            model_name='inscricao',
+            index=models.Index(fields=['promotor', 'data_inscricao', 'id'], name='inscricao_promotor_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inscricao',
+            index=models.Index(fields=['evento', 'data_inscricao', 'id'], name='inscricao_evento_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inscricao',
+            index=models.Index(condition=models.Q(('feedback__gt', '')), fields=['promotor', 'data_inscricao', 'id'], name='inscricao_com_feedback_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='participante',
+            index=models.Index(django.db.models.functions.text.Lower('nome'), name='participante_nome_lower_idx'),
+        ),
+    ]
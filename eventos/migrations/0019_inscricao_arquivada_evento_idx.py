@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventos', '0018_participantes_navegacao'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inscricaoarquivada',
+            index=models.Index(fields=['evento', 'data_inscricao', 'id'], name='inscricao_arquivada_evento_idx'),
+        ),
+    ]
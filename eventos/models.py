@@ -1,6 +1,19 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Lower, TruncDate
+from django.utils import timezone
 from django.contrib.auth.models import User
 
+class EventoLotado(Exception):
+    pass
+
+
+class EventoQuerySet(models.QuerySet):
+    def ativos(self):
+        # eventos excluídos somem na hora; as linhas saem depois, pelo purgar_eventos_excluidos
+        return self.filter(excluido=False)
+
+
 class Evento(models.Model):
     titulo = models.CharField(
         max_length=200,
@@ -27,6 +40,19 @@ class Evento(models.Model):
         null=True ,
         verbose_name="Banner do evento"
     )
+    # versões reduzidas do banner por formato e largura, geradas pelo comando
+    # gerar_banners: {"jpeg": {"400": "banners/derivados/..."}, "webp": {...}}
+    banner_derivados = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name="Derivados do banner"
+    )
+    banner_pendente = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name="Banner aguardando processamento"
+    )
     criado_por = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -37,22 +63,95 @@ class Evento(models.Model):
         auto_now_add=True,
         verbose_name="Criado em"
     )
+    # contador desnormalizado de inscrições, mantido por Inscricao.save,
+    # pelo sinal post_delete e por InscricaoQuerySet.bulk_create
+    inscritos = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Inscritos"
+    )
+    # última posição entregue na lista de espera; o UPDATE que a incrementa
+    # trava a linha do evento, então duas entradas nunca recebem a mesma posição
+    ultima_posicao_espera = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Última posição da lista de espera"
+    )
+    # exclusão lógica: a view só marca o evento, e as inscrições dele são
+    # apagadas em lotes pelo comando purgar_eventos_excluidos
+    excluido = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name="Excluído"
+    )
+    # toda mudança que altera o que as listagens mostram (edição, inscrições,
+    # feedback, banner processado) atualiza este campo; é a base dos ETags
+    atualizado_em = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name="Atualizado em"
+    )
+
+    objects = EventoQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Evento"
         verbose_name_plural = "Eventos"
         ordering = ['-data']
+        indexes = [
+            # todas as listagens filtram os ativos: os excluídos nem entram no índice
+            models.Index(fields=['data', 'id'], condition=Q(excluido=False), name='evento_ativo_data_id_idx'),
+            models.Index(fields=['id'], condition=Q(banner_pendente=True), name='evento_banner_pendente_idx'),
+            models.Index(fields=['id'], condition=Q(excluido=True), name='evento_excluido_idx'),
+        ]
 
     def __str__(self):
         return f"{self.titulo} - {self.local}"
 
+    def _banner_srcset(self, formato):
+        return ', '.join(
+            f"{self.banner.storage.url(nome)} {largura}w"
+            for largura, nome in self.banner_derivados.get(formato, {}).items()
+        )
+
+    @property
+    def banner_srcset_jpeg(self):
+        return self._banner_srcset('jpeg')
+
+    @property
+    def banner_srcset_webp(self):
+        return self._banner_srcset('webp')
+
+    @property
+    def banner_card_url(self):
+        jpeg = self.banner_derivados.get('jpeg')
+        if not jpeg:
+            return self.banner.url
+        return self.banner.storage.url(jpeg[min(jpeg, key=int)])
+
+    @property
+    def esgotado(self):
+        return self.inscritos >= self.capacidade_maxima
+
+    @staticmethod
+    def recalcular_inscritos(eventos_ids=None, using=None):
+        contagem = Inscricao.objects.filter(evento=OuterRef('pk')).order_by().values('evento').annotate(
+            total=Count('pk')
+        ).values('total')
+        eventos = Evento.objects.db_manager(using).all()
+        if eventos_ids is not None:
+            eventos = eventos.filter(pk__in=eventos_ids)
+        return eventos.update(inscritos=Coalesce(Subquery(contagem), 0), atualizado_em=timezone.now())
+
 
 class Participante(models.Model):
     nome = models.CharField(
         max_length=100,
         verbose_name="Nome"
     )
+    # identifica a pessoa: e-mail normalizado e único, reaproveitado em todas as inscrições
     email = models.EmailField(
+        unique=True,
         verbose_name="E-mail"
     )
     telefone = models.CharField(
@@ -76,10 +175,55 @@ class Participante(models.Model):
         verbose_name = "Participante"
         verbose_name_plural = "Participantes"
         ordering = ['nome']
+        indexes = [
+            # busca por prefixo do nome sem diferenciar maiúsculas (Inscricao.objects.com_prefixo)
+            models.Index(Lower('nome'), name='participante_nome_lower_idx'),
+        ]
 
     def __str__(self):
         return self.nome
 
+    @staticmethod
+    def normalizar_email(email):
+        return (email or '').strip().lower()
+
+    def save(self, *args, **kwargs):
+        self.email = self.normalizar_email(self.email)
+        super().save(*args, **kwargs)
+
+
+class InscricaoQuerySet(models.QuerySet):
+    def do_promotor(self, usuario):
+        return self.filter(promotor=usuario, evento__excluido=False).select_related('participante', 'evento')
+
+    def com_prefixo(self, texto):
+        # nome ou e-mail do participante começando com o texto; intervalos em vez de
+        # LIKE usam os índices de email e de lower(nome) em qualquer banco
+        texto = (texto or '').strip().lower()
+        fim = texto + '\U0010ffff'
+        return self.alias(nome_minusculo=Lower('participante__nome')).filter(
+            Q(participante__email__gte=texto, participante__email__lt=fim)
+            | Q(nome_minusculo__gte=texto, nome_minusculo__lt=fim)
+        )
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        sem_promotor = {obj.evento_id for obj in objs if obj.promotor_id is None}
+        if sem_promotor:
+            promotores = dict(
+                Evento.objects.using(self.db).filter(pk__in=sem_promotor).values_list('pk', 'criado_por_id')
+            )
+            for obj in objs:
+                if obj.promotor_id is None:
+                    obj.promotor_id = promotores.get(obj.evento_id)
+        with transaction.atomic(using=self.db, savepoint=False):
+            criados = super().bulk_create(objs, *args, **kwargs)
+            # com ignore_conflicts não sabemos quais linhas entraram, então recontamos
+            eventos_ids = {obj.evento_id for obj in objs}
+            Evento.recalcular_inscritos(eventos_ids, using=self.db)
+            InscricaoDiaria.recalcular(eventos_ids, using=self.db)
+        return criados
+
 
 class Inscricao(models.Model):
     evento = models.ForeignKey(
@@ -94,6 +238,15 @@ class Inscricao(models.Model):
         related_name='inscricoes',
         verbose_name="Participante"
     )
+    # cópia de evento.criado_por: a lista do promotor filtra e ordena num índice só
+    promotor = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        editable=False,
+        db_index=False,  # coberto pelo índice (promotor, data_inscricao, id)
+        related_name='inscricoes_recebidas',
+        verbose_name="Promotor"
+    )
     data_inscricao = models.DateTimeField(
         auto_now_add=True,
         verbose_name="Data da inscrição"
@@ -105,11 +258,271 @@ class Inscricao(models.Model):
         help_text="Mensagem de feedback do participante."
     )
 
+    objects = InscricaoQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Inscrição"
         verbose_name_plural = "Inscrições"
         ordering = ['-data_inscricao']
         unique_together = ('evento', 'participante')  # evita duplicidade
+        indexes = [
+            # páginas da lista de participantes: por promotor, por evento e só com feedback
+            models.Index(fields=['promotor', 'data_inscricao', 'id'], name='inscricao_promotor_data_idx'),
+            models.Index(fields=['evento', 'data_inscricao', 'id'], name='inscricao_evento_data_idx'),
+            models.Index(
+                fields=['promotor', 'data_inscricao', 'id'], condition=Q(feedback__gt=''),
+                name='inscricao_com_feedback_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.participante.nome} inscrito em {self.evento.titulo}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            with transaction.atomic(using=kwargs.get('using')):
+                super().save(*args, **kwargs)
+                # o feedback aparece na lista de participantes do promotor
+                Evento.objects.using(kwargs.get('using')).filter(pk=self.evento_id).update(
+                    atualizado_em=timezone.now()
+                )
+            return
+        if self.promotor_id is None:
+            self.promotor_id = self.evento.criado_por_id
+        with transaction.atomic(using=kwargs.get('using')):
+            # decremento condicional das vagas: o UPDATE trava só a linha deste evento
+            # e falha se outra transação ocupou a última vaga antes
+            reservado = Evento.objects.using(kwargs.get('using')).filter(
+                pk=self.evento_id, inscritos__lt=F('capacidade_maxima')
+            ).update(inscritos=F('inscritos') + 1, atualizado_em=timezone.now())
+            if not reservado:
+                raise EventoLotado(self.evento_id)
+            super().save(*args, **kwargs)
+            InscricaoDiaria.registrar(
+                self.evento_id, timezone.localdate(self.data_inscricao), self.participante.genero, 1,
+                using=kwargs.get('using'),
+            )
+
+
+class InscricaoDiaria(models.Model):
+    """
+    Totais de inscrições por evento e por dia, mantidos a cada inscrição e
+    cancelamento; os painéis leem só estas linhas, nunca as inscrições.
+    """
+
+    evento = models.ForeignKey(
+        Evento,
+        on_delete=models.CASCADE,
+        related_name='inscricoes_diarias',
+        verbose_name="Evento"
+    )
+    dia = models.DateField(
+        verbose_name="Dia"
+    )
+    # IntegerField e não Positive: se o gênero do participante mudou entre a
+    # inscrição e o cancelamento, o total dele pode ficar negativo até o recálculo
+    total = models.IntegerField(default=0, verbose_name="Inscrições")
+    masculino = models.IntegerField(default=0, verbose_name="Masculino")
+    feminino = models.IntegerField(default=0, verbose_name="Feminino")
+    outro = models.IntegerField(default=0, verbose_name="Outro")
+    sem_genero = models.IntegerField(default=0, verbose_name="Gênero não informado")
+
+    CAMPO_POR_GENERO = {'M': 'masculino', 'F': 'feminino', 'O': 'outro'}
+
+    class Meta:
+        verbose_name = "Inscrições do dia"
+        verbose_name_plural = "Inscrições por dia"
+        ordering = ['dia']
+        constraints = [
+            models.UniqueConstraint(fields=['evento', 'dia'], name='inscricao_diaria_evento_dia_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.evento_id} em {self.dia}: {self.total}"
+
+    @classmethod
+    def registrar(cls, evento_id, dia, genero, quantidade, using=None):
+        # quem chama já travou a linha do evento, então não há corrida na criação do dia
+        campo = cls.CAMPO_POR_GENERO.get(genero, 'sem_genero')
+        alterados = cls.objects.using(using).filter(evento_id=evento_id, dia=dia).update(
+            total=F('total') + quantidade, **{campo: F(campo) + quantidade}
+        )
+        if not alterados and quantidade > 0:
+            cls.objects.using(using).create(evento_id=evento_id, dia=dia, total=quantidade, **{campo: quantidade})
+
+    @classmethod
+    def recalcular(cls, eventos_ids=None, using=None):
+        inscricoes = Inscricao.objects.db_manager(using).all()
+        diarias = cls.objects.using(using).all()
+        if eventos_ids is not None:
+            inscricoes = inscricoes.filter(evento_id__in=eventos_ids)
+            diarias = diarias.filter(evento_id__in=eventos_ids)
+        genero = 'participante__genero'
+        linhas = inscricoes.annotate(dia=TruncDate('data_inscricao')).order_by().values('evento_id', 'dia').annotate(
+            total=Count('pk'),
+            masculino=Count('pk', filter=Q(**{genero: 'M'})),
+            feminino=Count('pk', filter=Q(**{genero: 'F'})),
+            outro=Count('pk', filter=Q(**{genero: 'O'})),
+            sem_genero=Count('pk', filter=~Q(**{f'{genero}__in': ['M', 'F', 'O']})),
+        )
+        with transaction.atomic(using=using):
+            diarias.delete()
+            return len(cls.objects.using(using).bulk_create(cls(**linha) for linha in linhas))
+
+
+class ListaEspera(models.Model):
+    evento = models.ForeignKey(
+        Evento,
+        on_delete=models.CASCADE,
+        related_name='lista_espera',
+        verbose_name="Evento"
+    )
+    participante = models.ForeignKey(
+        Participante,
+        on_delete=models.CASCADE,
+        related_name='listas_espera',
+        verbose_name="Participante"
+    )
+    # crescente por evento e nunca reaproveitada: a fila anda por ordem de posição
+    posicao = models.PositiveIntegerField(
+        verbose_name="Posição"
+    )
+    entrou_em = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Entrou em"
+    )
+
+    class Meta:
+        verbose_name = "Lista de espera"
+        verbose_name_plural = "Listas de espera"
+        ordering = ['evento', 'posicao']
+        constraints = [
+            # o índice desta restrição é o que acha o primeiro da fila
+            models.UniqueConstraint(fields=['evento', 'posicao'], name='lista_espera_evento_posicao_uniq'),
+            models.UniqueConstraint(fields=['evento', 'participante'], name='lista_espera_evento_participante_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.participante_id} na posição {self.posicao} de {self.evento_id}"
+
+
+class EventoArquivado(models.Model):
+    """
+    Evento passado retirado da tabela quente pelo comando arquivar_eventos.
+    Mantém o id original; só leitura depois de arquivado.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    titulo = models.CharField(max_length=200, verbose_name="Título")
+    descricao = models.TextField(verbose_name="Descrição")
+    data = models.DateField(verbose_name="Data do evento")
+    local = models.CharField(max_length=200, verbose_name="Local do evento")
+    capacidade_maxima = models.PositiveIntegerField(verbose_name="Capacidade máxima de participantes")
+    # caminho no storage: os arquivos do banner continuam onde estavam
+    banner = models.CharField(max_length=100, blank=True, verbose_name="Banner do evento")
+    criado_por = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='eventos_arquivados',
+        verbose_name="Criado por"
+    )
+    criado_em = models.DateTimeField(verbose_name="Criado em")
+    inscritos = models.PositiveIntegerField(default=0, verbose_name="Inscritos")
+    arquivado_em = models.DateTimeField(verbose_name="Arquivado em")
+
+    class Meta:
+        verbose_name = "Evento arquivado"
+        verbose_name_plural = "Eventos arquivados"
+        ordering = ['-data', '-id']
+        indexes = [
+            models.Index(fields=['data', 'id'], name='evento_arquivado_data_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.titulo} - {self.local}"
+
+
+class InscricaoArquivada(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    evento = models.ForeignKey(
+        EventoArquivado,
+        on_delete=models.CASCADE,
+        related_name='inscricoes',
+        verbose_name="Evento"
+    )
+    # cópia dos dados do participante: o arquivo não depende de Participante,
+    # que pode mudar ou ser apagado depois
+    nome = models.CharField(max_length=100, verbose_name="Nome")
+    email = models.EmailField(verbose_name="E-mail")
+    telefone = models.CharField(max_length=20, verbose_name="Telefone")
+    genero = models.CharField(
+        max_length=1,
+        choices=Participante.GENERO_CHOICES,
+        blank=True,
+        null=True,
+        verbose_name="Gênero"
+    )
+    data_inscricao = models.DateTimeField(verbose_name="Data da inscrição")
+    feedback = models.TextField(blank=True, null=True, verbose_name="Feedback")
+
+    class Meta:
+        verbose_name = "Inscrição arquivada"
+        verbose_name_plural = "Inscrições arquivadas"
+        ordering = ['data_inscricao']
+        indexes = [
+            # páginas de participantes do evento arquivado (EventoArquivadoDetailView)
+            models.Index(fields=['evento', 'data_inscricao', 'id'], name='inscricao_arquivada_evento_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.nome} inscrito em {self.evento_id}"
+
+
+class EmailPendente(models.Model):
+    destinatario = models.EmailField(
+        verbose_name="Destinatário"
+    )
+    assunto = models.CharField(
+        max_length=200,
+        verbose_name="Assunto"
+    )
+    corpo = models.TextField(
+        verbose_name="Corpo"
+    )
+    criado_em = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Criado em"
+    )
+    tentativas = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name="Tentativas"
+    )
+    proxima_tentativa = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Próxima tentativa"
+    )
+    enviado_em = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name="Enviado em"
+    )
+    erro = models.TextField(
+        blank=True,
+        verbose_name="Último erro"
+    )
+
+    class Meta:
+        verbose_name = "E-mail pendente"
+        verbose_name_plural = "E-mails pendentes"
+        ordering = ['proxima_tentativa']
+        indexes = [
+            # a fila só olha para o que ainda não saiu
+            models.Index(
+                fields=['proxima_tentativa'],
+                condition=Q(enviado_em__isnull=True),
+                name='email_pendente_fila_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.assunto} -> {self.destinatario}"
@@ -0,0 +1,117 @@
+import base64
+import binascii
+import datetime
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+# maior id que cabe num BIGINT; acima disso o banco recusaria o parâmetro
+MAX_PK = 2 ** 63 - 1
+
+
+class PaginaKeyset:
+    def __init__(self, itens, proximo_cursor=None):
+        self.itens = itens
+        self.proximo_cursor = proximo_cursor
+
+    @property
+    def tem_proxima(self):
+        return self.proximo_cursor is not None
+
+
+class CodificadorDoCursor(DjangoJSONEncoder):
+    # o DjangoJSONEncoder corta datas e horas nos milissegundos; o cursor precisa do
+    # valor exato, senão linhas no mesmo milissegundo repetem ou somem entre páginas
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def codificar_cursor(valor, pk):
+    dados = json.dumps([valor, pk], cls=CodificadorDoCursor, separators=(',', ':'))
+    return base64.urlsafe_b64encode(dados.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        dados = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        valor, pk = json.loads(dados)
+    except (binascii.Error, ValueError, TypeError):
+        # cursor adulterado ou truncado: volta para a primeira página
+        return None
+    if not isinstance(pk, int) or isinstance(pk, bool) or not 0 <= pk <= MAX_PK:
+        return None
+    return valor, pk
+
+
+def _campo_do_modelo(modelo, campo):
+    partes = campo.split('__')
+    for parte in partes[:-1]:
+        modelo = modelo._meta.get_field(parte).related_model
+    return modelo._meta.get_field(partes[-1])
+
+
+def _posicao_do_cursor(modelo, campo, cursor):
+    posicao = decodificar_cursor(cursor)
+    if posicao is None:
+        return None
+    valor, pk = posicao
+    # o JSON pode trazer qualquer tipo: convertido pelo campo da ordenação ou, se
+    # não servir, tratado como cursor adulterado (primeira página)
+    try:
+        valor = _campo_do_modelo(modelo, campo).to_python(valor)
+    except (ValidationError, TypeError, ValueError):
+        return None
+    if valor is None:
+        return None
+    return valor, pk
+
+
+def _valor_do_campo(obj, campo):
+    if isinstance(obj, dict):
+        # linhas de values(): o id vem na chave 'id'
+        return obj['id' if campo == 'pk' else campo]
+    for parte in campo.split('__'):
+        obj = getattr(obj, parte)
+    return obj
+
+
+def _ordenar_a_partir_do_cursor(queryset, campo, cursor, descendente):
+    # paginação por (campo, id): cada página é uma busca no índice composto,
+    # sem OFFSET, então o custo não cresce com o número da página
+    posicao = _posicao_do_cursor(queryset.model, campo, cursor)
+    if posicao is not None:
+        valor, pk = posicao
+        operador = 'lt' if descendente else 'gt'
+        # o intervalo "campo <= valor" repetido fora do OR deixa o banco percorrer o
+        # índice do campo em ordem, inclusive quando o campo vem de uma junção
+        queryset = queryset.filter(
+            Q(**{f'{campo}__{operador}e': valor}),
+            Q(**{f'{campo}__{operador}': valor}) | Q(**{f'pk__{operador}': pk}),
+        )
+    if descendente:
+        return queryset.order_by(f'-{campo}', '-pk')
+    return queryset.order_by(campo, 'pk')
+
+
+def _montar_pagina(itens, campo, tamanho):
+    if len(itens) <= tamanho:
+        return PaginaKeyset(itens)
+    itens = itens[:tamanho]
+    ultimo = itens[-1]
+    return PaginaKeyset(itens, codificar_cursor(_valor_do_campo(ultimo, campo), _valor_do_campo(ultimo, 'pk')))
+
+
+def paginar_keyset(queryset, campo, cursor=None, tamanho=20, descendente=False):
+    queryset = _ordenar_a_partir_do_cursor(queryset, campo, cursor, descendente)
+    return _montar_pagina(list(queryset[:tamanho + 1]), campo, tamanho)
+
+
+async def apaginar_keyset(queryset, campo, cursor=None, tamanho=20, descendente=False):
+    queryset = _ordenar_a_partir_do_cursor(queryset, campo, cursor, descendente)
+    return _montar_pagina([item async for item in queryset[:tamanho + 1]], campo, tamanho)
@@ -0,0 +1,180 @@
+import json
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.utils import CursorWrapper
+from django.template.base import Template
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from . import metricas
+
+logger = logging.getLogger('eventos.perfilamento')
+
+# limites superiores (ms) das faixas dos histogramas por rota
+FAIXAS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, float('inf'))
+
+_medicao_atual = ContextVar('medicao_atual', default=None)
+
+
+class Medicao:
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.consultas = 0
+        self.tempo_banco = 0.0
+        self.tempo_template = 0.0
+        self.profundidade_template = 0
+        self.sqls = Counter()
+
+    def registrar_consulta(self, sql, executar, *args):
+        inicio = time.perf_counter()
+        try:
+            return executar(*args)
+        finally:
+            self.tempo_banco += time.perf_counter() - inicio
+            self.consultas += 1
+            self.sqls[sql] += 1
+
+    @property
+    def duplicadas(self):
+        return sum(total - 1 for total in self.sqls.values() if total > 1)
+
+
+_execute_original = CursorWrapper.execute
+_executemany_original = CursorWrapper.executemany
+
+
+# no cursor e não por conexão (execute_wrapper): as views assíncronas consultam nas
+# threads do sync_to_async, cada uma com sua conexão; a medição vai junto no contexto
+def _execute_medido(self, sql, params=None):
+    medicao = _medicao_atual.get()
+    if medicao is None:
+        return _execute_original(self, sql, params)
+    return medicao.registrar_consulta(sql, _execute_original, self, sql, params)
+
+
+def _executemany_medido(self, sql, param_list):
+    medicao = _medicao_atual.get()
+    if medicao is None:
+        return _executemany_original(self, sql, param_list)
+    return medicao.registrar_consulta(sql, _executemany_original, self, sql, param_list)
+
+
+_render_original = Template.render
+
+
+def _render_medido(self, context):
+    medicao = _medicao_atual.get()
+    # includes e extends renderizam templates dentro de templates: só o mais externo conta
+    if medicao is None or medicao.profundidade_template:
+        return _render_original(self, context)
+    medicao.profundidade_template += 1
+    inicio = time.perf_counter()
+    try:
+        return _render_original(self, context)
+    finally:
+        medicao.tempo_template += time.perf_counter() - inicio
+        medicao.profundidade_template -= 1
+
+
+def instalar():
+    # só com o perfilamento ligado: desligado, cursores e templates ficam intocados
+    CursorWrapper.execute = _execute_medido
+    CursorWrapper.executemany = _executemany_medido
+    Template.render = _render_medido
+
+
+def desinstalar():
+    CursorWrapper.execute = _execute_original
+    CursorWrapper.executemany = _executemany_original
+    Template.render = _render_original
+
+
+def nome_da_faixa(ms):
+    for limite in FAIXAS:
+        if ms <= limite:
+            return 'inf' if limite == float('inf') else str(limite)
+
+
+def nomes_de_rotas(padroes=None, prefixo=''):
+    if padroes is None:
+        padroes = get_resolver().url_patterns
+    for padrao in padroes:
+        if isinstance(padrao, URLResolver):
+            namespace = f'{prefixo}{padrao.namespace}:' if padrao.namespace else prefixo
+            yield from nomes_de_rotas(padrao.url_patterns, namespace)
+        elif isinstance(padrao, URLPattern):
+            yield prefixo + (padrao.name or padrao.lookup_str)
+
+
+class PerfilamentoMiddleware:
+    """
+    Mede consultas SQL, tempo de banco, tempo de template e tempo total de cada
+    requisição. Ligado por PERFILAMENTO=True; desligado, o Django remove o
+    middleware da cadeia, os métodos originais voltam e o custo é zero.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PERFILAMENTO_ATIVO', False):
+            desinstalar()
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        instalar()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        medicao = Medicao()
+        token = _medicao_atual.set(medicao)
+        try:
+            response = self.get_response(request)
+        finally:
+            _medicao_atual.reset(token)
+        return self.concluir(request, response, medicao)
+
+    async def __acall__(self, request):
+        medicao = Medicao()
+        token = _medicao_atual.set(medicao)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _medicao_atual.reset(token)
+        return self.concluir(request, response, medicao)
+
+    def concluir(self, request, response, medicao):
+        total = (time.perf_counter() - medicao.inicio) * 1000
+        banco = medicao.tempo_banco * 1000
+        template = medicao.tempo_template * 1000
+        view = request.resolver_match.view_name if request.resolver_match else 'nao-resolvida'
+
+        response['Server-Timing'] = (
+            f'db;dur={banco:.1f};desc="{medicao.consultas} consultas", '
+            f'tpl;dur={template:.1f}, total;dur={total:.1f}'
+        )
+        logger.info(json.dumps({
+            'view': view,
+            'metodo': request.method,
+            'status': response.status_code,
+            'total_ms': round(total, 2),
+            'banco_ms': round(banco, 2),
+            'template_ms': round(template, 2),
+            'consultas': medicao.consultas,
+            'duplicadas': medicao.duplicadas,
+        }))
+
+        # agregado no processo e somado ao cache periodicamente (ver metricas)
+        metricas.incrementar(f'perf:{view}:{nome_da_faixa(total)}')
+        metricas.incrementar(f'perf:{view}:total_us', int(total * 1000))
+        metricas.incrementar(f'perf:{view}:consultas', medicao.consultas)
+        metricas.incrementar(f'perf:{view}:duplicadas', medicao.duplicadas)
+        return response
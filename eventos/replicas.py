@@ -0,0 +1,145 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from . import metricas
+
+ALIAS_REPLICA = 'replica'
+COOKIE_PRIMARIO = 'eventos_primario'
+METODOS_DE_LEITURA = ('GET', 'HEAD')
+
+_na_replica = ContextVar('eventos_na_replica', default=False)
+
+
+def replica_configurada():
+    # nos testes a réplica é espelho (TEST MIRROR) do primário: o mesmo banco por
+    # outra conexão, que nem enxergaria a transação aberta pelo TestCase
+    if ALIAS_REPLICA not in connections:
+        return False
+    primario = connections[DEFAULT_DB_ALIAS].settings_dict
+    replica = connections[ALIAS_REPLICA].settings_dict
+    return any(str(primario[chave]) != str(replica[chave]) for chave in ('NAME', 'HOST', 'PORT'))
+
+
+@contextmanager
+def leitura_na_replica():
+    """Consultas de leitura dentro do bloco vão para a réplica (escritas seguem no primário)."""
+    token = _na_replica.set(True)
+    try:
+        yield
+    finally:
+        _na_replica.reset(token)
+
+
+def _conteudo_na_replica(conteudo):
+    # o corpo de uma StreamingHttpResponse é consumido depois que a view retorna
+    with leitura_na_replica():
+        yield from conteudo
+
+
+async def _aconteudo_na_replica(conteudo):
+    with leitura_na_replica():
+        async for parte in conteudo:
+            yield parte
+
+
+class RoteadorDeReplica:
+    """
+    Só lê da réplica quem está dentro de leitura_na_replica(); o resto, inclusive
+    toda escrita, usa o primário. As migrações rodam só no primário: a réplica
+    recebe o esquema pela replicação.
+    """
+
+    def db_for_read(self, model, **hints):
+        return ALIAS_REPLICA if _na_replica.get() else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # primário e réplica têm os mesmos dados
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != ALIAS_REPLICA
+
+
+class ReplicaDeLeituraMiddleware:
+    """
+    Manda para a réplica as leituras das rotas em ROTAS_NA_REPLICA. Depois de
+    qualquer escrita (POST, PUT, PATCH, DELETE), o navegador recebe um cookie que
+    o mantém no primário por REPLICA_ATRASO_MAXIMO segundos: quem acabou de se
+    inscrever ou mandar um feedback se vê na lista seguinte, mesmo com a réplica
+    atrasada.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not replica_configurada():
+            raise MiddlewareNotUsed
+        self.rotas = set(getattr(settings, 'ROTAS_NA_REPLICA', ()))
+        self.atraso_maximo = getattr(settings, 'REPLICA_ATRASO_MAXIMO', 10)
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        request.na_replica = False
+        try:
+            response = self.get_response(request)
+        finally:
+            token = getattr(request, '_token_replica', None)
+            if token is not None:
+                _na_replica.reset(token)
+        return self.concluir(request, response)
+
+    async def __acall__(self, request):
+        request.na_replica = False
+        try:
+            response = await self.get_response(request)
+        finally:
+            # aqui o process_view roda numa thread do sync_to_async: a variável volta
+            # ligada ao contexto desta requisição, mas o token não vale neste contexto
+            if request.na_replica:
+                _na_replica.set(False)
+        return self.concluir(request, response)
+
+    def concluir(self, request, response):
+        if request.na_replica and response.streaming:
+            if response.is_async:
+                response.streaming_content = _aconteudo_na_replica(response.streaming_content)
+            else:
+                response.streaming_content = _conteudo_na_replica(response.streaming_content)
+        if request.method not in METODOS_DE_LEITURA:
+            response.set_cookie(
+                COOKIE_PRIMARIO, '1', max_age=self.atraso_maximo, httponly=True, samesite='Lax',
+                secure=request.is_secure(),
+            )
+        return response
+
+    def na_rota_de_leitura(self, request):
+        rota = request.resolver_match.view_name
+        # "admin:" cobre todas as rotas do namespace
+        return rota in self.rotas or any(
+            prefixo.endswith(':') and rota.startswith(prefixo) for prefixo in self.rotas
+        )
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            request.method in METODOS_DE_LEITURA
+            and COOKIE_PRIMARIO not in request.COOKIES
+            and self.na_rota_de_leitura(request)
+        ):
+            request.na_replica = True
+            metricas.incrementar('replica_leituras')
+            request._token_replica = _na_replica.set(True)
+        return None
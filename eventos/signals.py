@@ -0,0 +1,88 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import busca
+from .cache import invalidar_evento
+from .espera import promover_da_lista_de_espera
+from .models import Evento, Inscricao, InscricaoDiaria, Participante
+
+# ligado durante operações em massa que apagam eventos inteiros (arquivamento):
+# contadores, totais diários, fila de espera e cards desses eventos somem junto,
+# então os ajustes linha a linha das inscrições são pulados
+_em_massa = ContextVar('eventos_em_massa', default=False)
+
+
+@contextmanager
+def em_massa():
+    token = _em_massa.set(True)
+    try:
+        yield
+    finally:
+        _em_massa.reset(token)
+
+
+@receiver(post_delete, sender=Inscricao)
+def decrementar_inscritos(sender, instance, using, **kwargs):
+    if _em_massa.get():
+        return
+    # roda dentro da transação do delete, inclusive em cascatas e QuerySet.delete()
+    Evento.objects.using(using).filter(pk=instance.evento_id).update(
+        inscritos=F('inscritos') - 1, atualizado_em=timezone.now()
+    )
+
+
+@receiver(post_delete, sender=Inscricao)
+def descontar_inscricao_diaria(sender, instance, using, origin=None, **kwargs):
+    # apagar o evento já remove os totais diários dele em cascata
+    if _em_massa.get() or isinstance(origin, Evento) or getattr(origin, 'model', None) is Evento:
+        return
+    if Inscricao._meta.get_field('participante').is_cached(instance):
+        genero = instance.participante.genero
+    else:
+        genero = Participante.objects.using(using).filter(pk=instance.participante_id).values_list(
+            'genero', flat=True
+        ).first()
+    InscricaoDiaria.registrar(instance.evento_id, timezone.localdate(instance.data_inscricao), genero, -1, using)
+
+
+@receiver(post_delete, sender=Inscricao)
+def promover_lista_de_espera(sender, instance, using, origin=None, **kwargs):
+    # a vaga liberada vai para o primeiro da fila na mesma transação do cancelamento;
+    # decrementar_inscritos já travou a linha do evento
+    if _em_massa.get() or isinstance(origin, Evento) or getattr(origin, 'model', None) is Evento:
+        return
+    promover_da_lista_de_espera(instance.evento_id, using)
+
+
+@receiver(post_save, sender=Evento)
+@receiver(post_delete, sender=Evento)
+def invalidar_card_do_evento(sender, instance, using, **kwargs):
+    # só depois do commit, para ninguém recolocar no cache a versão antiga
+    transaction.on_commit(lambda: invalidar_evento(instance.pk), using=using)
+
+
+@receiver(post_save, sender=Inscricao)
+@receiver(post_delete, sender=Inscricao)
+def invalidar_card_da_inscricao(sender, instance, using, **kwargs):
+    if _em_massa.get():
+        return
+    transaction.on_commit(lambda: invalidar_evento(instance.evento_id), using=using)
+
+
+@receiver(post_save, sender=Evento)
+def indexar_evento_na_busca(sender, instance, using, update_fields, **kwargs):
+    # saves parciais que não mexem no texto (banner, contadores) não reindexam
+    if update_fields is not None and not set(update_fields) & set(busca.CAMPOS_INDEXADOS):
+        return
+    busca.indexar(instance, using)
+
+
+@receiver(post_delete, sender=Evento)
+def remover_evento_da_busca(sender, instance, using, **kwargs):
+    busca.remover(instance.pk, using)
@@ -0,0 +1,34 @@
+from django import template
+
+register = template.Library()
+
+
+class CacheEventoNode(template.Node):
+    def __init__(self, nodelist, evento, cards):
+        self.nodelist = nodelist
+        self.evento = evento
+        self.cards = cards
+
+    def render(self, context):
+        evento = self.evento.resolve(context)
+        cards = self.cards.resolve(context)
+        if not cards:
+            return self.nodelist.render(context)
+        return cards.obter(evento, lambda: self.nodelist.render(context))
+
+
+@register.tag
+def cache_evento(parser, token):
+    """
+    Guarda em cache o trecho de um card de evento, versionado por evento::
+
+        {% cache_evento evento cards %}...{% endcache_evento %}
+
+    O trecho não pode depender do usuário logado.
+    """
+    partes = token.split_contents()
+    if len(partes) != 3:
+        raise template.TemplateSyntaxError(f"'{partes[0]}' recebe o evento e o objeto de cache dos cards.")
+    nodelist = parser.parse(('endcache_evento',))
+    parser.delete_first_token()
+    return CacheEventoNode(nodelist, parser.compile_filter(partes[1]), parser.compile_filter(partes[2]))
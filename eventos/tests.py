@@ -1,3 +1,1722 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import json
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from pathlib import Path
+from unittest import skipIf
+from unittest.mock import patch
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends import locmem
+from django.core.signals import request_finished
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection, connections
+from django.db.backends.utils import CursorWrapper
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import QuerySet
+from django.http import HttpResponse, StreamingHttpResponse
+from django.template.base import Template
+from django.templatetags.static import static
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import path, resolve, reverse
+from django.utils import timezone
+from PIL import Image
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from sistema_eventos import urls as urls_do_projeto
+
+from . import benchmark, busca, metricas, perfilamento
+from .arquivamento import arquivar_eventos, arquivar_lote
+from .assincrono import em_thread
+from .cache import CardsEmCache
+from .conexoes import CONTADORES
+from .emails import enfileirar_email, enviar_lote, espera_apos
+from .exclusao import excluir_evento, purgar_lote
+from .forms import EventoForm, ParticipanteForm
+from .imagens import gerar_derivados, processar_pendentes
+from .importacao import ImportacaoInvalida, importar_inscricoes
+from .limites import LimiteDeTaxaMiddleware
+from .models import (
+    EmailPendente, Evento, EventoArquivado, EventoLotado, Inscricao, InscricaoArquivada, InscricaoDiaria, ListaEspera,
+    Participante,
+)
+from .paginacao import codificar_cursor
+from .perfilamento import PerfilamentoMiddleware
+from .replicas import ALIAS_REPLICA, COOKIE_PRIMARIO, ReplicaDeLeituraMiddleware, RoteadorDeReplica
+from .views import (
+    EventoArquivadoDetailView, EventoListAsyncView, EventoListView, InscricaoCreateAsyncView,
+    ParticipantesListAsyncView, ParticipantesListView,
+)
+
+
+# todas as threads vêm do mesmo IP: o limite de taxa recusaria a maioria antes da corrida
+@override_settings(LIMITES_DE_TAXA={})
+class InscricaoConcorrenteTests(TransactionTestCase):
+    capacidade = 5
+    threads = 20
+
+    def setUp(self):
+        promotor = User.objects.create_user('promotor', 'promotor@example.com', 'senha-segura')
+        self.evento = Evento.objects.create(
+            titulo="Lançamento",
+            descricao="Evento disputado",
+            data=datetime.date.today() + datetime.timedelta(days=7),
+            local="Auditório",
+            capacidade_maxima=self.capacidade,
+            criado_por=promotor,
+        )
+
+    def inscrever(self, indice, barreira, status):
+        try:
+            barreira.wait()
+            resposta = Client().post(reverse('evento-inscricao', args=[self.evento.pk]), {
+                'nome': f"Participante {indice}",
+                'email': f"participante{indice}@example.com",
+                'telefone': "11999990000",
+                'genero': 'O',
+            })
+            status.append(resposta.status_code)
+        finally:
+            connections.close_all()
+
+    def test_nao_vende_alem_da_capacidade(self):
+        barreira = threading.Barrier(self.threads)
+        status = []
+        workers = [
+            threading.Thread(target=self.inscrever, args=(i, barreira, status))
+            for i in range(self.threads)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(status, [302] * self.threads)
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.inscritos, self.capacidade)
+        self.assertEqual(Inscricao.objects.filter(evento=self.evento).count(), self.capacidade)
+        # quem ficou sem vaga entrou na fila, cada um numa posição
+        posicoes = list(ListaEspera.objects.filter(evento=self.evento).values_list('posicao', flat=True))
+        self.assertEqual(sorted(posicoes), list(range(1, self.threads - self.capacidade + 1)))
+        self.assertEqual(Participante.objects.count(), self.threads)
+
+
+class ContadorDeInscritosTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        promotor = User.objects.create_user('promotor', 'promotor@example.com', 'senha-segura')
+        cls.evento, cls.outro = [
+            Evento.objects.create(
+                titulo=titulo, descricao="Descrição", data=timezone.localdate(), local="Local",
+                capacidade_maxima=10, criado_por=promotor,
+            )
+            for titulo in ("Evento", "Outro")
+        ]
+        cls.participantes = [
+            Participante.objects.create(nome=f"P{indice}", email=f'p{indice}@example.com', telefone='1', genero='F')
+            for indice in range(4)
+        ]
+
+    def inscrever(self, *participantes, evento=None):
+        return [Inscricao.objects.create(evento=evento or self.evento, participante=p) for p in participantes]
+
+    def inscritos(self, evento=None):
+        evento = evento or self.evento
+        evento.refresh_from_db(fields=['inscritos'])
+        return evento.inscritos
+
+    def test_delete_da_instancia(self):
+        inscricao, _ = self.inscrever(*self.participantes[:2])
+        inscricao.delete()
+        self.assertEqual(self.inscritos(), 1)
+
+    def test_delete_do_queryset(self):
+        self.inscrever(*self.participantes[:3])
+        Inscricao.objects.filter(participante__in=self.participantes[:2]).delete()
+        self.assertEqual(self.inscritos(), 1)
+
+    def test_participante_apagado_em_cascata(self):
+        self.inscrever(*self.participantes[:2])
+        self.inscrever(self.participantes[0], evento=self.outro)
+        self.participantes[0].delete()
+        self.assertEqual((self.inscritos(), self.inscritos(self.outro)), (1, 0))
+
+    def test_bulk_create_recontado(self):
+        self.inscrever(self.participantes[0])
+        Inscricao.objects.bulk_create(
+            [Inscricao(evento=self.evento, participante=p) for p in self.participantes]
+            + [Inscricao(evento=self.outro, participante=self.participantes[0])],
+            ignore_conflicts=True,
+        )
+        self.assertEqual((self.inscritos(), self.inscritos(self.outro)), (4, 1))
+
+    def test_recalcular_inscritos_corrige_desvio(self):
+        self.inscrever(*self.participantes[:2])
+        Evento.objects.filter(pk__in=[self.evento.pk, self.outro.pk]).update(inscritos=7)
+        saida = io.StringIO()
+        call_command('recalcular_inscritos', self.evento.pk, stdout=saida)
+        self.assertIn("1 evento(s)", saida.getvalue())
+        self.assertEqual((self.inscritos(), self.inscritos(self.outro)), (2, 7))
+        call_command('recalcular_inscritos', stdout=io.StringIO())
+        self.assertEqual(self.inscritos(self.outro), 0)
+
+    def test_edicao_nao_volta_o_contador(self):
+        # o formulário foi aberto antes das inscrições: o evento em memória tem inscritos=0
+        lido_antes = Evento.objects.get(pk=self.evento.pk)
+        Evento.objects.filter(pk=self.evento.pk).update(capacidade_maxima=2)
+        lido_antes.capacidade_maxima = 2
+        self.inscrever(*self.participantes[:2])
+        form = EventoForm({
+            'titulo': "Evento editado", 'descricao': "Descrição", 'data': timezone.localdate(),
+            'local': "Local", 'capacidade_maxima': 2,
+        }, instance=lido_antes)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        self.evento.refresh_from_db()
+        self.assertEqual((self.evento.titulo, self.evento.inscritos), ("Evento editado", 2))
+        with self.assertRaises(EventoLotado):
+            self.inscrever(self.participantes[2])
+
+
+class EventoListViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.promotor = User.objects.create_user('promotor', 'promotor@example.com', 'senha-segura')
+        hoje = timezone.localdate()
+        Evento.objects.bulk_create([
+            Evento(
+                titulo=f"Evento {dias}",
+                descricao="Descrição",
+                data=hoje + datetime.timedelta(days=dias),
+                local="Local",
+                capacidade_maxima=10,
+                criado_por=cls.promotor,
+            )
+            for dias in range(-5, 30)
+        ])
+
+    def percorrer(self, parametros=''):
+        vistos = []
+        url = reverse('evento-list') + parametros
+        while url:
+            resposta = self.client.get(url)
+            vistos.extend(resposta.context['eventos'])
+            pagina = resposta.context['pagina']
+            url = None
+            if pagina.tem_proxima:
+                url = reverse('evento-list') + (parametros + '&' if parametros else '?') + f'cursor={pagina.proximo_cursor}'
+        return vistos
+
+    def test_padrao_lista_apenas_proximos_em_ordem(self):
+        eventos = self.percorrer()
+        datas = [evento.data for evento in eventos]
+        self.assertEqual(len(eventos), 30)
+        self.assertEqual(datas, sorted(datas))
+        self.assertGreaterEqual(datas[0], timezone.localdate())
+
+    def test_passados_em_ordem_decrescente(self):
+        eventos = self.percorrer('?passados=1')
+        datas = [evento.data for evento in eventos]
+        self.assertEqual(len(eventos), 5)
+        self.assertEqual(datas, sorted(datas, reverse=True))
+
+    def test_cursor_invalido_volta_para_primeira_pagina(self):
+        resposta = self.client.get(reverse('evento-list'), {'cursor': 'lixo!'})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(len(resposta.context['eventos']), EventoListView.tamanho_pagina)
+
+    def test_cursor_bem_formado_com_valor_de_tipo_errado(self):
+        self.client.force_login(self.promotor)
+        for valor, pk in (("abc", 1), ({"a": 1}, 1), (None, 1), ([], 1), ("2026-01-01", 10 ** 30)):
+            cursor = codificar_cursor(valor, pk)
+            for url in (
+                reverse('evento-list'), reverse('api-eventos'), reverse('evento-arquivo'),
+                reverse('participantes-list') + '?ordem=-data',
+            ):
+                with self.subTest(valor=valor, pk=pk, url=url):
+                    self.assertEqual(self.client.get(url, {'cursor': cursor}).status_code, 200)
+        resposta = self.client.get(reverse('evento-list'), {'cursor': codificar_cursor("abc", 1)})
+        self.assertEqual(len(resposta.context['eventos']), EventoListView.tamanho_pagina)
+
+    def test_numero_fixo_de_consultas_por_pagina(self):
+        # validadores (agregado) + eventos
+        with self.assertNumQueries(2):
+            self.client.get(reverse('evento-list'))
+        self.client.force_login(self.promotor)
+        # usuário + validadores + eventos (sessão no cookie), sem carregar criado_por por card
+        with self.assertNumQueries(3):
+            resposta = self.client.get(reverse('evento-list'))
+        self.assertContains(resposta, "Você é o promotor", count=EventoListView.tamanho_pagina)
+
+
+class RespostaCondicionalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.promotor = User.objects.create_user('promotor', 'promotor@example.com', 'senha-segura')
+        cls.evento = Evento.objects.create(
+            titulo="Evento", descricao="Descrição", data=timezone.localdate(), local="Local",
+            capacidade_maxima=10, criado_por=cls.promotor,
+        )
+        participante = Participante.objects.create(
+            nome="Ana", email='ana@example.com', telefone='11900000000', genero='F'
+        )
+        cls.inscricao = Inscricao.objects.create(evento=cls.evento, participante=participante)
+
+    def revalidar(self, url, resposta, consultas, template):
+        with CaptureQueriesContext(connection) as capturadas, self.assertTemplateNotUsed(template):
+            revalidada = self.client.get(url, HTTP_IF_NONE_MATCH=resposta['ETag'])
+        self.assertEqual(revalidada.status_code, 304)
+        self.assertEqual(len(capturadas), consultas)
+        # só o agregado dos validadores: nenhuma linha de inscrição ou participante é lida
+        self.assertFalse([q['sql'] for q in capturadas if 'eventos_inscricao' in q['sql']
+                          or 'eventos_participante' in q['sql']])
+        self.assertIn('COUNT(', capturadas[-1]['sql'])
+
+    def test_listagem_sem_alteracoes_responde_304(self):
+        url = reverse('evento-list')
+        resposta = self.client.get(url)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertIn('no-cache', resposta['Cache-Control'])
+        self.revalidar(url, resposta, 1, 'eventos/evento_list.html')
+
+        modificado = self.client.get(url, HTTP_IF_MODIFIED_SINCE=resposta['Last-Modified'])
+        self.assertEqual(modificado.status_code, 304)
+
+    def test_inscricao_muda_o_etag_da_listagem(self):
+        url = reverse('evento-list')
+        etag = self.client.get(url)['ETag']
+        outro = Participante.objects.create(nome="Bia", email='bia@example.com', telefone='1', genero='F')
+        Inscricao.objects.create(evento=self.evento, participante=outro)
+        resposta = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertNotEqual(resposta['ETag'], etag)
+
+    def test_participantes_revalidados_so_com_agregado(self):
+        self.client.force_login(self.promotor)
+        url = reverse('participantes-list')
+        resposta = self.client.get(url)
+        # usuário + validadores (sessão no cookie)
+        self.revalidar(url, resposta, 2, 'eventos/participantes_list.html')
+
+        self.inscricao.feedback = "Ótimo evento"
+        self.inscricao.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=resposta['ETag']).status_code, 200)
+
+    def test_mensagens_pendentes_sempre_renderizam(self):
+        self.client.force_login(self.promotor)
+        url = reverse('evento-list')
+        etag = self.client.get(url)['ETag']
+        # o redirect de uma ação deixa uma mensagem para a próxima página
+        self.client.post(reverse('evento-inscricao', args=[self.evento.pk]), {})
+        resposta = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertContains(resposta, "Você é o promotor deste evento")
+
+
+class InscricaoDiariaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.promotor = User.objects.create_user('promotor', 'promotor@example.com', 'senha-segura')
+        cls.evento = Evento.objects.create(
+            titulo="Evento", descricao="Descrição", data=timezone.localdate(), local="Local",
+            capacidade_maxima=100, criado_por=cls.promotor,
+        )
+
+    def inscrever(self, quantidade, genero):
+        inscricoes = []
+        for _ in range(quantidade):
+            indice = Participante.objects.count()
+            participante = Participante.objects.create(
+                nome=f"P{indice}", email=f'p{indice}@example.com', telefone='1', genero=genero
+            )
+            inscricoes.append(Inscricao.objects.create(evento=self.evento, participante=participante))
+        return inscricoes
+
+    def totais(self):
+        return list(InscricaoDiaria.objects.filter(evento=self.evento).values_list(
+            'total', 'masculino', 'feminino', 'outro', 'sem_genero'
+        ))
+
+    def test_inscricoes_e_cancelamentos_atualizam_o_dia(self):
+        self.inscrever(2, 'F')
+        masculinos = self.inscrever(1, 'M')
+        self.inscrever(1, None)
+        self.assertEqual(self.totais(), [(4, 1, 2, 0, 1)])
+
+        masculinos[0].delete()
+        Inscricao.objects.filter(participante__genero__isnull=True).delete()
+        self.assertEqual(self.totais(), [(2, 0, 2, 0, 0)])
+
+    def test_recalculo_confere_com_o_incremental(self):
+        self.inscrever(3, 'O')
+        self.inscrever(2, 'M')
+        incremental = self.totais()
+        InscricaoDiaria.objects.all().delete()
+        call_command('recalcular_inscricoes_diarias', stdout=io.StringIO())
+        self.assertEqual(self.totais(), incremental)
+
+    def test_painel_le_so_os_totais(self):
+        self.client.force_login(self.promotor)
+        url = reverse('evento-painel', args=[self.evento.pk])
+        self.inscrever(2, 'F')
+        # usuário + evento + totais diários, com 2 ou com 20 inscrições
+        with self.assertNumQueries(3):
+            self.client.get(url)
+        self.inscrever(18, 'M')
+        with self.assertNumQueries(3):
+            resposta = self.client.get(url)
+        self.assertEqual(resposta.context['ocupacao'], 20)
+        self.assertIn(("Masculino", 18, 90), resposta.context['generos'])
+
+    def test_apagar_evento_remove_os_totais(self):
+        self.inscrever(2, 'F')
+        self.evento.delete()
+        self.assertFalse(InscricaoDiaria.objects.exists())
+
+
+@override_settings(LIMITES_DE_TAXA={})
+class ListaEsperaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.promotor = User.objects.create_user('promotor', 'promotor@example.com', 'senha-segura')
+        cls.evento = Evento.objects.create(
+            titulo="Evento", descricao="Descrição", data=timezone.localdate(), local="Local",
+            capacidade_maxima=1, criado_por=cls.promotor,
+        )
+
+    def inscrever(self, indice):
+        return self.client.post(reverse('evento-inscricao', args=[self.evento.pk]), {
+            'nome': f"P{indice}", 'email': f'p{indice}@example.com', 'telefone': '1', 'genero': 'F',
+        }, follow=True)
+
+    def test_lotado_entra_na_fila_em_ordem(self):
+        self.inscrever(0)
+        resposta = self.inscrever(1)
+        self.assertContains(resposta, "lista de espera na posição 1")
+        self.assertContains(self.inscrever(2), "lista de espera na posição 2")
+        # repetir o envio não abre outra entrada
+        self.assertContains(self.inscrever(2), "já está inscrito ou na lista de espera")
+        self.assertContains(self.inscrever(0), "já está inscrito ou na lista de espera")
+        self.assertEqual(
+            list(self.evento.lista_espera.values_list('participante__email', flat=True)),
+            ['p1@example.com', 'p2@example.com'],
+        )
+
+    def test_cancelamento_promove_o_primeiro_da_fila(self):
+        for indice in range(3):
+            self.inscrever(indice)
+        EmailPendente.objects.all().delete()
+
+        Inscricao.objects.get(participante__email='p0@example.com').delete()
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.inscritos, 1)
+        self.assertTrue(self.evento.inscricoes.filter(participante__email='p1@example.com').exists())
+        self.assertEqual(list(self.evento.lista_espera.values_list('posicao', flat=True)), [2])
+        aviso = EmailPendente.objects.get()
+        self.assertEqual(aviso.destinatario, 'p1@example.com')
+        self.assertIn("Vaga liberada", aviso.assunto)
+        self.assertEqual(InscricaoDiaria.objects.get(evento=self.evento).total, 1)
+
+    def test_aumento_de_capacidade_esvazia_a_fila(self):
+        for indice in range(3):
+            self.inscrever(indice)
+        self.client.force_login(self.promotor)
+        self.client.post(reverse('evento-update', args=[self.evento.pk]), {
+            'titulo': self.evento.titulo, 'descricao': self.evento.descricao, 'data': self.evento.data,
+            'local': self.evento.local, 'capacidade_maxima': 5,
+        })
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.inscritos, 3)
+        self.assertFalse(self.evento.lista_espera.exists())
+
+    def test_apagar_evento_nao_promove(self):
+        for indice in range(2):
+            self.inscrever(indice)
+        self.evento.delete()
+        self.assertFalse(Inscricao.objects.exists())
+        self.assertFalse(ListaEspera.objects.exists())
+
+
+class ArquivamentoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.promotor = User.objects.create_user('promotor', 'promotor@example.com', 'senha-segura')
+        hoje = timezone.localdate()
+        cls.antigos = [
+            Evento.objects.create(
+                titulo=f"Antigo {indice}", descricao="Descrição", data=hoje - datetime.timedelta(days=400 + indice),
+                local="Local", capacidade_maxima=10, criado_por=cls.promotor,
+            )
+            for indice in range(3)
+        ]
+        cls.recente = Evento.objects.create(
+            titulo="Recente", descricao="Descrição", data=hoje - datetime.timedelta(days=10), local="Local",
+            capacidade_maxima=10, criado_por=cls.promotor,
+        )
+        cls.participante = Participante.objects.create(nome="Ana", email='ana@example.com', telefone='1', genero='F')
+        for evento in [*cls.antigos, cls.recente]:
+            Inscricao.objects.create(evento=evento, participante=cls.participante, feedback=f"Sobre {evento.titulo}")
+
+    def test_move_eventos_antigos_em_lotes_retomaveis(self):
+        corte = timezone.localdate() - datetime.timedelta(days=365)
+        # interrompido depois do primeiro lote, continua de onde parou
+        self.assertEqual(list(arquivar_eventos(corte, tamanho=2, max_lotes=1)), [(1, 2, 2)])
+        self.assertEqual(list(arquivar_eventos(corte, tamanho=2)), [(1, 1, 1)])
+
+        self.assertEqual(list(Evento.objects.values_list('pk', flat=True)), [self.recente.pk])
+        self.assertEqual(Inscricao.objects.count(), 1)
+        self.assertEqual(
+            sorted(EventoArquivado.objects.values_list('pk', flat=True)), sorted(e.pk for e in self.antigos)
+        )
+        arquivada = InscricaoArquivada.objects.get(evento_id=self.antigos[0].pk)
+        self.assertEqual((arquivada.email, arquivada.feedback), ('ana@example.com', "Sobre Antigo 0"))
+        self.assertEqual(EventoArquivado.objects.get(pk=self.antigos[0].pk).inscritos, 1)
+        # o participante continua, com a inscrição no evento recente
+        self.assertEqual(list(self.participante.inscricoes.values_list('evento_id', flat=True)), [self.recente.pk])
+        self.assertEqual(busca.buscar("antigo").itens, [])
+
+    def test_inscricoes_e_fila_apagadas_em_lotes_limitados(self):
+        participantes = [
+            Participante.objects.create(nome=f"P{indice}", email=f'p{indice}@example.com', telefone='1', genero='M')
+            for indice in range(4)
+        ]
+        for participante in participantes[:3]:
+            Inscricao.objects.create(evento=self.antigos[2], participante=participante)
+        ListaEspera.objects.create(evento=self.antigos[2], participante=participantes[3], posicao=1)
+
+        # tamanho=1: só o mais antigo
+        corte = timezone.localdate() - datetime.timedelta(days=365)
+        with patch('eventos.arquivamento.TAMANHO_LOTE_INSCRICOES', 2), \
+                CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(arquivar_lote(corte, tamanho=1), (1, 4))
+        apagar_inscricoes = [
+            consulta['sql'] for consulta in consultas.captured_queries
+            if consulta['sql'].startswith('DELETE FROM "eventos_inscricao"')
+        ]
+        self.assertEqual(len(apagar_inscricoes), 2)
+        self.assertFalse(Inscricao.objects.filter(evento_id=self.antigos[2].pk).exists())
+        self.assertFalse(ListaEspera.objects.exists())
+        self.assertEqual(InscricaoArquivada.objects.filter(evento_id=self.antigos[2].pk).count(), 4)
+
+    def test_comando_usa_a_data_de_corte(self):
+        saida = io.StringIO()
+        call_command('arquivar_eventos', dias=401, stdout=saida)
+        self.assertIn("1 evento(s)", saida.getvalue())
+        self.assertEqual(list(EventoArquivado.objects.values_list('titulo', flat=True)), ["Antigo 2"])
+
+    def test_arquivo_so_mostra_participantes_ao_promotor(self):
+        call_command('arquivar_eventos', dias=365, stdout=io.StringIO())
+        url = reverse('evento-arquivado', args=[self.antigos[0].pk])
+        with self.assertNumQueries(1):
+            resposta = self.client.get(reverse('evento-arquivo'))
+        self.assertContains(resposta, "Antigo 0")
+        self.assertNotContains(self.client.get(url), 'ana@example.com')
+        self.client.force_login(self.promotor)
+        resposta = self.client.get(url)
+        self.assertContains(resposta, 'ana@example.com')
+        self.assertContains(resposta, "Sobre Antigo 0")
+
+    def test_participantes_do_arquivado_paginados(self):
+        for indice in range(4):
+            participante = Participante.objects.create(
+                nome=f"P{indice}", email=f'p{indice}@example.com', telefone='1', genero='M',
+            )
+            Inscricao.objects.create(evento=self.antigos[0], participante=participante)
+        call_command('arquivar_eventos', dias=365, stdout=io.StringIO())
+        self.client.force_login(self.promotor)
+        url = reverse('evento-arquivado', args=[self.antigos[0].pk])
+        emails, cursor = [], ''
+        with patch.object(EventoArquivadoDetailView, 'tamanho_pagina', 2):
+            for _ in range(5):
+                resposta = self.client.get(url, {'cursor': cursor})
+                self.assertLessEqual(len(resposta.context['inscricoes']), 2)
+                emails += [inscricao.email for inscricao in resposta.context['inscricoes']]
+                if not resposta.context['pagina'].tem_proxima:
+                    break
+                cursor = resposta.context['pagina'].proximo_cursor
+                self.assertContains(resposta, f'cursor={cursor}')
+        self.assertEqual(emails, ['ana@example.com', *(f'p{indice}@example.com' for indice in range(4))])
+
+
+@override_settings(LIMITES_DE_TAXA={})
+class ParticipanteReaproveitadoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        promotor = User.objects.create_user('promotor', 'promotor@example.com', 'senha-segura')
+        cls.evento = Evento.objects.create(
+            titulo="Evento", descricao="Descrição", data=timezone.localdate(), local="Local",
+            capacidade_maxima=10, criado_por=promotor,
+        )
+        cls.ana = Participante.objects.create(nome="Ana", email='ana@example.com', telefone='11', genero='F')
+
+    def test_inscricao_com_email_existente_nao_reescreve_o_participante(self):
+        self.client.post(reverse('evento-inscricao', args=[self.evento.pk]), {
+            'nome': "Outra Pessoa", 'email': ' ANA@example.com', 'telefone': '99', 'genero': 'M',
+        })
+        self.ana.refresh_from_db()
+        self.assertEqual((self.ana.nome, self.ana.telefone, self.ana.genero), ("Ana", '11', 'F'))
+        self.assertTrue(Inscricao.objects.filter(evento=self.evento, participante=self.ana).exists())
+        self.assertEqual(Participante.objects.count(), 1)
+
+    def test_participante_travado_ate_a_inscricao(self):
+        # no PostgreSQL vira SELECT ... FOR UPDATE; o SQLite ignora a trava
+        with patch.object(QuerySet, 'select_for_update', autospec=True, side_effect=QuerySet.select_for_update) as travar:
+            self.client.post(reverse('evento-inscricao', args=[self.evento.pk]), {
+                'nome': "Ana", 'email': 'ana@example.com', 'telefone': '11', 'genero': 'F',
+            })
+        self.assertIn(Participante, [chamada.args[0].model for chamada in travar.call_args_list])
+        self.assertTrue(Inscricao.objects.filter(evento=self.evento, participante=self.ana).exists())
+
+    def test_save_sem_commit_nao_grava(self):
+        dados = {'nome': "Bia", 'email': 'BIA@example.com', 'telefone': '22', 'genero': 'F'}
+        form = ParticipanteForm(dict(dados, nome="Outra Ana", email='ana@example.com'))
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.save(commit=False), self.ana)
+        form = ParticipanteForm(dados)
+        self.assertTrue(form.is_valid(), form.errors)
+        nova = form.save(commit=False)
+        self.assertEqual((nova.pk, nova.email, nova.nome), (None, 'bia@example.com', "Bia"))
+        self.assertEqual(Participante.objects.count(), 1)
+
+
+class MesclarParticipantesMigracaoTests(TransactionTestCase):
+    anterior = [('eventos', '0009_evento_banner_derivados')]
+    migracao = [('eventos', '0010_mesclar_participantes_duplicados')]
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.anterior)
+        self.apps = executor.loader.project_state(self.anterior).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_duplicados_mesclados_sem_perder_feedback(self):
+        Usuario = self.apps.get_model('auth', 'User')
+        Evento = self.apps.get_model('eventos', 'Evento')
+        Participante = self.apps.get_model('eventos', 'Participante')
+        Inscricao = self.apps.get_model('eventos', 'Inscricao')
+        promotor = Usuario.objects.create(username='promotor')
+        primeiro, segundo = [
+            Evento.objects.create(
+                titulo=titulo, descricao="Descrição", data=timezone.localdate(), local="Local",
+                capacidade_maxima=10, criado_por=promotor, inscritos=0,
+            )
+            for titulo in ("Primeiro", "Segundo")
+        ]
+        antiga = Participante.objects.create(nome="Ana", email='Ana@Example.com ', telefone='1', genero='F')
+        nova = Participante.objects.create(nome="Ana Maria", email='ana@example.com', telefone='2', genero='F')
+        Inscricao.objects.create(evento=primeiro, participante=antiga, feedback=None)
+        Inscricao.objects.create(evento=primeiro, participante=nova, feedback="Ótimo evento")
+        Inscricao.objects.create(evento=segundo, participante=nova, feedback="Bom")
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migracao)
+        apps = executor.loader.project_state(self.migracao).apps
+        Participante = apps.get_model('eventos', 'Participante')
+        Inscricao = apps.get_model('eventos', 'Inscricao')
+        Evento = apps.get_model('eventos', 'Evento')
+
+        self.assertEqual(list(Participante.objects.values_list('pk', 'nome', 'email')),
+                         [(antiga.pk, "Ana Maria", 'ana@example.com')])
+        self.assertEqual(
+            sorted(Inscricao.objects.values_list('evento__titulo', 'participante_id', 'feedback')),
+            [("Primeiro", antiga.pk, "Ótimo evento"), ("Segundo", antiga.pk, "Bom")],
+        )
+        self.assertEqual(Evento.objects.get(pk=primeiro.pk).inscritos, 1)
+
+
+class ExclusaoDeEventoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.promotor = User.objects.create_user('promotor', 'promotor@example.com', 'senha-segura')
+        cls.evento, cls.outro = [
+            Evento.objects.create(
+                titulo=titulo, descricao="Descrição", data=timezone.localdate(), local="Local",
+                capacidade_maxima=5, criado_por=cls.promotor,
+            )
+            for titulo in ("Cancelado", "Mantido")
+        ]
+        cls.participantes = [
+            Participante.objects.create(nome=f"P{indice}", email=f'p{indice}@example.com', telefone='1', genero='M')
+            for indice in range(6)
+        ]
+        for participante in cls.participantes[:5]:
+            Inscricao.objects.create(evento=cls.evento, participante=participante)
+        # p0 também está em outro evento; p5 só na fila do excluído
+        Inscricao.objects.create(evento=cls.outro, participante=cls.participantes[0])
+        ListaEspera.objects.create(evento=cls.evento, participante=cls.participantes[5], posicao=1)
+
+    def test_exclusao_so_marca_o_evento(self):
+        self.client.force_login(self.promotor)
+        with CaptureQueriesContext(connection) as capturadas:
+            resposta = self.client.post(reverse('evento-delete', args=[self.evento.pk]), follow=True)
+        self.assertContains(resposta, "Evento deletado com sucesso.")
+        self.assertNotContains(resposta, "Cancelado")
+        # só o índice de busca perde a linha; inscrições e evento ficam para a purga
+        apagadas = [consulta['sql'] for consulta in capturadas if consulta['sql'].startswith('DELETE')]
+        self.assertEqual(apagadas, [f"DELETE FROM {busca.TABELA} WHERE rowid = {self.evento.pk}"])
+        self.assertEqual(self.evento.inscricoes.count(), 5)
+
+        self.assertEqual(busca.buscar("cancelado").itens, [])
+        self.assertEqual(self.client.get(reverse('evento-inscricao', args=[self.evento.pk])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('evento-update', args=[self.evento.pk])).status_code, 404)
+        self.assertEqual(
+            list(self.client.get(reverse('participantes-list')).context['inscricoes']),
+            list(self.outro.inscricoes.all()),
+        )
+
+    def test_purga_em_lotes_apaga_inscricoes_e_orfaos(self):
+        excluir_evento(self.evento)
+        diaria_do_outro = list(InscricaoDiaria.objects.filter(evento=self.outro).values_list('total', flat=True))
+
+        passos = []
+        while (passo := purgar_lote(tamanho=2)) is not None:
+            passos.append(passo)
+        # 5 inscrições em lotes de 2, depois a fila, depois o evento
+        self.assertEqual([apagadas for _, apagadas, _, _ in passos], [2, 2, 1, 1, 0])
+        self.assertTrue(passos[-1][3])
+
+        self.assertFalse(Evento.objects.filter(pk=self.evento.pk).exists())
+        self.assertEqual(list(Participante.objects.values_list('email', flat=True)), ['p0@example.com'])
+        self.outro.refresh_from_db()
+        self.assertEqual(self.outro.inscritos, 1)
+        self.assertEqual(
+            list(InscricaoDiaria.objects.filter(evento=self.outro).values_list('total', flat=True)), diaria_do_outro
+        )
+
+    def test_comando_sem_exclusoes(self):
+        saida = io.StringIO()
+        call_command('purgar_eventos_excluidos', stdout=saida)
+        self.assertIn("0 evento(s) purgado(s)", saida.getvalue())
+        self.assertEqual(Inscricao.objects.count(), 6)
+
+
+class ParticipantesNavegacaoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.promotor = User.objects.create_user('promotor', 'promotor@example.com', 'senha-segura')
+        outro_promotor = User.objects.create_user('outro', 'outro@example.com', 'senha-segura')
+        cls.evento, cls.segundo, cls.alheio = [
+            Evento.objects.create(
+                titulo=titulo, descricao="Descrição", data=timezone.localdate(), local="Local",
+                capacidade_maxima=10, criado_por=criado_por,
+            )
+            for titulo, criado_por in (("Alfa", cls.promotor), ("Beta", cls.promotor), ("Gama", outro_promotor))
+        ]
+        nomes = ["Carla", "ana", "Bruno", "Daniel", "Beatriz"]
+        cls.participantes = [
+            Participante.objects.create(nome=nome, email=f'{nome.lower()}@example.com', telefone='1', genero='F')
+            for nome in nomes
+        ]
+        agora = timezone.now()
+        for indice, participante in enumerate(cls.participantes):
+            inscricao = Inscricao.objects.create(
+                evento=cls.evento if indice < 3 else cls.segundo, participante=participante,
+                feedback="Gostei" if indice % 2 else None,
+            )
+            # uma inscrição por dia, da mais antiga (Carla) para a mais recente (Beatriz)
+            Inscricao.objects.filter(pk=inscricao.pk).update(data_inscricao=agora - datetime.timedelta(days=4 - indice))
+        Inscricao.objects.bulk_create([Inscricao(evento_id=cls.alheio.pk, participante_id=cls.participantes[0].pk)])
+
+    def setUp(self):
+        self.client.force_login(self.promotor)
+
+    def nomes(self, **parametros):
+        resposta = self.client.get(reverse('participantes-list'), parametros)
+        return [inscricao.participante.nome for inscricao in resposta.context['inscricoes']]
+
+    def test_promotor_copiado_do_evento(self):
+        self.assertEqual(
+            set(Inscricao.objects.values_list('evento__criado_por', 'promotor').distinct()),
+            {(self.promotor.pk, self.promotor.pk), (self.alheio.criado_por_id, self.alheio.criado_por_id)},
+        )
+
+    def test_padrao_mais_recentes_primeiro(self):
+        self.assertEqual(self.nomes(), ["Beatriz", "Daniel", "Bruno", "ana", "Carla"])
+
+    def test_filtros(self):
+        self.assertEqual(self.nomes(evento=self.segundo.pk), ["Beatriz", "Daniel"])
+        self.assertEqual(self.nomes(feedback='com'), ["Daniel", "ana"])
+        self.assertEqual(self.nomes(feedback='sem'), ["Beatriz", "Bruno", "Carla"])
+        self.assertEqual(self.nomes(q='b'), ["Beatriz", "Bruno"])
+        self.assertEqual(self.nomes(q='ANA@'), ["ana"])
+        ontem = timezone.localdate(timezone.now() - datetime.timedelta(days=1))
+        self.assertEqual(self.nomes(de=ontem - datetime.timedelta(days=1), ate=ontem), ["Daniel", "Bruno"])
+
+    def test_filtro_invalido_e_ignorado(self):
+        # evento de outro promotor não é escolha válida; os demais filtros continuam valendo
+        self.assertEqual(self.nomes(evento=self.alheio.pk, feedback='com'), ["Daniel", "ana"])
+
+    def test_ordenacao_e_paginas_por_cursor(self):
+        self.assertEqual(self.nomes(ordem='-evento')[:2], ["Beatriz", "Daniel"])
+        with patch.object(ParticipantesListView, 'tamanho_pagina', 2):
+            vistos, cursor = [], ''
+            while True:
+                resposta = self.client.get(reverse('participantes-list'), {'ordem': 'nome', 'cursor': cursor})
+                vistos += [inscricao.participante.nome for inscricao in resposta.context['inscricoes']]
+                if not resposta.context['pagina'].tem_proxima:
+                    break
+                cursor = resposta.context['pagina'].proximo_cursor
+                self.assertContains(resposta, f'cursor={cursor}')
+        # cada página continua de onde a anterior parou, sem repetir nem pular
+        self.assertEqual(sorted(vistos), sorted(participante.nome for participante in self.participantes))
+        self.assertEqual(vistos, sorted(vistos))
+
+    def test_cursor_com_datas_no_mesmo_milissegundo(self):
+        # 400µs entre inscrições: várias caem no mesmo milissegundo
+        base = timezone.now().replace(microsecond=100)
+        for indice, participante in enumerate(self.participantes):
+            Inscricao.objects.filter(participante=participante, evento__criado_por=self.promotor).update(
+                data_inscricao=base + datetime.timedelta(microseconds=400 * indice)
+            )
+        with patch.object(ParticipantesListView, 'tamanho_pagina', 2):
+            for ordem, esperado in (('data', self.participantes), ('-data', self.participantes[::-1])):
+                vistos, cursor = [], ''
+                for _ in range(len(self.participantes)):
+                    resposta = self.client.get(reverse('participantes-list'), {'ordem': ordem, 'cursor': cursor})
+                    vistos += [inscricao.participante.nome for inscricao in resposta.context['inscricoes']]
+                    if not resposta.context['pagina'].tem_proxima:
+                        break
+                    cursor = resposta.context['pagina'].proximo_cursor
+                self.assertEqual(vistos, [participante.nome for participante in esperado])
+
+    def test_consultas_constantes_com_filtros(self):
+        with self.assertNumQueries(4):
+            self.client.get(reverse('participantes-list'), {'evento': self.evento.pk, 'q': 'b', 'ordem': 'email'})
+
+
+@override_settings(
+    SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies',
+    MESSAGE_STORAGE='django.contrib.messages.storage.cookie.CookieStorage',
+)
+class SessaoEmCookieTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('usuario', 'usuario@example.com', 'senha-segura')
+
+    def setUp(self):
+        self.client.login(username='usuario', password='senha-segura')
+
+    def consultas_a_sessao(self, capturadas):
+        return [consulta['sql'] for consulta in capturadas if 'django_session' in consulta['sql']]
+
+    def test_listagem_logada_nao_consulta_a_sessao(self):
+        with CaptureQueriesContext(connection) as capturadas:
+            resposta = self.client.get(reverse('evento-list'))
+        self.assertTrue(resposta.wsgi_request.user.is_authenticated)
+        self.assertEqual(self.consultas_a_sessao(capturadas), [])
+
+    def test_troca_de_senha_mantem_o_login(self):
+        with CaptureQueriesContext(connection) as capturadas:
+            resposta = self.client.post(reverse('user-edit'), {
+                'email': 'usuario@example.com', 'old_password': 'senha-segura',
+                'new_password1': 'outra-senha-segura', 'new_password2': 'outra-senha-segura',
+            }, follow=True)
+        self.assertEqual(self.consultas_a_sessao(capturadas), [])
+        # update_session_auth_hash regravou o hash no cookie novo
+        self.assertTrue(resposta.wsgi_request.user.is_authenticated)
+        self.assertContains(resposta, "Email e/ou senha atualizados com sucesso.")
+        self.assertTrue(self.client.get(reverse('user-edit')).wsgi_request.user.is_authenticated)
+
+
+@override_settings(LIMITES_DE_TAXA={
+    'evento-inscricao': {'metodos': ['POST'], 'baldes': {'ip': (4, 60), 'ip+evento_id': (2, 60)}},
+})
+class LimiteDeTaxaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        promotor = User.objects.create_user('promotor', 'promotor@example.com', 'senha-segura')
+        cls.eventos = Evento.objects.bulk_create([
+            Evento(titulo=f"Evento {indice}", descricao="Descrição", data=timezone.localdate(), local="Local",
+                   capacidade_maxima=10, criado_por=promotor)
+            for indice in range(3)
+        ])
+
+    def setUp(self):
+        cache.clear()
+
+    def postar(self, evento, ip='10.0.0.1'):
+        return self.client.post(reverse('evento-inscricao', args=[evento.pk]), {}, REMOTE_ADDR=ip)
+
+    def test_bloqueia_por_ip_e_evento_sem_tocar_no_banco(self):
+        for _ in range(2):
+            self.assertEqual(self.postar(self.eventos[0]).status_code, 200)
+        with self.assertNumQueries(0):
+            resposta = self.postar(self.eventos[0])
+        self.assertEqual(resposta.status_code, 429)
+        self.assertGreater(int(resposta['Retry-After']), 0)
+        # outro IP no mesmo evento continua passando
+        self.assertEqual(self.postar(self.eventos[0], ip='10.0.0.2').status_code, 200)
+
+    def test_bloqueia_por_ip_em_varios_eventos(self):
+        # 2 + 1 + 1 requisições esgotam as 4 do IP, espalhadas por eventos diferentes
+        for evento in (self.eventos[0], self.eventos[0], self.eventos[1], self.eventos[2]):
+            self.assertEqual(self.postar(evento).status_code, 200)
+        self.assertEqual(self.postar(self.eventos[2]).status_code, 429)
+
+    def test_get_nao_e_limitado(self):
+        for _ in range(5):
+            self.assertEqual(
+                self.client.get(reverse('evento-inscricao', args=[self.eventos[0].pk])).status_code, 200
+            )
+
+
+class ReplicaDeLeituraTests(SimpleTestCase):
+    def setUp(self):
+        self.fabrica = RequestFactory()
+        self.roteador = RoteadorDeReplica()
+
+    def atender(self, requisicao, resposta=HttpResponse):
+        # devolve a resposta e o banco para o qual a view mandaria suas leituras
+        requisicao.resolver_match = resolve(requisicao.path)
+        lidos = []
+
+        def get_response(request):
+            middleware.process_view(request, None, (), {})
+            lidos.append(self.roteador.db_for_read(Evento))
+            return resposta()
+
+        with patch('eventos.replicas.replica_configurada', return_value=True):
+            middleware = ReplicaDeLeituraMiddleware(get_response)
+        return middleware(requisicao), lidos[0]
+
+    def test_listagem_le_da_replica(self):
+        _, banco = self.atender(self.fabrica.get(reverse('evento-list')))
+        self.assertEqual(banco, 'replica')
+        _, banco = self.atender(self.fabrica.get('/admin/'))
+        self.assertEqual(banco, 'replica')
+        # fora da requisição tudo volta ao primário
+        self.assertEqual(self.roteador.db_for_read(Evento), 'default')
+
+    def test_rota_fora_da_lista_le_do_primario(self):
+        _, banco = self.atender(self.fabrica.get(reverse('evento-inscricao', args=[1])))
+        self.assertEqual(banco, 'default')
+
+    def test_escrita_fixa_o_navegador_no_primario(self):
+        resposta, banco = self.atender(self.fabrica.post(reverse('evento-inscricao', args=[1])))
+        self.assertEqual(banco, 'default')
+        cookie = resposta.cookies[COOKIE_PRIMARIO]
+        self.assertEqual(cookie['max-age'], settings.REPLICA_ATRASO_MAXIMO)
+
+        requisicao = self.fabrica.get(reverse('participantes-list'))
+        requisicao.COOKIES[COOKIE_PRIMARIO] = cookie.value
+        _, banco = self.atender(requisicao)
+        self.assertEqual(banco, 'default')
+
+    def test_exportacao_em_streaming_continua_na_replica(self):
+        def resposta():
+            return StreamingHttpResponse(self.roteador.db_for_read(Inscricao) for _ in range(2))
+
+        resposta, _ = self.atender(self.fabrica.get(reverse('participantes-export')), resposta)
+        self.assertEqual(b''.join(resposta.streaming_content), b'replicareplica')
+
+    async def test_modo_assincrono_volta_ao_primario_no_fim(self):
+        requisicao = self.fabrica.get(reverse('evento-list'))
+        requisicao.resolver_match = resolve(requisicao.path)
+        lidos = []
+
+        async def get_response(request):
+            # como o handler assíncrono faz com um process_view síncrono
+            await sync_to_async(middleware.process_view)(request, None, (), {})
+            lidos.append(await sync_to_async(self.roteador.db_for_read)(Evento))
+            return HttpResponse()
+
+        with patch('eventos.replicas.replica_configurada', return_value=True):
+            middleware = ReplicaDeLeituraMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        await middleware(requisicao)
+        self.assertEqual(lidos, ['replica'])
+        self.assertEqual(self.roteador.db_for_read(Evento), 'default')
+
+    def test_migracoes_so_no_primario(self):
+        self.assertFalse(self.roteador.allow_migrate('replica', 'eventos'))
+        self.assertTrue(self.roteador.allow_migrate('default', 'eventos'))
+
+
+@skipIf(ALIAS_REPLICA in connections, "a réplica de DB_REPLICA_* já ocupa o alias")
+@override_settings(LIMITES_DE_TAXA={}, DATABASE_ROUTERS=['eventos.replicas.RoteadorDeReplica'])
+class ReplicaDeLeituraIntegracaoTests(TransactionTestCase):
+    # primário e réplica em dois arquivos SQLite; a "replicação" é uma cópia do arquivo
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        pasta = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(pasta.cleanup)
+        connections.settings[ALIAS_REPLICA] = dict(
+            connections['default'].settings_dict, NAME=str(Path(pasta.name) / 'replica.sqlite3')
+        )
+        cls.addClassCleanup(connections.settings.pop, ALIAS_REPLICA)
+        cls.addClassCleanup(connections.__delitem__, ALIAS_REPLICA)
+        cls.addClassCleanup(connections[ALIAS_REPLICA].close)
+        super().setUpClass()
+
+    def replicar(self):
+        connections[ALIAS_REPLICA].close()
+        shutil.copyfile(connections['default'].settings_dict['NAME'], connections[ALIAS_REPLICA].settings_dict['NAME'])
+
+    def test_quem_escreveu_le_do_primario_os_demais_da_replica(self):
+        promotor = User.objects.create_user('promotor', 'promotor@example.com', 'senha-segura')
+        evento = Evento.objects.create(
+            titulo="Replicado", descricao="Descrição", data=timezone.localdate(), local="Local",
+            capacidade_maxima=10, criado_por=promotor,
+        )
+        self.replicar()
+        visitante, outro = Client(), Client()
+        self.assertContains(visitante.get(reverse('evento-list')), "Inscritos: 0")
+
+        visitante.post(reverse('evento-inscricao', args=[evento.pk]), {
+            'nome': "Ana", 'email': 'ana@example.com', 'telefone': '1', 'genero': 'F',
+        })
+        # quem se inscreveu já se vê; a réplica, ainda sem a inscrição, atende os outros
+        self.assertContains(visitante.get(reverse('evento-list')), "Inscritos: 1")
+        self.assertContains(outro.get(reverse('evento-list')), "Inscritos: 0")
+
+        self.replicar()
+        self.assertContains(outro.get(reverse('evento-list')), "Inscritos: 1")
+
+
+@override_settings(LIMITES_DE_TAXA={}, API_MAX_AGE=30)
+class ApiEventosTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        promotor = User.objects.create_user('promotor', 'promotor@example.com', 'senha-segura')
+        hoje = timezone.localdate()
+        cls.eventos = [
+            Evento.objects.create(
+                titulo=f"Evento {indice}", descricao="Descrição", data=hoje + datetime.timedelta(days=indice),
+                local="Local", capacidade_maxima=3, criado_por=promotor,
+            )
+            for indice in range(5)
+        ]
+        for indice in range(3):
+            participante = Participante.objects.create(
+                nome=f"P{indice}", email=f'p{indice}@example.com', telefone='1', genero='F',
+            )
+            Inscricao.objects.create(evento=cls.eventos[0], participante=participante)
+        Inscricao.objects.create(evento=cls.eventos[1], participante=participante)
+
+    def test_campos_padrao_e_vagas(self):
+        resposta = self.client.get(reverse('api-eventos'))
+        self.assertEqual(resposta['Content-Type'], 'application/json')
+        primeiro, segundo = resposta.json()['eventos'][:2]
+        self.assertEqual(primeiro, {
+            'id': self.eventos[0].pk, 'titulo': "Evento 0", 'data': self.eventos[0].data.isoformat(),
+            'local': "Local", 'vagas': 0,
+        })
+        self.assertEqual(segundo['vagas'], 2)
+
+    def test_campos_escolhidos_sem_instanciar_modelos(self):
+        with patch.object(Evento, 'from_db', side_effect=AssertionError), self.assertNumQueries(2):
+            resposta = self.client.get(reverse('api-eventos'), {'campos': 'vagas,capacidade'})
+        self.assertEqual(resposta.json()['eventos'][1], {'vagas': 2, 'capacidade': 3})
+
+        resposta = self.client.get(reverse('api-eventos'), {'campos': 'id,senha'})
+        self.assertEqual(resposta.status_code, 400)
+        self.assertIn("senha", resposta.json()['erro'])
+
+    def test_paginas_por_cursor(self):
+        vistos, cursor = [], None
+        while True:
+            parametros = {'campos': 'id', 'tamanho': 2, **({'cursor': cursor} if cursor else {})}
+            dados = self.client.get(reverse('api-eventos'), parametros).json()
+            vistos += [evento['id'] for evento in dados['eventos']]
+            cursor = dados['proximo_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(vistos, [evento.pk for evento in self.eventos])
+
+    def test_lote_na_ordem_pedida(self):
+        excluir_evento(self.eventos[3])
+        ids = [self.eventos[2].pk, 0, self.eventos[0].pk, self.eventos[3].pk, self.eventos[2].pk]
+        with self.assertNumQueries(2):
+            resposta = self.client.get(
+                reverse('api-eventos-lote'), {'ids': ','.join(map(str, ids)), 'campos': 'id,vagas'}
+            )
+        self.assertEqual(resposta.json(), {
+            'eventos': [{'id': self.eventos[2].pk, 'vagas': 3}, {'id': self.eventos[0].pk, 'vagas': 0}],
+            'nao_encontrados': [0, self.eventos[3].pk],
+        })
+
+        self.assertEqual(self.client.get(reverse('api-eventos-lote'), {'ids': 'a,b'}).status_code, 400)
+        muitos = ','.join(str(indice) for indice in range(1, 102))
+        self.assertEqual(self.client.get(reverse('api-eventos-lote'), {'ids': muitos}).status_code, 400)
+
+    def test_numeros_invalidos_sao_400(self):
+        for rota, parametros in [
+            ('api-eventos-lote', {'ids': '²'}),
+            ('api-eventos-lote', {'ids': '99999999999999999999'}),
+            ('api-eventos-lote', {'ids': '-1'}),
+            ('api-eventos', {'tamanho': '²'}),
+            ('api-eventos', {'tamanho': '99999999999999999999'}),
+        ]:
+            with self.subTest(parametros=parametros):
+                resposta = self.client.get(reverse(rota), parametros)
+                self.assertEqual(resposta.status_code, 400)
+                self.assertIn('erro', resposta.json())
+
+    def test_cabecalhos_de_cache_e_304(self):
+        url = reverse('api-eventos-lote') + f'?ids={self.eventos[1].pk}'
+        resposta = self.client.get(url)
+        self.assertIn('public', resposta['Cache-Control'])
+        self.assertIn('max-age=30', resposta['Cache-Control'])
+        self.assertFalse(resposta.has_header('Vary'))
+
+        with self.assertNumQueries(1):
+            revalidada = self.client.get(url, HTTP_IF_NONE_MATCH=resposta['ETag'])
+        self.assertEqual(revalidada.status_code, 304)
+
+        # uma inscrição muda as vagas e, com elas, o ETag
+        participante = Participante.objects.create(nome="Nova", email='nova@example.com', telefone='1', genero='F')
+        Inscricao.objects.create(evento=self.eventos[1], participante=participante)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=resposta['ETag']).status_code, 200)
+
+
+class BuscaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.promotor = User.objects.create_user('promotor', 'promotor@example.com', 'senha-segura')
+
+    def criar(self, titulo, descricao="Descrição", local="Local"):
+        return Evento.objects.create(
+            titulo=titulo, descricao=descricao, data=timezone.localdate(), local=local,
+            capacidade_maxima=10, criado_por=self.promotor,
+        )
+
+    def test_titulo_pesa_mais_que_descricao(self):
+        na_descricao = self.criar("Encontro", descricao="Noite de música ao vivo")
+        no_titulo = self.criar("Música no parque")
+        self.criar("Palestra")
+        self.assertEqual(busca.buscar('musica').itens, [no_titulo, na_descricao])
+
+    def test_indice_acompanha_edicao_e_exclusao(self):
+        evento = self.criar("Feira de livros")
+        evento.titulo = "Feira de discos"
+        evento.save()
+        self.assertEqual(busca.buscar('livros').itens, [])
+        self.assertEqual(busca.buscar('disc').itens, [evento])
+        evento.delete()
+        self.assertEqual(busca.buscar('discos').itens, [])
+
+    def test_paginacao_por_cursor(self):
+        for indice in range(5):
+            self.criar(f"Oficina {indice}", descricao="oficina " * indice)
+        vistos = []
+        cursor = None
+        while True:
+            pagina = busca.buscar('oficina', cursor, tamanho=2)
+            vistos.extend(pagina.itens)
+            if not pagina.tem_proxima:
+                break
+            cursor = pagina.proximo_cursor
+        self.assertEqual(len(set(vistos)), 5)
+
+    def test_mais_relevante_vem_primeiro_mesmo_sendo_o_mais_antigo(self):
+        # o ranking cobre todos os que casam, não só os mais recentes
+        antigo = self.criar("Maratona de programação")
+        for indice in range(30):
+            self.criar(f"Encontro {indice}", descricao="Uma maratona qualquer")
+        pagina = busca.buscar('maratona', tamanho=5)
+        self.assertEqual(pagina.itens[0], antigo)
+        self.assertTrue(pagina.tem_proxima)
+
+    def test_sintaxe_do_usuario_nao_quebra_a_busca(self):
+        self.criar("Show de rock")
+        resposta = self.client.get(reverse('evento-busca'), {'q': '"rock" OR (* NEAR'})
+        self.assertEqual(resposta.status_code, 200)
+
+
+class ExportacaoParticipantesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.promotor = User.objects.create_user('promotor', 'promotor@example.com', 'senha-segura')
+        cls.eventos = [
+            Evento.objects.create(
+                titulo=titulo, descricao="Descrição", data=timezone.localdate(), local="Local",
+                capacidade_maxima=10, criado_por=cls.promotor,
+            )
+            for titulo in ("Primeiro", "Segundo")
+        ]
+        outro = User.objects.create_user('outro', 'outro@example.com', 'senha-segura')
+        alheio = Evento.objects.create(
+            titulo="Alheio", descricao="Descrição", data=timezone.localdate(), local="Local",
+            capacidade_maxima=10, criado_por=outro,
+        )
+        for evento, nome, feedback in [
+            (cls.eventos[0], "Ana", "=HYPERLINK(\"http://example.com\")"),
+            (cls.eventos[1], "@Bruno", None),
+            (alheio, "Carla", None),
+        ]:
+            participante = Participante.objects.create(
+                nome=nome, email=f'{nome.strip("@").lower()}@example.com', telefone='+5511999999999', genero='F'
+            )
+            Inscricao.objects.create(evento=evento, participante=participante, feedback=feedback)
+
+    def setUp(self):
+        self.client.force_login(self.promotor)
+
+    def exportar(self, **parametros):
+        resposta = self.client.get(reverse('participantes-export'), parametros)
+        self.assertTrue(resposta.streaming)
+        return resposta, b''.join(resposta.streaming_content)
+
+    def test_csv_com_colunas_escolhidas_e_formulas_neutralizadas(self):
+        resposta, conteudo = self.exportar(colunas='nome,telefone,feedback')
+        self.assertEqual(resposta['Content-Disposition'], 'attachment; filename="participantes.csv"')
+        linhas = list(csv.reader(io.StringIO(conteudo.decode('utf-8-sig'))))
+        self.assertEqual(linhas, [
+            ["Nome", "Telefone", "Feedback"],
+            ["Ana", "'+5511999999999", "'=HYPERLINK(\"http://example.com\")"],
+            ["'@Bruno", "'+5511999999999", ""],
+        ])
+
+    def test_filtro_por_evento(self):
+        _, conteudo = self.exportar(colunas='evento,nome', evento=self.eventos[1].pk)
+        self.assertEqual(conteudo.decode('utf-8-sig').splitlines(), ["Evento,Nome", "Segundo,'@Bruno"])
+
+    def test_xlsx_e_uma_planilha_valida(self):
+        resposta, conteudo = self.exportar(formato='xlsx', colunas='nome,email')
+        self.assertEqual(resposta['Content-Disposition'], 'attachment; filename="participantes.xlsx"')
+        with zipfile.ZipFile(io.BytesIO(conteudo)) as pacote:
+            self.assertIsNone(pacote.testzip())
+            planilha = pacote.read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(planilha.count('<row>'), 3)
+        self.assertIn('>Email</t>', planilha)
+        self.assertIn(">'@Bruno</t>", planilha)
+        self.assertNotIn('Carla', planilha)
+
+    def test_parametros_invalidos_antes_do_streaming(self):
+        for parametros in [
+            {'evento': '²'}, {'evento': '99999999999999999999'}, {'evento': 'abc'},
+            {'formato': 'pdf'}, {'colunas': 'nome,senha'},
+        ]:
+            with self.subTest(parametros=parametros):
+                resposta = self.client.get(reverse('participantes-export'), parametros)
+                self.assertEqual(resposta.status_code, 400)
+                self.assertFalse(resposta.streaming)
+
+
+class ImportacaoInscricoesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.promotor = User.objects.create_user('promotor', 'promotor@example.com', 'senha-segura')
+        cls.evento = Evento.objects.create(
+            titulo="Evento", descricao="Descrição", data=timezone.localdate(), local="Local",
+            capacidade_maxima=5, criado_por=cls.promotor,
+        )
+        participante = Participante.objects.create(
+            nome="Já inscrito", email='ja@example.com', telefone='11900000000', genero='O'
+        )
+        Inscricao.objects.create(evento=cls.evento, participante=participante)
+
+    def csv(self, *linhas):
+        return io.StringIO('nome,email,telefone,genero\n' + ''.join(f'{linha}\n' for linha in linhas))
+
+    def test_importa_validas_e_relata_erros_por_linha(self):
+        resultado = importar_inscricoes(self.evento, self.csv(
+            'Ana,Ana@Example.com ,11911111111,F',
+            'Sem email,,11922222222,M',
+            'Ana de novo,ana@example.com,11933333333,F',
+            'Repetida,JA@example.com,11944444444,O',
+            'Bruno,bruno@example.com,11955555555,X',
+            'Carla,carla@example.com,11966666666,F',
+        ))
+        self.assertEqual(resultado.importadas, 2)
+        self.assertEqual(resultado.ja_inscritas, 1)
+        self.assertEqual([linha for linha, _ in resultado.erros], [3, 4, 6])
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.inscritos, 3)
+        self.assertEqual(Inscricao.objects.filter(evento=self.evento).count(), 3)
+
+    def test_capacidade_conferida_para_o_arquivo_inteiro(self):
+        linhas = [f'Pessoa {indice},pessoa{indice}@example.com,11900000000,O' for indice in range(5)]
+        with self.assertRaises(ImportacaoInvalida):
+            importar_inscricoes(self.evento, self.csv(*linhas), tamanho_lote=2)
+        self.evento.refresh_from_db()
+        self.assertEqual(self.evento.inscritos, 1)
+        self.assertEqual(Participante.objects.count(), 1)
+
+    def test_participante_existente_nao_e_reescrito(self):
+        importar_inscricoes(self.evento, self.csv('Outro Nome,ja@example.com,11999999999,M'))
+        participante = Participante.objects.get(email='ja@example.com')
+        self.assertEqual((participante.nome, participante.telefone), ("Já inscrito", '11900000000'))
+
+    def test_comando_ignora_evento_excluido(self):
+        Evento.objects.filter(pk=self.evento.pk).update(excluido=True)
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='utf-8') as arquivo:
+            arquivo.write('nome,email,telefone\nDani,dani@example.com,11977777777\n')
+            arquivo.flush()
+            with self.assertRaisesMessage(CommandError, "não encontrado"):
+                call_command('importar_inscricoes', self.evento.pk, arquivo.name)
+        self.assertFalse(Participante.objects.filter(email='dani@example.com').exists())
+
+    def test_upload_pelo_promotor(self):
+        self.client.force_login(self.promotor)
+        arquivo = SimpleUploadedFile(
+            'grupo.csv', '\ufeffNome,Email,Telefone\nDani,dani@example.com,11977777777\n'.encode(), 'text/csv'
+        )
+        resposta = self.client.post(reverse('evento-importar', args=[self.evento.pk]), {'arquivo': arquivo})
+        self.assertEqual(resposta.context['resultado'].importadas, 1)
+        self.assertTrue(Inscricao.objects.filter(evento=self.evento, participante__email='dani@example.com').exists())
+
+    def test_outro_usuario_nao_importa(self):
+        self.client.force_login(User.objects.create_user('outro', 'outro@example.com', 'senha-segura'))
+        resposta = self.client.get(reverse('evento-importar', args=[self.evento.pk]))
+        self.assertRedirects(resposta, reverse('evento-list'))
+
+
+class BackendQueFalha(locmem.EmailBackend):
+    """locmem que recusa um destinatário e conta quantas vezes a conexão foi aberta."""
+
+    def __init__(self, recusar=(), **kwargs):
+        super().__init__(**kwargs)
+        self.recusar = set(recusar)
+        self.aberturas = 0
+
+    def open(self):
+        self.aberturas += 1
+        return True
+
+    def send_messages(self, mensagens):
+        for mensagem in mensagens:
+            if self.recusar.intersection(mensagem.to):
+                raise OSError("550 destinatário recusado")
+        return super().send_messages(mensagens)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class FilaDeEmailsTests(TestCase):
+    def setUp(self):
+        for indice in range(3):
+            enfileirar_email(f'p{indice}@example.com', f"Assunto {indice}", "Corpo")
+
+    def test_lote_enviado_numa_conexao(self):
+        self.assertEqual(enviar_lote(), (3, 0))
+        self.assertEqual([mensagem.to for mensagem in mail.outbox], [[f'p{indice}@example.com'] for indice in range(3)])
+        self.assertFalse(EmailPendente.objects.filter(enviado_em__isnull=True).exists())
+        self.assertEqual(enviar_lote(), (0, 0))
+
+    def test_falha_numa_mensagem_reabre_a_conexao_e_segue(self):
+        conexao = BackendQueFalha(recusar=['p1@example.com'])
+        with self.assertLogs('eventos.emails', 'WARNING'):
+            self.assertEqual(enviar_lote(conexao=conexao), (2, 1))
+        self.assertEqual(conexao.aberturas, 2)
+        self.assertEqual(len(mail.outbox), 2)
+        falhou = EmailPendente.objects.get(destinatario='p1@example.com')
+        self.assertEqual((falhou.tentativas, falhou.enviado_em), (1, None))
+        self.assertIn("550", falhou.erro)
+
+    def test_servidor_fora_do_ar_devolve_o_lote_com_espera(self):
+        antes = timezone.now()
+        with patch.object(locmem.EmailBackend, 'open', side_effect=ConnectionRefusedError("recusada")), \
+                self.assertLogs('eventos.emails', 'WARNING') as registros:
+            self.assertEqual(enviar_lote(), (0, 3))
+        self.assertEqual(len(registros.records), 3)
+        self.assertEqual(mail.outbox, [])
+        for pendente in EmailPendente.objects.all():
+            self.assertEqual(pendente.tentativas, 1)
+            self.assertIn("recusada", pendente.erro)
+            # volta com a espera da primeira falha, não com a reserva de 10 minutos
+            self.assertLessEqual(pendente.proxima_tentativa, antes + espera_apos(1) + datetime.timedelta(seconds=5))
+
+    def test_modo_continuo_sobrevive_a_erros(self):
+        erros = io.StringIO()
+        lotes = [OperationalError("database is locked"), (1, 0), (0, 0), KeyboardInterrupt]
+        with patch('eventos.management.commands.enviar_emails.enviar_lote', side_effect=lotes) as enviar, \
+                patch('eventos.management.commands.enviar_emails.time.sleep'), \
+                patch('eventos.management.commands.enviar_emails.close_old_connections') as fechar:
+            with self.assertRaises(KeyboardInterrupt):
+                call_command('enviar_emails', '--continuo', stdout=io.StringIO(), stderr=erros)
+        self.assertEqual(enviar.call_count, 4)
+        fechar.assert_called_once()
+        self.assertIn("database is locked", erros.getvalue())
+
+
+class CacheDosCardsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        promotor = User.objects.create_user('promotor', 'promotor@example.com', 'senha-segura')
+        cls.eventos = [
+            Evento.objects.create(
+                titulo=f"Evento {indice}", descricao="Descrição", data=timezone.localdate(), local="Local",
+                capacidade_maxima=10, criado_por=promotor,
+            )
+            for indice in range(2)
+        ]
+
+    def setUp(self):
+        # default e métricas privados; as métricas num diretório, como em produção
+        diretorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, diretorio, ignore_errors=True)
+        # o que outros testes deixaram pendente no processo não entra na contagem daqui
+        metricas.descarregar()
+        configuracao = override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': diretorio},
+            'metricas': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': diretorio},
+        })
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        self.addCleanup(metricas.descarregar)
+        self.renderizados = []
+
+    def cards(self):
+        cards = CardsEmCache(self.eventos)
+        return [cards.obter(evento, lambda evento=evento: self.renderizar(evento)) for evento in self.eventos]
+
+    def renderizar(self, evento):
+        self.renderizados.append(evento.pk)
+        return f'<div>{evento.titulo}</div>'
+
+    def contadores(self):
+        metricas.descarregar()
+        return metricas.ler('cards_acertos', 'cards_falhas')
+
+    def test_acertos_falhas_e_invalidacao_por_versao(self):
+        self.assertEqual(self.cards(), ['<div>Evento 0</div>', '<div>Evento 1</div>'])
+        self.assertEqual(self.cards(), ['<div>Evento 0</div>', '<div>Evento 1</div>'])
+        self.assertEqual(self.renderizados, [self.eventos[0].pk, self.eventos[1].pk])
+        self.assertEqual(self.contadores(), {'cards_acertos': 2, 'cards_falhas': 2})
+
+        # uma inscrição sobe a versão só do seu evento
+        participante = Participante.objects.create(nome="Ana", email='ana@example.com', telefone='1', genero='F')
+        with self.captureOnCommitCallbacks(execute=True):
+            Inscricao.objects.create(evento=self.eventos[1], participante=participante)
+        self.renderizados.clear()
+        self.cards()
+        self.assertEqual(self.renderizados, [self.eventos[1].pk])
+        self.assertEqual(self.contadores(), {'cards_acertos': 3, 'cards_falhas': 3})
+
+    def test_pendentes_saem_sem_novo_incremento(self):
+        with patch.object(metricas, 'INTERVALO', 0.05):
+            metricas.descarregar()
+            metricas.incrementar('cards_acertos')
+            self.assertEqual(metricas.ler('cards_acertos'), {'cards_acertos': 0})
+            time.sleep(0.3)
+        self.assertEqual(metricas.ler('cards_acertos'), {'cards_acertos': 1})
+
+    def test_comando_le_o_que_os_workers_somaram(self):
+        self.cards()
+        saida = io.StringIO()
+        call_command('estatisticas_cache', '--zerar', stdout=saida)
+        self.assertIn("Falhas: 2", saida.getvalue())
+        self.assertEqual(self.contadores(), {'cards_acertos': 0, 'cards_falhas': 0})
+
+
+def png(largura, altura, cor='red'):
+    conteudo = io.BytesIO()
+    Image.new('RGB', (largura, altura), cor).save(conteudo, 'PNG')
+    return conteudo.getvalue()
+
+
+class BannersEmDiscoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.promotor = User.objects.create_user('promotor', 'promotor@example.com', 'senha-segura')
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        configuracao = override_settings(
+            MEDIA_ROOT=self.media,
+            STORAGES={**settings.STORAGES, 'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'}},
+        )
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+    def criar(self, conteudo):
+        return Evento.objects.create(
+            titulo="Evento", descricao="Descrição", data=timezone.localdate(), local="Local",
+            capacidade_maxima=10, criado_por=self.promotor, banner_pendente=True,
+            banner=SimpleUploadedFile('banner.png', conteudo, 'image/png'),
+        )
+
+    def arquivos(self, derivados):
+        return [nome for nomes in derivados.values() for nome in nomes.values()]
+
+    def existe(self, nome):
+        return Path(self.media, nome).exists()
+
+    def test_troca_de_banner_remove_os_derivados_antigos_depois_de_gravar(self):
+        evento = self.criar(png(1000, 500))
+        self.assertEqual(processar_pendentes(), (1, 0))
+        evento.refresh_from_db()
+        antigos = self.arquivos(evento.banner_derivados)
+        self.assertEqual(len(antigos), 4)
+        self.assertTrue(all(self.existe(nome) for nome in antigos))
+
+        evento.banner = SimpleUploadedFile('novo.png', png(300, 300, 'blue'), 'image/png')
+        evento.banner_pendente = True
+        evento.save()
+        processar_pendentes()
+        evento.refresh_from_db()
+        novos = self.arquivos(evento.banner_derivados)
+        self.assertEqual(len(novos), 2)
+        self.assertTrue(all(self.existe(nome) for nome in novos))
+        self.assertFalse(any(self.existe(nome) for nome in antigos))
+
+    def test_banner_trocado_durante_o_processamento_mantem_os_derivados_em_uso(self):
+        evento = self.criar(png(500, 500))
+        processar_pendentes()
+        evento.refresh_from_db()
+        em_uso = self.arquivos(evento.banner_derivados)
+        Evento.objects.filter(pk=evento.pk).update(banner_pendente=True)
+
+        gerados = []
+
+        def gerar_e_trocar(evento):
+            derivados = gerar_derivados(evento)
+            gerados.extend(self.arquivos(derivados))
+            Evento.objects.filter(pk=evento.pk).update(banner='banners/outro.png')
+            return derivados
+
+        with patch('eventos.imagens.gerar_derivados', side_effect=gerar_e_trocar):
+            processar_pendentes()
+        evento.refresh_from_db()
+        self.assertTrue(evento.banner_pendente)
+        self.assertEqual(self.arquivos(evento.banner_derivados), em_uso)
+        self.assertTrue(all(self.existe(nome) for nome in em_uso))
+        self.assertFalse(any(self.existe(nome) for nome in gerados))
+
+    def test_bomba_de_descompressao_usa_o_original(self):
+        evento = self.criar(png(40, 40))
+        with patch.object(Image, 'MAX_IMAGE_PIXELS', 100), self.assertLogs('eventos.imagens', 'WARNING'):
+            self.assertEqual(processar_pendentes(), (1, 1))
+        evento.refresh_from_db()
+        self.assertEqual((evento.banner_pendente, evento.banner_derivados), (False, {}))
+
+
+# as rotas do modo ASGI (SERVIDOR_ASYNC): as mesmas URLs, com as views assíncronas
+VIEWS_ASSINCRONAS = {
+    'evento-list': EventoListAsyncView,
+    'evento-inscricao': InscricaoCreateAsyncView,
+    'participantes-list': ParticipantesListAsyncView,
+}
+urlpatterns = [
+    path(str(padrao.pattern), VIEWS_ASSINCRONAS[padrao.name].as_view(), name=padrao.name)
+    if getattr(padrao, 'name', None) in VIEWS_ASSINCRONAS else padrao
+    for padrao in urls_do_projeto.urlpatterns
+]
+
+
+@override_settings(ROOT_URLCONF=__name__, LIMITES_DE_TAXA={})
+class ViewsAssincronasTests(TransactionTestCase):
+    # as views assíncronas consultam em threads do pool, com conexões próprias que
+    # não enxergariam a transação aberta por um TestCase
+
+    def setUp(self):
+        self.promotor = User.objects.create_user('promotor', 'promotor@example.com', 'senha-segura')
+        self.evento = Evento.objects.create(
+            titulo="Evento assíncrono", descricao="Descrição", data=timezone.localdate(), local="Local",
+            capacidade_maxima=10, criado_por=self.promotor,
+        )
+
+    async def test_listagem(self):
+        resposta = await self.async_client.get(reverse('evento-list'))
+        self.assertIs(resposta.resolver_match.func.view_class, EventoListAsyncView)
+        self.assertContains(resposta, "Evento assíncrono")
+
+    async def test_inscricao(self):
+        url = reverse('evento-inscricao', args=[self.evento.pk])
+        self.assertContains(await self.async_client.get(url), 'name="email"')
+        resposta = await self.async_client.post(url, {
+            'nome': "Ana", 'email': 'ana@example.com', 'telefone': '1', 'genero': 'F',
+        })
+        self.assertRedirects(resposta, reverse('evento-list'), fetch_redirect_response=False)
+        self.assertTrue(await Inscricao.objects.filter(evento=self.evento, participante__email='ana@example.com').aexists())
+        await self.evento.arefresh_from_db()
+        self.assertEqual(self.evento.inscritos, 1)
+
+    async def test_participantes(self):
+        participante = await Participante.objects.acreate(
+            nome="Ana", email='ana@example.com', telefone='1', genero='F'
+        )
+        await em_thread(Inscricao.objects.create)(evento=self.evento, participante=participante)
+        url = reverse('participantes-list')
+        self.assertRedirects(
+            await self.async_client.get(url), f"{settings.LOGIN_URL}?next={url}", fetch_redirect_response=False
+        )
+        await self.async_client.aforce_login(self.promotor)
+        resposta = await self.async_client.get(url)
+        self.assertIs(resposta.resolver_match.func.view_class, ParticipantesListAsyncView)
+        self.assertContains(resposta, 'ana@example.com')
+
+    @override_settings(
+        PERFILAMENTO_ATIVO=True,
+        LIMITES_DE_TAXA={'evento-inscricao': {'metodos': ['POST'], 'baldes': {'ip': (1, 60)}}},
+    )
+    async def test_middlewares_rodam_no_modo_assincrono(self):
+        async def view(request):
+            return HttpResponse()
+
+        for classe in (PerfilamentoMiddleware, LimiteDeTaxaMiddleware):
+            self.assertTrue(iscoroutinefunction(classe(view)))
+
+        await em_thread(cache.clear)()
+        url = reverse('evento-inscricao', args=[self.evento.pk])
+        dados = {'nome': "Ana", 'email': 'ana@example.com', 'telefone': '1', 'genero': 'F'}
+        with self.assertLogs('eventos.perfilamento', 'INFO'):
+            resposta = await self.async_client.get(reverse('evento-list'))
+            # as consultas feitas nas threads do pool também entram na conta
+            self.assertRegex(resposta['Server-Timing'], r'desc="[1-9]\d* consultas"')
+            self.assertEqual((await self.async_client.post(url, dados)).status_code, 302)
+            self.assertEqual((await self.async_client.post(url, dados)).status_code, 429)
+
+
+@override_settings(PERFILAMENTO_ATIVO=True)
+class PerfilamentoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        promotor = User.objects.create_user('promotor', 'promotor@example.com', 'senha-segura')
+        cls.evento = Evento.objects.create(
+            titulo="Evento", descricao="Descrição", data=timezone.localdate(), local="Local",
+            capacidade_maxima=10, criado_por=promotor,
+        )
+
+    def setUp(self):
+        # o que outros testes deixaram pendente no processo não entra nos histogramas daqui
+        metricas.descarregar()
+        configuracao = override_settings(CACHES={
+            **settings.CACHES,
+            'metricas': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'perf-{self.id()}'},
+        })
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        self.addCleanup(perfilamento.desinstalar)
+        self.addCleanup(metricas.descarregar)
+
+    def medir(self, get_response, caminho='/'):
+        requisicao = RequestFactory().get(caminho)
+        requisicao.resolver_match = resolve(caminho)
+        with self.assertLogs('eventos.perfilamento', 'INFO') as registros:
+            resposta = PerfilamentoMiddleware(get_response)(requisicao)
+        return resposta, json.loads(registros.records[0].getMessage())
+
+    def test_cabecalho_server_timing(self):
+        with self.assertLogs('eventos.perfilamento', 'INFO'):
+            resposta = self.client.get(reverse('evento-list'))
+        self.assertRegex(
+            resposta['Server-Timing'],
+            r'^db;dur=\d+\.\d;desc="[1-9]\d* consultas", tpl;dur=\d+\.\d, total;dur=\d+\.\d$',
+        )
+        # estáticos saem pelo WhiteNoise antes de chegar ao perfilamento
+        self.assertLess(
+            settings.MIDDLEWARE.index('whitenoise.middleware.WhiteNoiseMiddleware'),
+            settings.MIDDLEWARE.index('eventos.perfilamento.PerfilamentoMiddleware'),
+        )
+
+    def test_consultas_duplicadas(self):
+        def view(request):
+            for _ in range(3):
+                Evento.objects.filter(pk=self.evento.pk).exists()
+            User.objects.count()
+            return HttpResponse()
+
+        _, registro = self.medir(view)
+        self.assertEqual((registro['view'], registro['consultas'], registro['duplicadas']), ('evento-list', 4, 2))
+
+    def test_histograma_por_rota(self):
+        for _ in range(2):
+            self.medir(lambda request: HttpResponse())
+        saida = io.StringIO()
+        call_command('perfilamento', '--zerar', stdout=saida)
+        self.assertIn("evento-list: 2 req", saida.getvalue())
+        self.assertIn(f"{'<= 5 ms':>12} {2:7} {'#' * 40}", saida.getvalue())
+        saida = io.StringIO()
+        call_command('perfilamento', stdout=saida)
+        self.assertEqual(saida.getvalue(), '')
+
+    def test_desligado_nao_altera_cursores_nem_templates(self):
+        self.medir(lambda request: HttpResponse())
+        self.assertIsNot(Template.render, perfilamento._render_original)
+        with override_settings(PERFILAMENTO_ATIVO=False), self.assertRaises(MiddlewareNotUsed):
+            PerfilamentoMiddleware(lambda request: HttpResponse())
+        self.assertIs(Template.render, perfilamento._render_original)
+        self.assertIs(CursorWrapper.execute, perfilamento._execute_original)
+
+
+class ContadoresDeConexaoTests(TestCase):
+    def setUp(self):
+        metricas.descarregar()
+        configuracao = override_settings(CACHES={
+            **settings.CACHES,
+            'metricas': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'conexoes-{self.id()}'},
+        })
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        self.addCleanup(metricas.descarregar)
+
+    def contadores(self):
+        metricas.descarregar()
+        return metricas.ler(*CONTADORES)
+
+    def test_requisicoes_conexoes_e_pool(self):
+        self.client.get(reverse('login'))
+        nova = connections.create_connection('default')
+        nova.ensure_connection()
+        nova.close()
+
+        class Pool:
+            def pop_stats(self):
+                return {'requests_num': 3, 'requests_queued': 1, 'requests_wait_ms': 40, 'pool_size': 2}
+
+        with patch.object(connection, 'pool', Pool(), create=True):
+            request_finished.send(sender=self.__class__)
+
+        valores = self.contadores()
+        self.assertEqual((valores['db_requisicoes'], valores['db_conexoes_abertas']), (2, 1))
+        self.assertEqual(
+            (valores['db_pool_checkouts'], valores['db_pool_esperas'], valores['db_pool_espera_ms']), (3, 1, 40)
+        )
+
+        saida = io.StringIO()
+        call_command('estatisticas_conexoes', '--zerar', stdout=saida)
+        self.assertIn("Requisições: 2", saida.getvalue())
+        self.assertIn("Requisições sem abrir conexão nova: 50.0%", saida.getvalue())
+        self.assertEqual(self.contadores()['db_requisicoes'], 0)
+
+
+class ArquivosEstaticosTests(SimpleTestCase):
+    css = 'eventos/vendor/bootstrap-5.3.2/bootstrap.min.css'
+
+    def test_collectstatic_gera_nomes_com_hash_e_versoes_comprimidas(self):
+        with tempfile.TemporaryDirectory() as destino, override_settings(STATIC_ROOT=destino):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            url = static(self.css)
+            self.assertRegex(url, r'^/static/eventos/vendor/bootstrap-5\.3\.2/bootstrap\.min\.[0-9a-f]{12}\.css$')
+            arquivo = Path(destino) / url.removeprefix('/static/')
+            self.assertTrue(arquivo.with_name(arquivo.name + '.gz').exists())
+            self.assertTrue(arquivo.with_name(arquivo.name + '.br').exists())
+
+            servidor = WhiteNoiseMiddleware(lambda request: HttpResponse(status=404))
+            resposta = servidor(RequestFactory().get(url, HTTP_ACCEPT_ENCODING='gzip, br'))
+            self.assertEqual(resposta.status_code, 200)
+            self.assertEqual(resposta['Content-Encoding'], 'br')
+            self.assertIn('immutable', resposta['Cache-Control'])
+            resposta.close()
+
+    def test_sem_manifesto_usa_o_nome_original(self):
+        self.assertEqual(static(self.css), f'/static/{self.css}')
+
+
+class LimiteDeConsultasTests(TestCase):
+    def test_rotas_respeitam_limite_de_consultas(self):
+        cache.clear()
+        cenario = benchmark.popular(eventos=30, inscricoes=300, promotores=3)
+        for rota in benchmark.rotas(cenario):
+            with self.subTest(rota=rota[0]):
+                resultado = benchmark.medir(rota, repeticoes=2)
+                self.assertLessEqual(resultado['consultas'], resultado['limite_consultas'])
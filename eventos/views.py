@@ -1,34 +1,201 @@
-from .forms import RegistrationForm, EventoForm, ParticipanteForm, FeedbackForm, UserEmailPasswordForm
-from django.shortcuts import render, get_object_or_404, redirect
+from .forms import (
+    RegistrationForm, EventoForm, ParticipanteForm, FeedbackForm, UserEmailPasswordForm, ImportacaoInscricoesForm,
+    FiltroParticipantesForm,
+)
+from django.shortcuts import render, get_object_or_404, aget_object_or_404, redirect
+from django.conf import settings
+from django.http import HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.urls import reverse_lazy
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.views.generic import ListView, CreateView, UpdateView, DeleteView, View
+from django.views.generic import ListView, CreateView, UpdateView, DeleteView, DetailView, View
 from django.contrib import messages
 from django.contrib.auth import update_session_auth_hash
 from django.utils.decorators import method_decorator
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.views import redirect_to_login
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+import io
 
-from .models import Evento, Participante, Inscricao
+from . import api
+from .models import Evento, EventoArquivado, EventoLotado, Participante, Inscricao
+from .assincrono import em_thread
+from .busca import buscar
+from .cache import CardsEmCache
+from .condicional import validadores_da_api, validadores_da_listagem, validadores_dos_participantes
+from .emails import enfileirar_confirmacao
+from .espera import entrar_na_lista_de_espera, posicao_na_fila, promover_da_lista_de_espera
+from .exclusao import excluir_evento
+from .exportacao import COLUNAS, gerar_csv, gerar_xlsx
+from .importacao import ImportacaoInvalida, importar_inscricoes
+from .paginacao import MAX_PK, apaginar_keyset, paginar_keyset
 
 class EventoOwnerMixin(UserPassesTestMixin):
     def test_func(self):
         evento = self.get_object()
-        return evento.criado_por == self.request.user
+        return evento.criado_por_id == self.request.user.pk
 
     def handle_no_permission(self):
         messages.error(self.request, "Você não tem permissão para realizar essa ação.")
         return redirect('evento-list')
 
-class EventoListView(ListView):
+class RespostaCondicionalMixin:
+    # responde 304 a If-None-Match/If-Modified-Since só com as consultas agregadas
+    # de get_validadores, sem buscar linhas nem renderizar o template
+    def get_validadores(self):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        validadores = self.get_validadores()
+        if validadores is None:
+            return super().get(request, *args, **kwargs)
+        nao_modificado = validadores.nao_modificado(request)
+        if nao_modificado is not None:
+            return nao_modificado
+        return validadores.aplicar(super().get(request, *args, **kwargs))
+
+def eventos_da_listagem(passados):
+    hoje = timezone.localdate()
+    if passados:
+        return Evento.objects.ativos().filter(data__lt=hoje)
+    return Evento.objects.ativos().filter(data__gte=hoje)
+
+class EventoListView(RespostaCondicionalMixin, ListView):
     model = Evento
     template_name = 'eventos/evento_list.html'
     context_object_name = 'eventos'
+    tamanho_pagina = 12
+
+    def get_queryset(self):
+        self.passados = self.request.GET.get('passados') == '1'
+        self.pagina = paginar_keyset(
+            eventos_da_listagem(self.passados), 'data', self.request.GET.get('cursor'), self.tamanho_pagina,
+            descendente=self.passados,
+        )
+        return self.pagina.itens
+
+    def get_validadores(self):
+        return validadores_da_listagem(self.request)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['user'] = self.request.user
+        context['pagina'] = self.pagina
+        context['cards'] = CardsEmCache(self.pagina.itens)
+        context['passados'] = self.passados
+        return context
+
+class EventoListAsyncView(View):
+    template_name = EventoListView.template_name
+    tamanho_pagina = EventoListView.tamanho_pagina
+
+    async def get(self, request):
+        validadores = await em_thread(validadores_da_listagem)(request)
+        if validadores is not None:
+            nao_modificado = validadores.nao_modificado(request)
+            if nao_modificado is not None:
+                return nao_modificado
+        passados = request.GET.get('passados') == '1'
+        pagina = await apaginar_keyset(
+            eventos_da_listagem(passados), 'data', request.GET.get('cursor'), self.tamanho_pagina,
+            descendente=passados,
+        )
+        user = await request.auser()
+        cards = await em_thread(CardsEmCache)(pagina.itens)
+        context = {
+            'eventos': pagina.itens,
+            'object_list': pagina.itens,
+            'user': user,
+            'pagina': pagina,
+            'passados': passados,
+            'cards': cards,
+        }
+        resposta = await em_thread(render)(request, self.template_name, context)
+        return validadores.aplicar(resposta) if validadores is not None else resposta
+
+class EventoBuscaView(View):
+    tamanho_pagina = 20
+
+    def get(self, request):
+        termo = request.GET.get('q', '').strip()
+        pagina = buscar(termo, request.GET.get('cursor'), self.tamanho_pagina)
+        return render(request, 'eventos/evento_busca.html', {
+            'termo': termo,
+            'eventos': pagina.itens,
+            'pagina': pagina,
+        })
+
+class EventoArquivadoListView(ListView):
+    template_name = 'eventos/evento_arquivado_list.html'
+    context_object_name = 'eventos'
+    tamanho_pagina = 20
+
+    def get_queryset(self):
+        self.pagina = paginar_keyset(
+            EventoArquivado.objects.all(), 'data', self.request.GET.get('cursor'), self.tamanho_pagina,
+            descendente=True,
+        )
+        return self.pagina.itens
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['pagina'] = self.pagina
         return context
 
+class EventoArquivadoDetailView(DetailView):
+    model = EventoArquivado
+    template_name = 'eventos/evento_arquivado_detail.html'
+    context_object_name = 'evento'
+    tamanho_pagina = 25
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # só o promotor vê as inscrições, uma página por vez como na lista de participantes
+        if self.object.criado_por_id == self.request.user.id:
+            context['pagina'] = paginar_keyset(
+                self.object.inscricoes.all(), 'data_inscricao', self.request.GET.get('cursor'), self.tamanho_pagina,
+            )
+            context['inscricoes'] = context['pagina'].itens
+        return context
+
+def resposta_da_api(request, eventos, montar):
+    # os agregados de "eventos" decidem o 304 antes de montar o corpo
+    validadores = validadores_da_api(eventos)
+    resposta = validadores.nao_modificado(request)
+    if resposta is None:
+        resposta = JsonResponse(montar(), json_dumps_params={'separators': (',', ':')})
+    return validadores.aplicar(resposta, max_age=getattr(settings, 'API_MAX_AGE', 15))
+
+def erro_da_api(erro):
+    return JsonResponse({'erro': str(erro)}, status=400)
+
+class EventoApiListView(View):
+    """Próximos eventos (ou passados, com passados=1) em JSON, só com os campos pedidos."""
+
+    def get(self, request):
+        try:
+            campos = api.campos_pedidos(request.GET.get('campos'))
+            tamanho = api.tamanho_pedido(request.GET.get('tamanho'))
+        except api.ParametroInvalido as erro:
+            return erro_da_api(erro)
+        passados = request.GET.get('passados') == '1'
+        return resposta_da_api(request, Evento.objects.all(), lambda: api.pagina_de_eventos(
+            eventos_da_listagem(passados), campos, request.GET.get('cursor'), tamanho, descendente=passados,
+        ))
+
+class EventoApiLoteView(View):
+    """Vários eventos por id (ids=1,2,3) numa consulta só, na ordem pedida."""
+
+    def get(self, request):
+        try:
+            campos = api.campos_pedidos(request.GET.get('campos'))
+            ids = api.ids_pedidos(request.GET.get('ids'))
+        except api.ParametroInvalido as erro:
+            return erro_da_api(erro)
+        return resposta_da_api(request, Evento.objects.filter(pk__in=ids), lambda: api.lote_de_eventos(
+            Evento.objects.ativos(), ids, campos,
+        ))
+
 class EventoCreateView(LoginRequiredMixin, CreateView):
     model = Evento
     form_class = EventoForm
@@ -41,58 +208,170 @@ class EventoCreateView(LoginRequiredMixin, CreateView):
         return super().form_valid(form)
 
 class EventoUpdateView(LoginRequiredMixin, EventoOwnerMixin, UpdateView):
-    model = Evento
+    queryset = Evento.objects.ativos()
     form_class = EventoForm
     template_name = 'eventos/evento_form.html'
     success_url = reverse_lazy('evento-list')
 
     def form_valid(self, form):
+        with transaction.atomic():
+            resposta = super().form_valid(form)
+            if 'capacidade_maxima' in form.changed_data:
+                # vagas novas vão primeiro para quem está na lista de espera
+                promover_da_lista_de_espera(self.object.pk)
         messages.success(self.request, "Evento atualizado com sucesso.")
-        return super().form_valid(form)
+        return resposta
+
+class EventoPainelView(LoginRequiredMixin, EventoOwnerMixin, DetailView):
+    queryset = Evento.objects.ativos()
+    template_name = 'eventos/evento_painel.html'
+    context_object_name = 'evento'
+
+    def get_object(self, queryset=None):
+        # test_func e get usam o mesmo objeto: uma consulta só
+        if not hasattr(self, 'object'):
+            self.object = super().get_object(queryset)
+        return self.object
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # só os totais diários: o custo não depende do número de inscrições
+        diarias = list(self.object.inscricoes_diarias.all())
+        acumulado = 0
+        for diaria in diarias:
+            acumulado += diaria.total
+            diaria.acumulado = acumulado
+        generos = [
+            (rotulo, sum(getattr(diaria, campo) for diaria in diarias))
+            for campo, rotulo in (
+                ('masculino', "Masculino"), ('feminino', "Feminino"), ('outro', "Outro"),
+                ('sem_genero', "Não informado"),
+            )
+        ]
+        capacidade = self.object.capacidade_maxima
+        context['diarias'] = diarias
+        context['generos'] = [
+            (rotulo, quantidade, round(100 * quantidade / acumulado) if acumulado else 0)
+            for rotulo, quantidade in generos
+        ]
+        context['ocupacao'] = round(100 * self.object.inscritos / capacidade) if capacidade else 0
+        return context
 
 class EventoDeleteView(LoginRequiredMixin, EventoOwnerMixin, DeleteView):
-    model = Evento
+    queryset = Evento.objects.ativos()
     template_name = 'eventos/evento_confirm_delete.html'
     success_url = reverse_lazy('evento-list')
 
-    def delete(self, request, *args, **kwargs):
+    def form_valid(self, form):
+        # só marca o evento; as inscrições saem em lotes com purgar_eventos_excluidos
+        excluir_evento(self.object)
         messages.success(self.request, "Evento deletado com sucesso.")
-        return super().delete(request, *args, **kwargs)
+        return redirect(self.get_success_url())
 
-class InscricaoCreateView(View):
-    def get(self, request, evento_id):
-        evento = get_object_or_404(Evento, id=evento_id)
+def impedir_inscricao(request, evento, usuario):
+    if usuario.is_authenticated and evento.criado_por_id == usuario.pk:
+        messages.error(request, "Você é o promotor deste evento e não pode se inscrever.")
+        return redirect('evento-list')
+    # evento lotado não bloqueia: o formulário leva para a lista de espera
+    return None
 
-        if request.user.is_authenticated and evento.criado_por == request.user:
-            messages.error(request, "Você é o promotor deste evento e não pode se inscrever.")
+def processar_inscricao(request, evento):
+    form = ParticipanteForm(request.POST)
+    if form.is_valid():
+        try:
+            with transaction.atomic():
+                participante = form.save()
+                try:
+                    # Inscricao.save desfaz só o próprio savepoint, o participante fica
+                    inscricao = Inscricao.objects.create(evento=evento, participante=participante)
+                except EventoLotado:
+                    # sem vaga: uma entrada na fila em vez de novas tentativas
+                    entrada = entrar_na_lista_de_espera(evento, participante)
+                    if entrada is None:
+                        messages.error(request, "Este e-mail já está inscrito ou na lista de espera deste evento.")
+                    else:
+                        messages.info(
+                            request,
+                            f"Evento lotado: você entrou na lista de espera na posição {posicao_na_fila(entrada)}. "
+                            f"Se uma vaga abrir, a inscrição é feita automaticamente e avisamos {participante.email}."
+                        )
+                    return redirect('evento-list')
+                enfileirar_confirmacao(inscricao)
+        except IntegrityError:
+            messages.error(request, "Este e-mail já está inscrito neste evento.")
             return redirect('evento-list')
+        messages.success(request, "Inscrição realizada com sucesso.")
+        messages.info(request, f"Um e-mail de confirmação será enviado para {participante.email}.")
+        return redirect('evento-list')
+    return render(request, 'eventos/inscricao_form.html', {'form': form, 'evento': evento})
 
-        if evento.inscricoes.count() >= evento.capacidade_maxima:
-            messages.error(request, "Capacidade máxima atingida para este evento.")
-            return redirect('evento-list')
+class InscricaoCreateView(View):
+    def get(self, request, evento_id):
+        evento = get_object_or_404(Evento.objects.ativos(), id=evento_id)
+        bloqueio = impedir_inscricao(request, evento, request.user)
+        if bloqueio:
+            return bloqueio
 
         form = ParticipanteForm()
         return render(request, 'eventos/inscricao_form.html', {'form': form, 'evento': evento})
 
     def post(self, request, evento_id):
-        evento = get_object_or_404(Evento, id=evento_id)
+        evento = get_object_or_404(Evento.objects.ativos(), id=evento_id)
+        bloqueio = impedir_inscricao(request, evento, request.user)
+        if bloqueio:
+            return bloqueio
+        return processar_inscricao(request, evento)
 
-        if request.user.is_authenticated and evento.criado_por == request.user:
-            messages.error(request, "Você é o promotor deste evento e não pode se inscrever.")
-            return redirect('evento-list')
+class InscricaoCreateAsyncView(View):
+    async def get(self, request, evento_id):
+        evento = await aget_object_or_404(Evento.objects.ativos(), id=evento_id)
+        bloqueio = impedir_inscricao(request, evento, await request.auser())
+        if bloqueio:
+            return bloqueio
 
-        if evento.inscricoes.count() >= evento.capacidade_maxima:
-            messages.error(request, "Capacidade máxima atingida para este evento.")
-            return redirect('evento-list')
+        form = ParticipanteForm()
+        return await em_thread(render)(request, 'eventos/inscricao_form.html', {'form': form, 'evento': evento})
+
+    async def post(self, request, evento_id):
+        evento = await aget_object_or_404(Evento.objects.ativos(), id=evento_id)
+        bloqueio = impedir_inscricao(request, evento, await request.auser())
+        if bloqueio:
+            return bloqueio
+        # a reserva da vaga precisa de transação, que o ORM assíncrono ainda não tem
+        return await em_thread(processar_inscricao)(request, evento)
+
+class InscricaoImportView(LoginRequiredMixin, EventoOwnerMixin, View):
+    template_name = 'eventos/inscricao_import.html'
+    # o relatório na tela mostra só as primeiras linhas com erro
+    erros_exibidos = 100
+
+    def get_object(self):
+        if not hasattr(self, 'evento'):
+            self.evento = get_object_or_404(Evento.objects.ativos(), pk=self.kwargs['pk'])
+        return self.evento
 
-        form = ParticipanteForm(request.POST)
+    def get(self, request, pk):
+        form = ImportacaoInscricoesForm()
+        return render(request, self.template_name, {'form': form, 'evento': self.get_object()})
+
+    def post(self, request, pk):
+        evento = self.get_object()
+        form = ImportacaoInscricoesForm(request.POST, request.FILES)
+        contexto = {'form': form, 'evento': evento}
         if form.is_valid():
-            participante = form.save()
-            Inscricao.objects.create(evento=evento, participante=participante)
-            messages.success(request, "Inscrição realizada com sucesso.")
-            messages.info(request, "Um e-mail de confirmação foi enviado (simulação).")
-            return redirect('evento-list')
-        return render(request, 'eventos/inscricao_form.html', {'form': form, 'evento': evento})
+            # lê o upload aos poucos, sem decodificar o arquivo inteiro de uma vez
+            arquivo = io.TextIOWrapper(form.cleaned_data['arquivo'], encoding='utf-8-sig', newline='')
+            try:
+                resultado = importar_inscricoes(evento, arquivo)
+            except ImportacaoInvalida as erro:
+                contexto['erro'] = str(erro)
+            except UnicodeDecodeError:
+                contexto['erro'] = "O arquivo precisa estar em UTF-8."
+            else:
+                contexto['resultado'] = resultado
+                contexto['erros'] = resultado.erros[:self.erros_exibidos]
+                contexto['erros_ocultos'] = max(len(resultado.erros) - self.erros_exibidos, 0)
+        return render(request, self.template_name, contexto)
 
 class RegisterView(View):
     def get(self, request):
@@ -107,13 +386,104 @@ class RegisterView(View):
             return redirect('login')
         return render(request, 'registration/register.html', {'form': form})
 
-class ParticipantesListView(LoginRequiredMixin, ListView):
+def contexto_dos_participantes(request, filtro, pagina):
+    # filtros atuais sem cursor nem ordem: base dos links de ordenação e de "mais"
+    parametros = request.GET.copy()
+    parametros.pop('cursor', None)
+    parametros.pop('ordem', None)
+    ordenacao = {}
+    for campo in FiltroParticipantesForm.ORDENACOES:
+        parametros['ordem'] = f'-{campo}' if filtro.ordem_atual == campo else campo
+        ordenacao[campo] = parametros.urlencode()
+    parametros['ordem'] = filtro.ordem_atual
+    return {
+        'inscricoes': pagina.itens,
+        'object_list': pagina.itens,
+        'filtro': filtro,
+        'pagina': pagina,
+        'ordenacao': ordenacao,
+        'parametros': parametros.urlencode(),
+    }
+
+class ParticipantesListView(LoginRequiredMixin, RespostaCondicionalMixin, ListView):
     model = Inscricao
     template_name = 'eventos/participantes_list.html'
     context_object_name = 'inscricoes'
+    tamanho_pagina = 25
 
     def get_queryset(self):
-        return Inscricao.objects.filter(evento__criado_por=self.request.user).select_related('participante', 'evento')
+        self.filtro = FiltroParticipantesForm(self.request.user, self.request.GET or None)
+        self.pagina = paginar_keyset(
+            self.filtro.filtrar(Inscricao.objects.do_promotor(self.request.user)), self.filtro.campo_ordem,
+            self.request.GET.get('cursor'), self.tamanho_pagina, descendente=self.filtro.descendente,
+        )
+        return self.pagina.itens
+
+    def get_validadores(self):
+        return validadores_dos_participantes(self.request)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(contexto_dos_participantes(self.request, self.filtro, self.pagina))
+        return context
+
+class ParticipantesListAsyncView(View):
+    template_name = ParticipantesListView.template_name
+    tamanho_pagina = ParticipantesListView.tamanho_pagina
+
+    async def get(self, request):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        validadores = await em_thread(validadores_dos_participantes)(request)
+        if validadores is not None:
+            nao_modificado = validadores.nao_modificado(request)
+            if nao_modificado is not None:
+                return nao_modificado
+        filtro = FiltroParticipantesForm(user, request.GET or None)
+        # a validação do evento consulta o banco
+        await em_thread(filtro.is_valid)()
+        pagina = await apaginar_keyset(
+            filtro.filtrar(Inscricao.objects.do_promotor(user)), filtro.campo_ordem, request.GET.get('cursor'),
+            self.tamanho_pagina, descendente=filtro.descendente,
+        )
+        context = contexto_dos_participantes(request, filtro, pagina)
+        resposta = await em_thread(render)(request, self.template_name, context)
+        return validadores.aplicar(resposta) if validadores is not None else resposta
+
+class ParticipantesExportView(LoginRequiredMixin, View):
+    formatos = {
+        'csv': (gerar_csv, 'text/csv; charset=utf-8', 'csv'),
+        'xlsx': (gerar_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+    }
+
+    def get(self, request):
+        formato = request.GET.get('formato', 'csv')
+        if formato not in self.formatos:
+            return HttpResponseBadRequest("Formato inválido.")
+
+        colunas = [coluna for coluna in request.GET.get('colunas', '').split(',') if coluna]
+        if not colunas:
+            colunas = list(COLUNAS)
+        elif any(coluna not in COLUNAS for coluna in colunas):
+            return HttpResponseBadRequest("Coluna inválida.")
+
+        inscricoes = Inscricao.objects.do_promotor(request.user)
+        evento_id = request.GET.get('evento')
+        if evento_id:
+            # conferido antes da resposta: um erro no meio do streaming já não vira 400
+            try:
+                evento_id = int(evento_id)
+            except ValueError:
+                evento_id = None
+            if evento_id is None or not 0 <= evento_id <= MAX_PK:
+                return HttpResponseBadRequest("Evento inválido.")
+            inscricoes = inscricoes.filter(evento_id=evento_id)
+
+        gerador, content_type, extensao = self.formatos[formato]
+        response = StreamingHttpResponse(gerador(inscricoes, colunas), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="participantes.{extensao}"'
+        return response
 
 @method_decorator(login_required, name='dispatch')
 class UserEditView(View):
@@ -134,12 +504,20 @@ class UserEditView(View):
 @method_decorator(login_required, name='dispatch')
 class FeedbackCreateView(View):
     def get(self, request, inscricao_id):
-        inscricao = get_object_or_404(Inscricao, id=inscricao_id, participante__email=request.user.email)
+        inscricao = get_object_or_404(
+            Inscricao.objects.select_related('evento'),
+            id=inscricao_id,
+            participante__email=Participante.normalizar_email(request.user.email),
+        )
         form = FeedbackForm(instance=inscricao)
         return render(request, 'eventos/feedback_form.html', {'form': form, 'inscricao': inscricao})
 
     def post(self, request, inscricao_id):
-        inscricao = get_object_or_404(Inscricao, id=inscricao_id, participante__email=request.user.email)
+        inscricao = get_object_or_404(
+            Inscricao.objects.select_related('evento'),
+            id=inscricao_id,
+            participante__email=Participante.normalizar_email(request.user.email),
+        )
         form = FeedbackForm(request.POST, instance=inscricao)
         if form.is_valid():
             form.save()
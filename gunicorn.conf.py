@@ -0,0 +1,18 @@
+# Configuração do gunicorn usada pelo Procfile.
+#
+# SERVIDOR=wsgi (padrão): workers síncronos servindo sistema_eventos.wsgi.
+# SERVIDOR=asgi: workers uvicorn servindo sistema_eventos.asgi, com as views
+# assíncronas de listagem e inscrição.
+import os
+
+servidor = os.getenv('SERVIDOR', 'wsgi')
+
+if servidor == 'asgi':
+    wsgi_app = 'sistema_eventos.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'sistema_eventos.wsgi:application'
+    worker_class = 'sync'
+
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
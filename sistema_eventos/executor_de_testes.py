@@ -0,0 +1,34 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+from eventos import metricas
+
+
+class ExecutorDeTestes(DiscoverRunner):
+    """
+    DiscoverRunner com o cache de métricas num diretório temporário durante toda a
+    execução: os contadores dos testes não se misturam aos de BASE_DIR/.metricas.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.diretorio_metricas = tempfile.mkdtemp(prefix='metricas-testes-')
+        self.cache_de_metricas = override_settings(CACHES={
+            **settings.CACHES,
+            'metricas': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': self.diretorio_metricas,
+            },
+        })
+        self.cache_de_metricas.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        # o que ficou pendente sai agora, e não no atexit, que já veria o cache real
+        metricas.descarregar()
+        self.cache_de_metricas.disable()
+        shutil.rmtree(self.diretorio_metricas, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
@@ -3,6 +3,7 @@ import cloudinary
 
 from pathlib import Path
 
+from django.contrib.messages import constants as message_constants
 from django.urls import reverse_lazy
 from dotenv import load_dotenv
 
@@ -24,6 +25,8 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
+    # runserver também serve os estáticos pelo WhiteNoise, como em produção
+    'whitenoise.runserver_nostatic',
     'django.contrib.staticfiles',
     'eventos',
     # Apps de terceiros
@@ -34,6 +37,11 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # depois do WhiteNoise: os estáticos saem antes e não entram nos histogramas
+    'eventos.perfilamento.PerfilamentoMiddleware',
+    'eventos.limites.LimiteDeTaxaMiddleware',
+    'eventos.replicas.ReplicaDeLeituraMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -42,6 +50,47 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Perfilamento por requisição (Server-Timing, log estruturado e histogramas por rota;
+# veja `python manage.py perfilamento`). Desligado, o middleware sai da cadeia.
+PERFILAMENTO_ATIVO = os.getenv('PERFILAMENTO', 'False') == 'True'
+
+# Limites de taxa por rota (nome da URL), aplicados antes da view. Cada balde é
+# identificado por partes unidas por '+': "ip" ou parâmetros da URL, e tem
+# (requisições, janela em segundos). Os contadores ficam no cache: com mais de um
+# worker, use um cache compartilhado (Redis). LIMITE_DE_TAXA=False desliga tudo.
+LIMITES_DE_TAXA = {
+    'evento-inscricao': {
+        'metodos': ['POST'],
+        'baldes': {
+            'ip': (int(os.getenv('LIMITE_INSCRICAO_IP', 20)), 60),
+            'ip+evento_id': (int(os.getenv('LIMITE_INSCRICAO_IP_EVENTO', 5)), 60),
+            'evento_id': (int(os.getenv('LIMITE_INSCRICAO_EVENTO', 600)), 60),
+        },
+    },
+    # a API é pública e barata, mas não pode virar um scraper sem freio
+    **{
+        rota: {'metodos': ['GET'], 'baldes': {'ip': (int(os.getenv('LIMITE_API_IP', 120)), 60)}}
+        for rota in ('api-eventos', 'api-eventos-lote')
+    },
+} if os.getenv('LIMITE_DE_TAXA', 'True') == 'True' else {}
+# atrás de um proxy (Render, nginx), o IP real vem deste cabeçalho, ex.: HTTP_X_FORWARDED_FOR
+LIMITE_DE_TAXA_CABECALHO_IP = os.getenv('LIMITE_DE_TAXA_CABECALHO_IP')
+
+# eventos que aconteceram há mais dias que isto saem das tabelas quentes
+# (python manage.py arquivar_eventos) e passam a aparecer só no arquivo
+ARQUIVAR_EVENTOS_APOS_DIAS = int(os.getenv('ARQUIVAR_EVENTOS_APOS_DIAS', 365))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'eventos.perfilamento': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 ROOT_URLCONF = 'sistema_eventos.urls'
 
 TEMPLATES = [
@@ -61,6 +110,12 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'sistema_eventos.wsgi.application'
 
+# Modo de servidor (veja gunicorn.conf.py). Em 'asgi' as rotas de listagem e
+# inscrição usam as views assíncronas; chamadas síncronas que sobram rodam num
+# pool de threads limitado a ASYNC_THREADS por worker.
+SERVIDOR_ASYNC = os.getenv('SERVIDOR', 'wsgi') == 'asgi'
+ASYNC_THREADS = int(os.getenv('ASYNC_THREADS', 8))
+
 # Banco de Dados (usando variáveis do .env)
 DATABASES = {
     'default': {
@@ -70,9 +125,105 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD', ''),
         'HOST': os.getenv('DB_HOST', ''),
         'PORT': os.getenv('DB_PORT', ''),
+        # conexões persistentes: cada worker reaproveita a conexão entre requisições
+        # e testa se ela continua viva antes de usar (DB_CONN_MAX_AGE=0 desliga)
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True',
     }
 }
 
+if os.getenv('DB_POOL', 'False') == 'True':
+    # pool por worker do psycopg 3 (requer psycopg[pool]); substitui CONN_MAX_AGE
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.getenv('DB_POOL_MIN', 2)),
+            'max_size': int(os.getenv('DB_POOL_MAX', 4)),
+            'timeout': int(os.getenv('DB_POOL_TIMEOUT', 10)),
+        },
+    }
+
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # BEGIN IMMEDIATE pega o lock de escrita no início da transação, evitando
+    # "database is locked" quando várias inscrições concorrem pela mesma vaga
+    DATABASES['default']['OPTIONS'] = {
+        'transaction_mode': 'IMMEDIATE',
+        'timeout': 20,
+    }
+    # banco de testes em arquivo: o SQLite em memória compartilhado entre threads
+    # não respeita o timeout e falharia nos testes de concorrência
+    DATABASES['default']['TEST'] = {'NAME': BASE_DIR / 'test_db.sqlite3'}
+
+# Réplica de leitura opcional: com DB_REPLICA_NAME ou DB_REPLICA_HOST, as rotas em
+# ROTAS_NA_REPLICA leem dela (GET/HEAD); escritas e quem escreveu há menos de
+# REPLICA_ATRASO_MAXIMO segundos ficam no primário (veja eventos/replicas.py).
+# As demais DB_REPLICA_* herdam do primário. Para simular com SQLite, aponte
+# DB_REPLICA_NAME para uma cópia do arquivo do primário.
+if os.getenv('DB_REPLICA_NAME') or os.getenv('DB_REPLICA_HOST'):
+    primario = DATABASES['default']
+    DATABASES['replica'] = {
+        **primario,
+        'NAME': os.getenv('DB_REPLICA_NAME', primario['NAME']),
+        'USER': os.getenv('DB_REPLICA_USER', primario['USER']),
+        'PASSWORD': os.getenv('DB_REPLICA_PASSWORD', primario['PASSWORD']),
+        'HOST': os.getenv('DB_REPLICA_HOST', primario['HOST']),
+        'PORT': os.getenv('DB_REPLICA_PORT', primario['PORT']),
+        # nos testes a réplica é o próprio banco de testes do primário
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_ROUTERS = ['eventos.replicas.RoteadorDeReplica']
+ROTAS_NA_REPLICA = [
+    'evento-list', 'evento-busca', 'evento-arquivo', 'evento-arquivado',
+    'participantes-list', 'participantes-export', 'api-eventos', 'api-eventos-lote', 'admin:',
+]
+REPLICA_ATRASO_MAXIMO = int(os.getenv('REPLICA_ATRASO_MAXIMO', 10))
+
+# segundos que proxies e CDNs podem servir uma resposta da API sem revalidar
+API_MAX_AGE = int(os.getenv('API_MAX_AGE', 15))
+
+# Cache (locmem por padrão; aponte CACHE_BACKEND/CACHE_LOCATION para
+# django.core.cache.backends.filebased.FileBasedCache ou
+# django.core.cache.backends.redis.RedisCache para compartilhar entre workers)
+#
+# 'metricas' guarda os contadores de eventos/metricas.py e precisa ser visto por
+# todos os processos: os workers somam nele e os comandos estatisticas_cache,
+# estatisticas_conexoes e perfilamento leem dele. Por padrão é um diretório
+# local (serve a todos os workers da mesma máquina); com mais de uma máquina,
+# aponte METRICAS_CACHE_BACKEND/METRICAS_CACHE_LOCATION para o Redis. Nunca locmem.
+# No diretório os contadores são aproximados: o incr do FileBasedCache lê e
+# regrava o arquivo, e dois workers descarregando ao mesmo tempo perdem somas.
+# Para contagens exatas use Redis ou Memcached, cujo incr é atômico. Nos testes
+# o executor (sistema_eventos/executor_de_testes.py) troca por um diretório temporário.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'sistema-eventos'),
+    },
+    'metricas': {
+        'BACKEND': os.getenv('METRICAS_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('METRICAS_CACHE_LOCATION', BASE_DIR / '.metricas'),
+    },
+}
+
+TEST_RUNNER = 'sistema_eventos.executor_de_testes.ExecutorDeTestes'
+
+# Sessões por SESSAO_MODO: 'cookie' guarda a sessão assinada no próprio cookie
+# (nenhuma consulta por requisição; só o id do usuário e o hash da senha vão
+# nela), 'cache' lê do cache e grava também no banco (cached_db; com mais de um
+# worker exige cache compartilhado, senão um logout não vale nos outros) e
+# 'banco' é o padrão do Django. Veja `python manage.py benchmark_sessoes`.
+MODOS_DE_SESSAO = {
+    'cookie': 'django.contrib.sessions.backends.signed_cookies',
+    'cache': 'django.contrib.sessions.backends.cached_db',
+    'banco': 'django.contrib.sessions.backends.db',
+}
+SESSAO_MODO = os.getenv('SESSAO_MODO', 'cookie')
+SESSION_ENGINE = MODOS_DE_SESSAO[SESSAO_MODO]
+
+# Mensagens só no cookie: o redirect depois de messages.success/error não
+# regrava a sessão (o FallbackStorage padrão recorre a ela quando o cookie enche)
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
 # Validações de senha
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',},
@@ -90,11 +241,29 @@ USE_TZ = True
 # Arquivos estáticos
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
+# Servidos pelo próprio gunicorn via WhiteNoise: nomes com hash (cache de 1 ano,
+# immutable) e versões gzip/brotli geradas no collectstatic. Arquivos sem hash
+# no nome ficam em cache só por WHITENOISE_MAX_AGE segundos.
+WHITENOISE_MAX_AGE = int(os.getenv('WHITENOISE_MAX_AGE', 60))
 
 # Configuração do Cloudinary
-DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
 CLOUDINARY_URL = os.getenv('CLOUDINARY_URL')
 
+# Armazenamento de mídia: Cloudinary quando configurado, disco local (MEDIA_ROOT)
+# caso contrário; MEDIA_STORAGE permite escolher outro backend
+STORAGES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'MEDIA_STORAGE',
+            'cloudinary_storage.storage.MediaCloudinaryStorage' if CLOUDINARY_URL
+            else 'django.core.files.storage.FileSystemStorage',
+        ),
+    },
+    'staticfiles': {
+        'BACKEND': 'eventos.estaticos.ArquivosEstaticos',
+    },
+}
+
 
 # Arquivos de mídia (opcional, mas recomendado)
 # MEDIA_URL = '/media/'
@@ -112,6 +281,12 @@ EMAIL_PORT = int(os.getenv('EMAIL_PORT', 587))
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True') == 'True'
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'webmaster@localhost')
+# os e-mails são gravados na tabela EmailPendente e enviados por
+# `python manage.py enviar_emails --continuo`, fora do ciclo da requisição
+
+# classes do Bootstrap para os níveis das mensagens (error -> alert-danger)
+MESSAGE_TAGS = {message_constants.ERROR: 'danger'}
 
 # Redirecionamento após login
 LOGIN_URL = '/'
@@ -7,16 +7,33 @@ from django.conf.urls.static import static
 
 from eventos.views import (
     EventoListView,
+    EventoListAsyncView,
+    EventoBuscaView,
+    EventoArquivadoListView,
+    EventoArquivadoDetailView,
+    EventoApiListView,
+    EventoApiLoteView,
     EventoCreateView,
     EventoUpdateView,
+    EventoPainelView,
     EventoDeleteView,
     InscricaoCreateView,
+    InscricaoCreateAsyncView,
+    InscricaoImportView,
     RegisterView,
     ParticipantesListView,
+    ParticipantesListAsyncView,
+    ParticipantesExportView,
     UserEditView,
     FeedbackCreateView,
 )
 
+
+def sincrona_ou_async(sincrona, assincrona):
+    # no modo ASGI as rotas de leitura e inscrição usam as views assíncronas
+    return (assincrona if settings.SERVIDOR_ASYNC else sincrona).as_view()
+
+
 urlpatterns = [
     path('admin/', admin.site.urls),
 
@@ -26,16 +43,31 @@ urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
 
     # Eventos
-    path('', EventoListView.as_view(), name='evento-list'),
+    path('', sincrona_ou_async(EventoListView, EventoListAsyncView), name='evento-list'),
+    path('busca/', EventoBuscaView.as_view(), name='evento-busca'),
+    path('arquivo/', EventoArquivadoListView.as_view(), name='evento-arquivo'),
+    path('arquivo/<int:pk>/', EventoArquivadoDetailView.as_view(), name='evento-arquivado'),
+    # API JSON só de leitura (disponibilidade para o app e parceiros)
+    path('api/eventos/', EventoApiListView.as_view(), name='api-eventos'),
+    path('api/eventos/lote/', EventoApiLoteView.as_view(), name='api-eventos-lote'),
     path('evento/novo/', EventoCreateView.as_view(), name='evento-create'),
     path('evento/<int:pk>/editar/', EventoUpdateView.as_view(), name='evento-update'),
+    path('evento/<int:pk>/painel/', EventoPainelView.as_view(), name='evento-painel'),
     path('evento/<int:pk>/deletar/', EventoDeleteView.as_view(), name='evento-delete'),
 
     # Inscrição
-    path('evento/<int:evento_id>/inscricao/', InscricaoCreateView.as_view(), name='evento-inscricao'),
+    path(
+        'evento/<int:evento_id>/inscricao/', sincrona_ou_async(InscricaoCreateView, InscricaoCreateAsyncView),
+        name='evento-inscricao',
+    ),
+    path('evento/<int:pk>/importar/', InscricaoImportView.as_view(), name='evento-importar'),
 
     # Participantes
-    path('participantes/', ParticipantesListView.as_view(), name='participantes-list'),
+    path(
+        'participantes/', sincrona_ou_async(ParticipantesListView, ParticipantesListAsyncView),
+        name='participantes-list',
+    ),
+    path('participantes/exportar/', ParticipantesExportView.as_view(), name='participantes-export'),
 
     # Edição usuário (email e senha juntos)
     path('usuario/editar/', UserEditView.as_view(), name='user-edit'),